@@ -1,6 +1,8 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash
-from database.db_config import init_database
+from database.db_config import init_database, close_session, database_exists
+from database import loader_options, query_stats
 from controllers.authentication_controller import AuthenticationController
+from boundaries.http_cache import conditional_get
 import os
 
 # Import boundaries
@@ -10,7 +12,8 @@ from boundaries.user_account_boundary import (
     ViewUserAccountUI,
     UpdateUserAccountUI,
     SuspendUserAccountUI,
-    SearchUserAccountUI
+    SearchUserAccountUI,
+    PasswordHashStatsUI,
 )
 
 from boundaries.user_profile_boundary import (
@@ -48,6 +51,7 @@ from boundaries.platform_manager_boundary import (
     DailyReportUI,
     WeeklyReportUI,
     MonthlyReportUI,
+    ReportCacheStatsUI,
 )
 
 # Initialize Boundaries
@@ -57,6 +61,7 @@ viewUserUI = ViewUserAccountUI()
 updateUserUI = UpdateUserAccountUI()
 suspendUserUI = SuspendUserAccountUI()
 searchUserUI = SearchUserAccountUI()
+passwordHashStatsUI = PasswordHashStatsUI()
 
 listUPUI = ListUserProfileUI()
 createUPUI = CreateUserProfileUI()
@@ -88,16 +93,28 @@ searchCategoryUI = SearchCategoryUI()
 dailyReportUI = DailyReportUI()
 weeklyReportUI = WeeklyReportUI()
 monthlyReportUI = MonthlyReportUI()
+reportCacheStatsUI = ReportCacheStatsUI()
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = 'csr_volunteering_secret_key_change_in_production'  # Change in production!
 
+# Per-request SQL statement counts, slow-request log and (debug) X-Query-* headers
+query_stats.init_app(app)
+
+# Tests (app.testing / LAZY_LOAD_RAISE=1): fail on relationship lazy loads from templates
+loader_options.init_app(app)
+
 # Initialize controllers
 auth_controller = AuthenticationController()
 
 # ==================== HELPER FUNCTIONS ====================
 
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """Return the request's connection to the pool and end its transaction"""
+    close_session()
+
 def require_login(f):
     """Decorator to require login for routes"""
     from functools import wraps
@@ -206,6 +223,11 @@ def activateUserAccount(user_id):
 def search_user_accounts():
     return searchUserUI.onClick()
 
+@app.route('/user-accounts/hash-stats')
+@require_user_admin
+def password_hash_stats():
+    return passwordHashStatsUI.handle_view_hash_stats()
+
 # ==================== USER PROFILE MANAGEMENT ====================
 
 @app.route('/user-profiles')
@@ -295,6 +317,7 @@ def searchShortlists():
 
 @app.route('/categories')
 @require_login
+@conditional_get(listCategoryUI.pageVersion)
 def listCategories():
     return listCategoryUI.DisplayPage()
 
@@ -305,6 +328,7 @@ def createCategory():
 
 @app.route('/categories/<int:category_id>')
 @require_login
+@conditional_get(viewCategoryUI.pageVersion)
 def viewCategory(category_id):
     return viewCategoryUI.viewCategory(category_id)
 
@@ -332,19 +356,27 @@ def searchCategories():
 
 @app.route('/reports/daily')
 @require_login
+@conditional_get(dailyReportUI.pageVersion)
 def createDailyReport():
     return dailyReportUI.handle_create_daily_report()
 
 @app.route('/reports/weekly')
 @require_login
+@conditional_get(weeklyReportUI.pageVersion)
 def createWeeklyReport():
     return weeklyReportUI.handle_create_weekly_report()
 
 @app.route('/reports/monthly')
 @require_login
+@conditional_get(monthlyReportUI.pageVersion)
 def createMonthlyReport():
     return monthlyReportUI.handle_create_monthly_report()
 
+@app.route('/reports/cache-stats')
+@require_login
+def reportCacheStats():
+    return reportCacheStatsUI.handle_view_cache_stats()
+
 # ==================== COMPLETED MATCH HISTORY (PIN) ====================
 
 @app.route('/completed-history')
@@ -373,6 +405,7 @@ def csrSearchCompletedHistory():
 
 @app.route('/csr/completed-history/<int:match_id>')
 @require_login
+@conditional_get(viewCompletedDetailsUI.pageVersion)
 def csrViewCompletedDetails(match_id: int):
     return viewCompletedDetailsUI.viewDetails(match_id)
 
@@ -390,7 +423,7 @@ def internal_error(error):
 
 if __name__ == '__main__':
     # Check if database exists
-    if not os.path.exists('csr_volunteering.db'):
+    if not database_exists():
         print("Database not found. Initializing...")
         init_database()
         print("Please run: python -m database.init_db")
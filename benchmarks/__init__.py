@@ -0,0 +1 @@
+# Benchmarks package - Standalone performance scripts (run with python -m benchmarks.<name>)
@@ -0,0 +1,80 @@
+"""
+Benchmark: user account search
+Compares UserAccount.searchUserAccount (LIKE over four columns, every match
+loaded) with the trigram AccountSearchIndex plus one page of accounts, for a
+large account base.
+
+Usage:
+    python -m benchmarks.bench_account_search [--accounts 50000] [--page-size 20]
+"""
+
+import argparse
+import os
+import random
+import string
+
+from benchmarks.common import create_scratch_database, timed
+from controllers.UserAdmin.UserAccount.accountSearchIndex import AccountSearchIndex
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+BATCH_SIZE = 10000
+FIRST_NAMES = ["John", "Jonathan", "Sally", "Maria", "Wei", "Aisha", "Carlos", "Elodie", "Priya", "Tom"]
+LAST_NAMES = ["Smith", "Johnson", "Tan", "Garcia", "Nguyen", "Martin", "Okafor", "Lee", "Brown", "Khan"]
+KEYWORDS = ["john", "jhon", "smith", "garcia maria", "tan", "ok", "example.com"]
+
+
+def seed(session, account_count):
+    rng = random.Random(42)
+    profile = UserProfile(profile_name="Benchmark", description="Benchmark", is_active=True)
+    session.add(profile)
+    session.flush()
+    rows = []
+    for i in range(account_count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        suffix = "".join(rng.choices(string.ascii_lowercase, k=4))
+        rows.append({
+            'username': f"{first.lower()}{suffix}{i}", 'email': f"{first.lower()}.{last.lower()}{i}@example.com",
+            'password_hash': "x", 'first_name': first, 'last_name': last,
+            'user_profile_id': profile.id, 'is_active': i % 10 != 0,
+        })
+        if len(rows) == BATCH_SIZE:
+            session.bulk_insert_mappings(UserAccount, rows)
+            rows = []
+    if rows:
+        session.bulk_insert_mappings(UserAccount, rows)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    engine, session, path = create_scratch_database()
+    try:
+        seed(session, args.accounts)
+        index = AccountSearchIndex(refresh_seconds=0)
+        results = {}
+        with timed(results, "load"):
+            index.search(session, None)
+        print(f"{args.accounts} accounts, index loaded in {results['load']:.0f} ms")
+        print(f"{'keyword':<16}{'LIKE rows':>10}{'LIKE (ms)':>12}{'index rows':>12}{'index (ms)':>12}")
+        for keyword in KEYWORDS:
+            with timed(results, "like"):
+                like_rows = len(UserAccount.searchUserAccount(session, keyword, None, None))
+            session.expunge_all()
+            with timed(results, "index"):
+                ids = index.search(session, keyword)
+                UserAccount.findByIds(session, ids[:args.page_size])
+            session.expunge_all()
+            print(f"{keyword:<16}{like_rows:>10}{results['like']:>12.1f}{len(ids):>12}{results['index']:>12.1f}")
+    finally:
+        session.close()
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: report category breakdown
+Compares the per-category COUNT loop with the grouped outer-join aggregation
+used by CreateDailyReportCtrl._getCategoryBreakdown.
+
+Usage:
+    python -m benchmarks.bench_category_breakdown [--categories 500] [--requests 200000]
+"""
+
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_
+
+from benchmarks.common import create_scratch_database, QueryCounter, timed
+from controllers.PM.createDailyReportCtrl import CreateDailyReportCtrl
+from entities.category import Category
+from entities.request import Request
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+BATCH_SIZE = 10000
+
+
+def seed(session, category_count, request_count, days=90):
+    """Insert one PIN, category_count categories and request_count requests"""
+    rng = random.Random(42)
+    now = datetime.now()
+
+    profile = UserProfile(profile_name="PIN", description="Benchmark", is_active=True)
+    session.add(profile)
+    session.flush()
+    user = UserAccount(
+        username="bench", email="bench@example.com", password_hash="x",
+        first_name="Bench", last_name="User", user_profile_id=profile.id,
+    )
+    session.add(user)
+    session.flush()
+
+    session.execute(Category.__table__.insert(), [
+        {
+            "created_by": user.id, "title": f"Category {i}", "description": "Benchmark",
+            "status": "Active", "is_active": True, "created_at": now, "updated_at": now,
+        }
+        for i in range(1, category_count + 1)
+    ])
+
+    batch = []
+    for i in range(request_count):
+        created_at = now - timedelta(days=rng.randint(0, days), minutes=rng.randint(0, 1439))
+        batch.append({
+            "user_account_id": user.id,
+            "category_id": rng.randint(1, category_count),
+            "title": f"Request {i}",
+            "description": "Benchmark request",
+            "status": "Completed" if rng.random() < 0.4 else "Pending",
+            "view_count": 0,
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(hours=rng.randint(1, 48)),
+        })
+        if len(batch) >= BATCH_SIZE:
+            session.execute(Request.__table__.insert(), batch)
+            batch = []
+    if batch:
+        session.execute(Request.__table__.insert(), batch)
+    session.commit()
+
+
+def legacy_category_breakdown(session, start_datetime, end_datetime):
+    """The previous implementation: two COUNT queries per category"""
+    breakdown = []
+    for category in session.query(Category).all():
+        category_requests = session.query(Request).filter(
+            and_(
+                Request.category_id == category.category_id,
+                Request.created_at >= start_datetime,
+                Request.created_at <= end_datetime
+            )
+        ).count()
+        category_completed = session.query(Request).filter(
+            and_(
+                Request.category_id == category.category_id,
+                Request.updated_at >= start_datetime,
+                Request.updated_at <= end_datetime,
+                Request.status == 'Completed'
+            )
+        ).count()
+        breakdown.append({
+            'category_id': category.category_id,
+            'category_title': category.title,
+            'new_requests': category_requests,
+            'completed_requests': category_completed,
+            'is_active': category.is_active
+        })
+    breakdown.sort(key=lambda x: x['new_requests'], reverse=True)
+    return breakdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+
+    engine, session, path = create_scratch_database()
+    try:
+        print(f"Seeding {args.categories} categories / {args.requests} requests...")
+        seed(session, args.categories, args.requests)
+
+        end_datetime = datetime.now()
+        start_datetime = end_datetime - timedelta(days=30)
+
+        ctrl = CreateDailyReportCtrl()
+        ctrl.session = session
+
+        timings = {}
+        with QueryCounter(engine) as legacy_queries, timed(timings, "legacy"):
+            legacy = legacy_category_breakdown(session, start_datetime, end_datetime)
+        with QueryCounter(engine) as grouped_queries, timed(timings, "grouped"):
+            grouped = ctrl._getCategoryBreakdown(start_datetime, end_datetime)
+
+        assert legacy == grouped, "grouped breakdown differs from the legacy result"
+
+        print(f"{'implementation':<16}{'queries':>10}{'latency (ms)':>16}")
+        print(f"{'per-category':<16}{legacy_queries.count:>10}{timings['legacy']:>16.1f}")
+        print(f"{'grouped':<16}{grouped_queries.count:>10}{timings['grouped']:>16.1f}")
+    finally:
+        session.close()
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark: concurrent request views and shortlists
+Drives GET /requests/<id> and POST /requests/<id>/shortlist (alternating
+with removeShortlist) from many threads, once with a bare SQLite engine and
+once with create_db_engine() (WAL, busy_timeout, synchronous=NORMAL, mmap,
+cache_size, pool settings), and reports throughput, latency and errors.
+
+Views are written through on every hit (view counter threshold 1) so both
+endpoints put write load on the database.
+
+Usage:
+    python -m benchmarks.bench_concurrency [--threads 16] [--seconds 10] [--requests 200]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+import bcrypt
+from sqlalchemy import create_engine
+
+import database.db_config as db_config
+import entities  # noqa: F401  (registers every model with Base)
+from entities.request import Request
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+PASSWORD = "bench123"
+
+
+def seed(session, csr_count, request_count):
+    """One PIN, csr_count CSR Reps sharing PASSWORD, and request_count requests"""
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+    pin_profile = UserProfile(profile_name="PIN", description="Benchmark", is_active=True)
+    csr_profile = UserProfile(profile_name="CSR Rep", description="Benchmark", is_active=True)
+    session.add_all([pin_profile, csr_profile])
+    session.flush()
+
+    pin = UserAccount(username="pin", email="pin@example.com", password_hash=password_hash,
+                      first_name="Pin", last_name="User", user_profile_id=pin_profile.id)
+    session.add(pin)
+    session.add_all(
+        UserAccount(username=f"csr{i}", email=f"csr{i}@example.com", password_hash=password_hash,
+                    first_name="Csr", last_name=str(i), user_profile_id=csr_profile.id)
+        for i in range(csr_count)
+    )
+    session.flush()
+    session.add_all(
+        Request(user_account_id=pin.id, title=f"Request {i}", description="Benchmark", status="Pending")
+        for i in range(request_count)
+    )
+    session.commit()
+    return [request_id for (request_id,) in session.query(Request.request_id)]
+
+
+def worker(app, index, request_ids, deadline, results, lock):
+    rng = random.Random(index)
+    client = app.test_client()
+    shortlisted = set()
+    latencies, errors = [], 0
+    client.post("/login", data={"username": f"csr{index}", "password": PASSWORD})
+    while time.perf_counter() < deadline:
+        request_id = rng.choice(request_ids)
+        for method, path in (
+            ("get", f"/requests/{request_id}"),
+            ("post", f"/requests/{request_id}/"
+                     f"{'removeShortlist' if request_id in shortlisted else 'shortlist'}"),
+        ):
+            start = time.perf_counter()
+            try:
+                status = getattr(client, method)(path).status_code
+            except Exception:
+                status = 500
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if status >= 500:
+                errors += 1
+        shortlisted ^= {request_id}
+    with lock:
+        results["latencies"].extend(latencies)
+        results["errors"] += errors
+
+
+def run(label, engine_factory, args):
+    from app import app
+    from controllers.PIN.Request.viewCounter import view_counter
+
+    fd, path = tempfile.mkstemp(prefix="csr_bench_", suffix=".db")
+    os.close(fd)
+    os.remove(path)
+    engine = engine_factory(f"sqlite:///{path}")
+    db_config.Base.metadata.create_all(bind=engine)
+
+    db_config.SessionLocal.configure(bind=engine)
+    db_config.session.remove()
+    view_counter.flush_threshold = 1
+    try:
+        request_ids = seed(db_config.session(), args.threads, args.requests)
+        db_config.session.remove()
+
+        results = {"latencies": [], "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(target=worker, args=(app, i, request_ids, deadline, results, lock))
+            for i in range(args.threads)
+        ]
+        # The boundaries print debug output; redirect once here, not per thread
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(results["latencies"])
+        count = len(latencies)
+        p50 = latencies[count // 2] if count else 0.0
+        p95 = latencies[int(count * 0.95)] if count else 0.0
+        print(f"{label:<10}{count:>10}{count / elapsed:>12.1f}{p50:>12.1f}{p95:>12.1f}{results['errors']:>10}")
+    finally:
+        view_counter.flush()
+        db_config.session.remove()
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.seconds:g}s per engine")
+    print(f"{'engine':<10}{'calls':>10}{'calls/s':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'errors':>10}")
+    run("bare", lambda url: create_engine(url), args)
+    run("tuned", db_config.create_db_engine, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: completed history pagination
+Compares OFFSET paging with keyset (cursor) paging of Match.findCompletedByCSR
+at increasing page depths for a single CSR Rep with a large history, each with
+the exact total (one statement) and with exact_total=False (no count), and
+the two-statement count() + page baseline.
+
+Usage:
+    python -m benchmarks.bench_history_pagination [--matches 200000] [--page-size 10]
+"""
+
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import QueryCounter, create_scratch_database, timed
+from entities.match import Match
+from entities.request import Request
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+BATCH_SIZE = 10000
+
+
+def seed(session, match_count, days=730):
+    """Insert one PIN, one CSR Rep, one request and match_count completed matches"""
+    rng = random.Random(42)
+    now = datetime.now()
+
+    profile = UserProfile(profile_name="Benchmark", description="Benchmark", is_active=True)
+    session.add(profile)
+    session.flush()
+    users = [
+        UserAccount(
+            username=name, email=f"{name}@example.com", password_hash="x",
+            first_name=name, last_name="User", user_profile_id=profile.id,
+        )
+        for name in ("pin", "csr")
+    ]
+    session.add_all(users)
+    session.flush()
+    pin, csr = users
+    request = Request(user_account_id=pin.id, title="Benchmark", description="Benchmark", status="Completed")
+    session.add(request)
+    session.flush()
+
+    batch = []
+    for _ in range(match_count):
+        created_at = now - timedelta(days=rng.randint(0, days), minutes=rng.randint(0, 1439))
+        batch.append({
+            "request_id": request.request_id,
+            "pin_id": pin.id,
+            "csr_rep_id": csr.id,
+            "status": "Completed",
+            "service_type": "Benchmark",
+            "created_at": created_at,
+            "completed_at": created_at + timedelta(hours=rng.randint(1, 72)),
+            "updated_at": created_at,
+        })
+        if len(batch) >= BATCH_SIZE:
+            session.execute(Match.__table__.insert(), batch)
+            batch = []
+    if batch:
+        session.execute(Match.__table__.insert(), batch)
+    session.commit()
+    return csr.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=10)
+    args = parser.parse_args()
+
+    engine, session, path = create_scratch_database()
+    try:
+        print(f"Seeding {args.matches} completed matches...")
+        csr_id = seed(session, args.matches)
+        total_pages = (args.matches + args.page_size - 1) // args.page_size
+
+        print(f"{'page':>10}{'count+page':>14}{'offset':>10}{'no total':>10}{'cursor':>10}{'no total':>10}   (ms)")
+        for page in sorted({1, 10, 100, total_pages // 2, total_pages}):
+            if page < 2:
+                continue
+            # Cursor pointing just past the last row of the previous page
+            previous, _ = Match.findCompletedByCSR(session, csr_id, page=page - 1, page_size=args.page_size)
+            cursor = Match.encodeCursor(previous[-1], "next")
+            session.expunge_all()
+
+            timings = {}
+            with timed(timings, "two"):
+                query = Match._base_completed_query_for_csr(session, csr_id)
+                query.count()
+                two = query.order_by(*Match._history_order()).offset((page - 1) * args.page_size) \
+                    .limit(args.page_size).all()
+            session.expunge_all()
+            with QueryCounter(engine) as counter, timed(timings, "offset"):
+                by_offset, total = Match.findCompletedByCSR(session, csr_id, page=page, page_size=args.page_size)
+            assert counter.count == 1 and total == args.matches, (counter.count, total)
+            session.expunge_all()
+            with timed(timings, "offset_estimate"):
+                estimated, _ = Match.findCompletedByCSR(session, csr_id, page=page, page_size=args.page_size,
+                                                        exact_total=False)
+            session.expunge_all()
+            with timed(timings, "cursor"):
+                by_cursor, _, _ = Match.findCompletedByCSR(session, csr_id, page_size=args.page_size, cursor=cursor)
+            session.expunge_all()
+            with timed(timings, "cursor_estimate"):
+                Match.findCompletedByCSR(session, csr_id, page_size=args.page_size, cursor=cursor, exact_total=False)
+            session.expunge_all()
+
+            ids = [m.match_id for m in by_offset]
+            assert ids == [m.match_id for m in two] == [m.match_id for m in estimated], f"pages differ at {page}"
+            assert ids == [m.match_id for m in by_cursor], f"cursor page differs from offset page {page}"
+            print(f"{page:>10}{timings['two']:>14.1f}{timings['offset']:>10.1f}{timings['offset_estimate']:>10.1f}"
+                  f"{timings['cursor']:>10.1f}{timings['cursor_estimate']:>10.1f}")
+    finally:
+        session.close()
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
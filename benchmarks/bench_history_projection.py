@@ -0,0 +1,131 @@
+"""
+Benchmark: lean history list rows
+Compares Match.findCompletedByCSR loading full Match objects (with the
+request, PIN and CSR Rep eager-loaded) against lean=True (MatchSummary rows
+with only the list columns) for one CSR Rep with a --matches history: a list
+page, and the whole history in one page. Reports the median time over
+--repeats runs and the peak Python memory allocated while fetching
+(tracemalloc).
+
+Usage:
+    python -m benchmarks.bench_history_projection [--matches 10000] [--pins 200] [--repeats 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import QueryCounter, create_scratch_database
+from entities.match import Match
+from entities.request import Request
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+BATCH_SIZE = 10000
+DESCRIPTION_CHARS = 600
+
+
+def seed(session, match_count, pin_count, days=730):
+    """One CSR Rep with match_count completed matches, each on its own request from one of pin_count PINs"""
+    rng = random.Random(42)
+    now = datetime.now()
+
+    profile = UserProfile(profile_name="Benchmark", description="Benchmark", is_active=True)
+    session.add(profile)
+    session.flush()
+    users = [
+        UserAccount(
+            username=f"user{i}", email=f"user{i}@example.com", password_hash="$2b$12$" + "x" * 53,
+            first_name=f"First{i}", last_name=f"Last{i}", phone_number="555-0100", user_profile_id=profile.id,
+        )
+        for i in range(pin_count + 1)
+    ]
+    session.add_all(users)
+    session.commit()
+    csr, pins = users[0], users[1:]
+
+    description = ("Help needed with groceries and a ride to the clinic. " * 20)[:DESCRIPTION_CHARS]
+    requests, matches = [], []
+    for request_id in range(1, match_count + 1):
+        pin = rng.choice(pins)
+        created_at = now - timedelta(days=rng.randint(0, days), minutes=rng.randint(0, 1439))
+        requests.append({
+            "request_id": request_id, "user_account_id": pin.id, "title": f"Request {request_id}",
+            "description": description, "status": "Completed", "view_count": 0,
+            "created_at": created_at, "updated_at": created_at,
+        })
+        matches.append({
+            "request_id": request_id, "pin_id": pin.id, "csr_rep_id": csr.id, "status": "Completed",
+            "service_type": "Benchmark", "created_at": created_at,
+            "completed_at": created_at + timedelta(hours=rng.randint(1, 72)), "updated_at": created_at,
+        })
+    for table, rows in ((Request.__table__, requests), (Match.__table__, matches)):
+        for start in range(0, len(rows), BATCH_SIZE):
+            session.execute(table.insert(), rows[start:start + BATCH_SIZE])
+    session.commit()
+    return csr.id
+
+
+def measure(session, engine, csr_id, page_size, lean, repeats):
+    """(median ms, peak KiB, statements, items) of fetching page 1"""
+    peaks = []
+    for _ in range(repeats):
+        session.expunge_all()
+        tracemalloc.start()
+        with QueryCounter(engine) as counter:
+            Match.findCompletedByCSR(session, csr_id, page=1, page_size=page_size, lean=lean)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024.0)
+        tracemalloc.stop()
+    # Timed separately: tracemalloc slows allocation-heavy code unevenly
+    times = []
+    for _ in range(repeats):
+        session.expunge_all()
+        start = time.perf_counter()
+        items, _ = Match.findCompletedByCSR(session, csr_id, page=1, page_size=page_size, lean=lean)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(times), statistics.median(peaks), counter.count, items
+
+
+def list_columns(item):
+    """What the list templates show, from either kind of item"""
+    if isinstance(item, Match):
+        return (item.match_id, item.request.title, item.pin.first_name, item.pin.last_name,
+                item.csr_rep.first_name, item.service_type, item.completed_at)
+    return (item.match_id, item.request_title, item.pin_first_name, item.pin_last_name,
+            item.csr_rep_first_name, item.service_type, item.completed_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, default=10000)
+    parser.add_argument("--pins", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    engine, session, path = create_scratch_database()
+    try:
+        print(f"Seeding {args.matches} completed matches...")
+        csr_id = seed(session, args.matches, args.pins)
+
+        print(f"{'rows':>8}{'mode':>6}{'median ms':>11}{'peak KiB':>11}{'statements':>12}")
+        for page_size in (args.page_size, args.matches):
+            results = {}
+            for mode in ("full", "lean"):
+                ms, kib, statements, items = measure(session, engine, csr_id, page_size, mode == "lean", args.repeats)
+                results[mode] = [list_columns(item) for item in items]
+                print(f"{page_size:>8}{mode:>6}{ms:>11.1f}{kib:>11.0f}{statements:>12}")
+                session.expunge_all()
+            assert results["full"] == results["lean"], f"lean rows differ from full rows at {page_size}"
+    finally:
+        session.close()
+        engine.dispose()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: password hashing under a login burst
+Runs --logins threads that check a bcrypt password in a loop while one
+"page" thread serves a small CPU-bound task, for each PasswordHasher executor
+(inline on the calling thread, thread pool, process pool), and reports login
+throughput, rejected logins, the page task's latency and the hasher's queue
+wait / hash time.
+
+Usage:
+    python -m benchmarks.bench_password_hashing [--logins 32] [--seconds 5] [--rounds 12] [--max-queue 8]
+"""
+
+import argparse
+import threading
+import time
+
+import bcrypt
+
+from controllers.passwordHasher import PasswordHasher, PasswordHasherBusy, _summary
+
+PASSWORD = "bench123"
+EXECUTORS = ("inline", "thread", "process")
+
+
+def page_task():
+    """Stand-in for rendering a page that needs no password hashing"""
+    return sum(i * i for i in range(20000))
+
+
+def run(executor, args, password_hash):
+    hasher = PasswordHasher(max_queue=args.max_queue, rounds=args.rounds, executor=executor)
+    # Warm the pool so worker start-up is not timed
+    hasher.check(PASSWORD, password_hash)
+    stop = threading.Event()
+    logins, rejected, page_times = [0], [0], []
+    lock = threading.Lock()
+
+    def login_loop():
+        while not stop.is_set():
+            try:
+                ok = hasher.check(PASSWORD, password_hash)
+            except PasswordHasherBusy:
+                with lock:
+                    rejected[0] += 1
+                time.sleep(0.05)
+                continue
+            assert ok
+            with lock:
+                logins[0] += 1
+
+    def page_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            page_task()
+            page_times.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(args.logins)]
+    threads.append(threading.Thread(target=page_loop))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    stats = hasher.stats()
+    hasher.shutdown()
+    page = _summary(page_times)
+    print(f"{executor:<9}{logins[0] / args.seconds:>10.1f}{rejected[0]:>10}"
+          f"{page['p50_ms']:>11.1f}{page['p95_ms']:>11.1f}"
+          f"{stats['queue_wait']['p95_ms']:>13.1f}{stats['hash_time']['p50_ms']:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login threads")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--max-queue", type=int, default=8, help="waiting hashes allowed per pool")
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=args.rounds)).decode()
+    print(f"{args.logins} login threads, {args.seconds:g}s per executor, work factor {args.rounds}")
+    print(f"{'executor':<9}{'logins/s':>10}{'rejected':>10}{'page p50':>11}{'page p95':>11}"
+          f"{'q-wait p95':>13}{'hash p50':>12}   (ms)")
+    for executor in EXECUTORS:
+        run(executor, args, password_hash)
+
+
+if __name__ == "__main__":
+    main()
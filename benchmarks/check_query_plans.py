@@ -0,0 +1,165 @@
+"""
+Query Plan Check
+Runs the hot entity queries against a scratch database and asserts, via
+EXPLAIN QUERY PLAN, that none of them falls back to a full table scan of the
+large tables. Exits non-zero when a plan regresses, so it can gate CI.
+
+Usage:
+    python -m benchmarks.check_query_plans [--verbose]
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+
+from benchmarks.common import create_scratch_database
+from entities.category import Category
+from entities.daily_stat import DailyStat
+from entities.match import Match
+from entities.request import Request
+from entities.shortlist import Shortlist
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+# Tables big enough that a full scan on a hot path is a regression
+GUARDED_TABLES = ('matches', 'requests', 'shortlists', 'user_accounts')
+
+
+def seed(session, rows=200):
+    """A small but complete data set so every query shape has something to plan against"""
+    now = datetime.now()
+    profile = UserProfile(profile_name="PIN", description="Plan check", is_active=True)
+    session.add(profile)
+    session.flush()
+    pin, csr = (
+        UserAccount(username=name, email=f"{name}@example.com", password_hash="x",
+                    first_name=name, last_name="User", user_profile_id=profile.id)
+        for name in ("pin", "csr")
+    )
+    session.add_all([pin, csr])
+    session.flush()
+    category = Category(created_by=pin.id, title="Category", description="Plan check")
+    session.add(category)
+    session.flush()
+
+    for i in range(rows):
+        created_at = now - timedelta(days=i % 60)
+        request = Request(user_account_id=pin.id, category_id=category.category_id, title=f"Request {i}",
+                          description="Plan check", status="Completed" if i % 2 else "Pending",
+                          created_at=created_at, updated_at=created_at)
+        session.add(request)
+        session.flush()
+        session.add(Shortlist(request_id=request.request_id, csr_rep_id=csr.id, shortlisted_at=created_at))
+        session.add(Match(request_id=request.request_id, pin_id=pin.id, csr_rep_id=csr.id,
+                          status="Completed", service_type="Plan check",
+                          created_at=created_at, completed_at=created_at + timedelta(hours=1)))
+    session.commit()
+    return pin.id, csr.id, category.category_id
+
+
+def hot_queries(pin_id, csr_id, category_id):
+    """(label, callable(session)) for every query shape on a hot path"""
+    today = date.today()
+    month_ago = today - timedelta(days=30)
+    return [
+        ("Match.findCompletedByPin", lambda s: Match.findCompletedByPin(s, pin_id, page=3)),
+        ("Match.findCompletedByPinWithFilters", lambda s: Match.findCompletedByPinWithFilters(
+            s, pin_id, serviceType="Plan check", fromDate=month_ago, toDate=today)),
+        ("Match.findCompletedByCSR", lambda s: Match.findCompletedByCSR(s, csr_id, page=3)),
+        ("Match.findCompletedByCSR (cursor)", lambda s: Match.findCompletedByCSR(
+            s, csr_id, cursor=Match.encodeCursor(Match.findCompletedByCSR(s, csr_id)[0][-1]))),
+        ("Match.findCompletedByCSRWithFilters", lambda s: Match.findCompletedByCSRWithFilters(
+            s, csr_id, serviceType="Plan check", fromDate=month_ago, toDate=today)),
+        ("Match.countServiceTypes (pin)", lambda s: Match.countServiceTypes(s, "pin", pin_id)),
+        ("Match.countServiceTypes (csr)", lambda s: Match.countServiceTypes(s, "csr", csr_id)),
+        ("Match.getDetailVersion", lambda s: Match.getDetailVersion(s, 1)),
+        ("Shortlist.checkIfShortlisted", lambda s: Shortlist.checkIfShortlisted(s, 1, csr_id)),
+        ("Shortlist.countShortlistsForRequest", lambda s: Shortlist.countShortlistsForRequest(s, 1)),
+        ("Shortlist.countShortlistsForUser", lambda s: Shortlist.countShortlistsForUser(s, pin_id)),
+        ("Shortlist.countShortlistsForUser (page)", lambda s: Shortlist.countShortlistsForUser(
+            s, pin_id, range(1, 21))),
+        ("Shortlist.getShortlistedRequestIds", lambda s: Shortlist.getShortlistedRequestIds(
+            s, csr_id, range(1, 50))),
+        ("Shortlist.searchShortlist", lambda s: Shortlist.searchShortlist(s, csr_id, None, category_id)),
+        ("Shortlist.findShortlists (keyword)", lambda s: Shortlist.findShortlists(
+            s, csr_id, keyword="request 1", categoryID=category_id)),
+        ("Request.findRequests (owner)", lambda s: Request.findRequests(s, ownerID=pin_id, status="pending")),
+        ("Request.findRequests (keyword)", lambda s: Request.findRequests(s, keyword="request 1", status="pending")),
+        ("DailyStat.rebuildRange", lambda s: DailyStat.rebuildRange(s, month_ago, today)),
+    ]
+
+
+class StatementRecorder:
+    """Collects the SELECT statements an engine executes while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
+
+
+def full_scans(connection, statement, parameters):
+    """Return (plan, offending plan lines) for one statement"""
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    plan = [row[-1] for row in rows]
+    offending = [
+        detail for detail in plan
+        if detail.startswith("SCAN ") and detail.split()[1] in GUARDED_TABLES
+    ]
+    return plan, offending
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    engine, session, path = create_scratch_database()
+    failures = 0
+    try:
+        ids = seed(session)
+        for label, run in hot_queries(*ids):
+            with StatementRecorder(engine) as recorder:
+                run(session)
+            session.rollback()
+
+            label_failures = 0
+            with engine.connect() as connection:
+                for statement, parameters in recorder.statements:
+                    plan, offending = full_scans(connection, statement, parameters)
+                    if offending:
+                        label_failures += 1
+                        print(f"FAIL {label}: {'; '.join(offending)}")
+                        print(f"     {' '.join(statement.split())}")
+                    elif args.verbose:
+                        print(f"ok   {label}: {'; '.join(plan)}")
+            if not label_failures and not args.verbose:
+                print(f"ok   {label}")
+            failures += label_failures
+    finally:
+        session.close()
+        engine.dispose()
+        os.remove(path)
+
+    if failures:
+        print(f"{failures} statement(s) scan a guarded table")
+        sys.exit(1)
+    print("All hot queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark Helpers
+Scratch database setup, query counting and timing shared by the benchmark scripts
+"""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from database.db_config import Base, create_db_engine
+
+
+def create_scratch_database(path=None, **engine_options):
+    """
+    Create an empty database with every entity table in a scratch file,
+    using the application's engine settings (engine_options override them)
+
+    Returns:
+        tuple: (engine, session, path) - the caller owns the session and the file
+    """
+    import entities  # noqa: F401  (registers every model with Base)
+
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="csr_bench_", suffix=".db")
+        os.close(fd)
+        os.remove(path)
+
+    engine = create_db_engine(f"sqlite:///{path}", **engine_options)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    return engine, session, path
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
+
+
+@contextmanager
+def timed(results, label):
+    """Record wall-clock milliseconds for the enclosed block under results[label]"""
+    start = time.perf_counter()
+    yield
+    results[label] = (time.perf_counter() - start) * 1000.0
@@ -0,0 +1,348 @@
+"""
+Load Test
+Seeds a scratch database with database/bulk_seed.py, then drives the Flask
+app with concurrent logged-in sessions per role and reports, per route:
+calls, throughput, p50 / p95 / p99 latency, SQL statements per call (from
+database/query_stats.py) and errors.
+
+    PIN               /requests, /requests/search, /completed-history
+    CSR Rep           /requests, /requests/search, /shortlists, /csr/completed-history
+    User Admin        /user-accounts, /user-accounts/search
+    Platform Manager  /reports/daily, /reports/weekly, /reports/monthly, /categories
+
+Sessions go through Flask's test client (default) or, with --server, real
+HTTP requests to a local threaded WSGI server.
+
+Results are compared with the stored baseline (benchmarks/baselines/load_test.json)
+when one exists; the run fails (exit 1) when a route issues more SQL
+statements per call than the baseline, or both its p50 and p95 grow by
+more than --tolerance. Latency depends on the machine, so refresh the baseline with
+--update-baseline when moving to a new one.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 4] [--seconds 20] [--requests 50000] [--server]
+    python -m benchmarks.load_test --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from http.cookiejar import CookieJar
+
+from sqlalchemy import select
+
+import database.db_config as db_config
+from benchmarks.common import create_scratch_database
+from database.bulk_seed import BulkSeeder
+from database.query_stats import route_stats
+from entities.user_account import UserAccount
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "load_test.json")
+KEYWORDS = ["help", "medical", "grocery", "clean", "tech+support", "garden"]  # URL-encoded
+STATUSES = ["", "pending", "completed"]
+BULK_PASSWORD = "bulk123"
+LOGIN_ATTEMPTS = 10
+# Routes with fewer measured calls are too noisy to gate on latency
+MIN_CALLS_FOR_LATENCY = 30
+
+# Role -> [(weight, path factory)]: the mix of pages each session of that role requests
+SCENARIOS = {
+    "PIN": [
+        (4, lambda rng: f"/requests?page={rng.randint(1, 5)}"),
+        (3, lambda rng: f"/requests/search?keyword={rng.choice(KEYWORDS)}&status={rng.choice(STATUSES)}"),
+        (2, lambda rng: f"/completed-history?page={rng.randint(1, 3)}"),
+    ],
+    "CSR Rep": [
+        (3, lambda rng: f"/requests?page={rng.randint(1, 20)}"),
+        (3, lambda rng: f"/requests/search?keyword={rng.choice(KEYWORDS)}"),
+        (2, lambda rng: f"/shortlists?page={rng.randint(1, 3)}"),
+        (1, lambda rng: f"/shortlists?keyword={rng.choice(KEYWORDS)}"),
+        (2, lambda rng: f"/csr/completed-history?page={rng.randint(1, 5)}"),
+    ],
+    "User Admin": [
+        (3, lambda rng: f"/user-accounts?page={rng.randint(1, 20)}&sort={rng.choice(['id', 'name', 'created'])}"),
+        (2, lambda rng: f"/user-accounts/search?keyword={rng.choice(['smith', 'maria', 'jhon', 'tan'])}"),
+    ],
+    "Platform Manager": [
+        (2, lambda rng: "/reports/daily"),
+        (2, lambda rng: "/reports/weekly"),
+        (2, lambda rng: "/reports/monthly"),
+        (1, lambda rng: f"/categories?page={rng.randint(1, 3)}"),
+    ],
+}
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class TestClientSession:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def login(self, username, password):
+        response = self.client.post("/login", data={"username": username, "password": password})
+        return response.status_code == 302 and "/login" not in response.headers.get("Location", "")
+
+    def get(self, path):
+        """True when the page rendered (redirects mean the session was rejected)"""
+        return self.client.get(path).status_code == 200
+
+
+class HTTPSession:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+    def login(self, username, password):
+        data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+        with self.opener.open(self.base_url + "/login", data=data) as response:
+            response.read()
+            return "/login" not in response.geturl()
+
+    def get(self, path):
+        try:
+            with self.opener.open(self.base_url + path) as response:
+                response.read()
+                return response.status == 200 and "/login" not in response.geturl()
+        except urllib.error.HTTPError:
+            return False
+
+
+def seed(engine, args):
+    """Initial accounts plus a bulk data set; returns usernames per role"""
+    from database.init_db import seed_initial_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_initial_data()
+        seeder = BulkSeeder(bind=engine, seed=args.seed, password=BULK_PASSWORD)
+        seeder.seedUsers(args.users)
+        seeder.seedCategories(args.categories)
+        seeder.seedRequests(args.requests)
+        seeder.seedShortlists(args.shortlists)
+        seeder.seedMatches(args.matches)
+        seeder.finish()
+
+    with engine.connect() as conn:
+        def usernames(pattern):
+            return list(conn.execute(
+                select(UserAccount.username).where(UserAccount.username.like(pattern), UserAccount.is_active)
+                .order_by(UserAccount.id).limit(args.sessions)
+            ).scalars())
+        return {
+            "PIN": [(name, BULK_PASSWORD) for name in usernames("bulkpin%")],
+            "CSR Rep": [(name, BULK_PASSWORD) for name in usernames("bulkcsr%")],
+            "User Admin": [("admin", "admin123")] * args.sessions,
+            "Platform Manager": [("pm", "pm123")] * args.sessions,
+        }
+
+
+def worker(make_session, role, credentials, index, start_at, deadline, results, lock):
+    rng = random.Random(f"{role}:{index}")
+    weighted = [factory for weight, factory in SCENARIOS[role] for _ in range(weight)]
+    client = make_session()
+    # Simultaneous logins can overflow the password hashing queue; back off and retry
+    for attempt in range(LOGIN_ATTEMPTS):
+        if client.login(*credentials):
+            break
+        time.sleep(0.2 * (attempt + 1))
+    else:
+        with lock:
+            results["login_failures"] += 1
+        return
+    latencies, errors = defaultdict(list), defaultdict(int)
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        path = rng.choice(weighted)(rng)
+        route = urllib.parse.urlsplit(path).path
+        start = time.perf_counter()
+        try:
+            ok = client.get(path)
+        except Exception:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if start < start_at:
+            continue  # warm-up
+        latencies[route].append(elapsed)
+        if not ok:
+            errors[route] += 1
+    with lock:
+        for route, values in latencies.items():
+            results["latencies"][route].extend(values)
+        for route, count in errors.items():
+            results["errors"][route] += count
+
+
+def run_load(app, accounts, args):
+    server = None
+    if args.server:
+        from werkzeug.serving import make_server
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        make_session = lambda: HTTPSession(base_url)  # noqa: E731
+    else:
+        make_session = lambda: TestClientSession(app)  # noqa: E731
+
+    results = {"latencies": defaultdict(list), "errors": defaultdict(int), "login_failures": 0}
+    lock = threading.Lock()
+    start_at = time.perf_counter() + args.warmup
+    deadline = start_at + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(make_session, role, credentials, i, start_at, deadline, results, lock))
+        for role, logins in accounts.items()
+        for i, credentials in enumerate(logins)
+    ]
+    try:
+        # The boundaries print debug output; redirect once here, not per thread
+        with contextlib.redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            time.sleep(max(0.0, start_at - time.perf_counter()))
+            route_stats.reset()
+            for thread in threads:
+                thread.join()
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    queries = route_stats.snapshot()
+    report = {}
+    for route, values in sorted(results["latencies"].items()):
+        ordered = sorted(values)
+        report[route] = {
+            "calls": len(ordered),
+            "rps": round(len(ordered) / args.seconds, 2),
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "queries": queries.get(route, {}).get("queries_per_request", 0.0),
+            "errors": results["errors"].get(route, 0),
+        }
+    return report, results["login_failures"]
+
+
+def print_report(report, baseline_routes):
+    print(f"{'route':<26}{'calls':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'SQL':>7}{'errors':>8}"
+          f"{'base p95':>10}{'base SQL':>10}")
+    for route, row in report.items():
+        base = baseline_routes.get(route, {})
+        print(f"{route:<26}{row['calls']:>8}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['p99_ms']:>9.1f}{row['queries']:>7.1f}{row['errors']:>8}"
+              f"{base.get('p95_ms', float('nan')):>10.1f}{base.get('queries', float('nan')):>10.1f}")
+    total = sum(row["calls"] for row in report.values())
+    print(f"{'total':<26}{total:>8}{sum(row['rps'] for row in report.values()):>9.1f}   (latency in ms)")
+
+
+def find_regressions(report, baseline_routes, tolerance, min_delta_ms):
+    regressions = []
+    for route, row in report.items():
+        base = baseline_routes.get(route)
+        if base is None:
+            continue
+        if row["queries"] > base["queries"] + 0.5:
+            regressions.append(f"{route}: {row['queries']:.1f} SQL statements per call (baseline {base['queries']:.1f})")
+        # A single slow tail sample is noise; a real slowdown moves the median as well
+        slower = row["calls"] >= MIN_CALLS_FOR_LATENCY and all(
+            row[key] > base[key] * (1 + tolerance) and row[key] - base[key] > min_delta_ms
+            for key in ("p50_ms", "p95_ms")
+        )
+        if slower:
+            regressions.append(f"{route}: p50 / p95 {row['p50_ms']:.1f} / {row['p95_ms']:.1f} ms "
+                               f"(baseline {base['p50_ms']:.1f} / {base['p95_ms']:.1f} ms)")
+        if row["errors"]:
+            regressions.append(f"{route}: {row['errors']} failed calls")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent sessions per role")
+    parser.add_argument("--seconds", type=float, default=20, help="measured duration")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before that")
+    parser.add_argument("--server", action="store_true", help="use a local HTTP server instead of the test client")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--shortlists", type=int, default=20000)
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative p50 / p95 growth")
+    parser.add_argument("--min-delta-ms", type=float, default=5, help="ignore latency growth below this")
+    args = parser.parse_args()
+
+    engine, session, path = create_scratch_database()
+    session.close()
+    db_config.SessionLocal.configure(bind=engine)
+    db_config.session.remove()
+    try:
+        started = time.perf_counter()
+        accounts = seed(engine, args)
+        db_config.session.remove()
+        print(f"Seeded {args.users} accounts, {args.requests} requests, {args.shortlists} shortlists, "
+              f"{args.matches} matches in {time.perf_counter() - started:.1f}s")
+
+        from app import app
+        # Slow / N+1 request warnings would interleave with the report
+        logging.getLogger("database.query_stats").setLevel(logging.ERROR)
+        print(f"{args.sessions} sessions per role, {args.seconds:g}s after {args.warmup:g}s warm-up, "
+              f"{'HTTP server' if args.server else 'test client'}")
+        report, login_failures = run_load(app, accounts, args)
+    finally:
+        db_config.session.remove()
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline.get("routes", {}))
+    if login_failures:
+        print(f"{login_failures} session(s) could not log in")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        config = {key: getattr(args, key) for key in
+                  ("sessions", "seconds", "server", "users", "categories", "requests", "shortlists", "matches", "seed")}
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "routes": report}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    regressions = find_regressions(report, baseline.get("routes", {}), args.tolerance, args.min_delta_ms)
+    if login_failures:
+        regressions.append(f"{login_failures} session(s) could not log in")
+    if regressions:
+        print("Regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    if baseline:
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
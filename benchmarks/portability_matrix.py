@@ -0,0 +1,263 @@
+"""
+Backend Portability Matrix
+Runs the hot entity queries against every configured database backend and
+checks that they return the same answers: history order (NULL completed_at
+last) in page and cursor mode, case-insensitive search, the daily_stats
+rebuild, batched view counts and the shortlist unique index.
+
+Backends:
+    - SQLite (scratch file, always)
+    - every --url / DATABASE_TEST_URLS (comma separated) URL; the database
+      must be empty, tables are created and dropped by this script
+    - a throwaway PostgreSQL cluster when initdb and pg_ctl are on PATH and a
+      driver (psycopg2, psycopg or pg8000) is installed; skipped otherwise
+
+Usage:
+    python -m benchmarks.portability_matrix [--url postgresql+psycopg2://...] [--no-local-postgres]
+"""
+
+import argparse
+import getpass
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from database.db_config import Base, create_db_engine
+from entities.category import Category
+from entities.daily_stat import DailyStat
+from entities.match import Match
+from entities.request import Request
+from entities.shortlist import Shortlist
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+POSTGRES_DRIVERS = ("psycopg2", "psycopg", "pg8000")
+MATCHES = 25
+PAGE_SIZE = 4
+
+
+def seed(session):
+    """One PIN, one CSR Rep, a category, two requests and MATCHES completed matches (two without completed_at)"""
+    now = datetime.now().replace(microsecond=0)
+    profile = UserProfile(profile_name="Portability", description="Matrix", is_active=True)
+    session.add(profile)
+    session.flush()
+    pin = UserAccount(username="pinuser", email="pin@example.com", password_hash="x",
+                      first_name="Pat", last_name="Smith", user_profile_id=profile.id)
+    csr = UserAccount(username="csruser", email="csr@example.com", password_hash="x",
+                      first_name="Casey", last_name="Jones", user_profile_id=profile.id)
+    session.add_all([pin, csr])
+    session.flush()
+    category = Category(created_by=pin.id, title="Groceries", description="Matrix")
+    session.add(category)
+    session.flush()
+    requests = [
+        Request(user_account_id=pin.id, category_id=category.category_id, title="Weekly Grocery Run",
+                description="Matrix", status="Pending", created_at=now, updated_at=now),
+        Request(user_account_id=pin.id, category_id=category.category_id, title="Ride to clinic",
+                description="Matrix", status="Completed", created_at=now, updated_at=now),
+    ]
+    session.add_all(requests)
+    session.flush()
+    for i in range(MATCHES):
+        created_at = now - timedelta(days=i // 3)
+        # Repeated completed_at values exercise the cursor tie-breakers
+        completed_at = None if i in (7, 19) else created_at + timedelta(hours=i % 2)
+        session.add(Match(request_id=requests[1].request_id, pin_id=pin.id, csr_rep_id=csr.id,
+                          status="Completed", service_type="Ride", created_at=created_at,
+                          completed_at=completed_at))
+    session.commit()
+    return pin.id, csr.id, requests
+
+
+def expected_history(session, csr_id):
+    """History order computed in Python: newest completion first, NULL last, then created_at, match_id"""
+    matches = session.query(Match).filter(Match.csr_rep_id == csr_id).all()
+    dated = sorted((m for m in matches if m.completed_at is not None),
+                   key=lambda m: (m.completed_at, m.created_at, m.match_id), reverse=True)
+    undated = sorted((m for m in matches if m.completed_at is None),
+                     key=lambda m: (m.created_at, m.match_id), reverse=True)
+    return [m.match_id for m in dated + undated]
+
+
+def check_history(session, pin_id, csr_id, requests):
+    expected = expected_history(session, csr_id)
+
+    paged = []
+    for page in range(1, MATCHES // PAGE_SIZE + 2):
+        items, total = Match.findCompletedByCSR(session, csr_id, page=page, page_size=PAGE_SIZE)
+        paged.extend(m.match_id for m in items)
+    assert total == MATCHES, f"total {total} != {MATCHES}"
+    assert paged == expected, f"page order {paged} != {expected}"
+
+    items, _ = Match.findCompletedByCSR(session, csr_id, page_size=PAGE_SIZE)
+    forward, pages = [m.match_id for m in items], []
+    cursor = Match.encodeCursor(items[-1], "next")
+    while cursor:
+        items, _, cursors = Match.findCompletedByCSR(session, csr_id, page_size=PAGE_SIZE, cursor=cursor)
+        pages.append(items)
+        forward.extend(m.match_id for m in items)
+        cursor = cursors["next"]
+    assert forward == expected, f"cursor order {forward} != {expected}"
+
+    backward = []
+    cursor = Match.encodeCursor(pages[-1][0], "prev")
+    while cursor:
+        items, _, cursors = Match.findCompletedByCSR(session, csr_id, page_size=PAGE_SIZE, cursor=cursor)
+        backward[:0] = [m.match_id for m in items]
+        cursor = cursors["prev"]
+    backward.extend(m.match_id for m in pages[-1])
+    assert backward == expected, f"reverse cursor order {backward} != {expected}"
+
+
+def check_search(session, pin_id, csr_id, requests):
+    found = {u.username for u in UserAccount.searchUserAccount(session, "CASEY", None, None)}
+    assert found == {"csruser"}, f"account search found {found}"
+    found = {p.profile_name for p in UserProfile.searchUserProfile(session, "portab", None)}
+    assert found == {"Portability"}, f"profile search found {found}"
+    items, total = Request.findRequests(session, keyword="grocery")
+    assert total == 1 and items[0].title == "Weekly Grocery Run", f"request search found {total}"
+
+
+def check_daily_stats(session, pin_id, csr_id, requests):
+    today = date.today()
+    DailyStat.rebuildRange(session, today - timedelta(days=MATCHES // 3 + 1), today)
+    session.commit()
+    rows = session.query(DailyStat).all()
+    assert sum(row.new_matches for row in rows) == MATCHES, "new_matches rollup mismatch"
+    assert sum(row.new_requests for row in rows) == len(requests), "new_requests rollup mismatch"
+
+
+def check_view_counts(session, pin_id, csr_id, requests):
+    before = {r.request_id: (r.view_count or 0, r.updated_at) for r in requests}
+    Request.addViews(session, {requests[0].request_id: 3, requests[1].request_id: 1})
+    session.commit()
+    for request in requests:
+        session.refresh(request)
+    assert requests[0].view_count == before[requests[0].request_id][0] + 3, "view_count not incremented"
+    assert requests[1].updated_at == before[requests[1].request_id][1], "addViews touched updated_at"
+
+
+def check_shortlist_unique(session, pin_id, csr_id, requests):
+    request_id = requests[0].request_id
+    assert Shortlist.createShortlist(session, request_id, csr_id) == 2, "first shortlist rejected"
+    session.add(Shortlist(request_id=request_id, csr_rep_id=csr_id, shortlisted_at=datetime.now()))
+    try:
+        session.commit()
+    except Exception:
+        session.rollback()
+    else:
+        raise AssertionError("duplicate shortlist was accepted")
+
+
+CHECKS = [
+    ("history order", check_history),
+    ("case-insensitive search", check_search),
+    ("daily stats rebuild", check_daily_stats),
+    ("batched view counts", check_view_counts),
+    ("shortlist unique index", check_shortlist_unique),
+]
+
+
+def run_backend(label, url):
+    """Run every check on one backend; returns the number of failures"""
+    import entities  # noqa: F401  (registers every model with Base)
+
+    engine = create_db_engine(url)
+    failures = 0
+    try:
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine, autoflush=False)()
+        try:
+            ids = seed(session)
+            for name, check in CHECKS:
+                try:
+                    check(session, *ids)
+                    print(f"ok   {label:<12} {name}")
+                except Exception as e:
+                    session.rollback()
+                    failures += 1
+                    print(f"FAIL {label:<12} {name}: {e}")
+        finally:
+            session.close()
+            Base.metadata.drop_all(bind=engine)
+    finally:
+        engine.dispose()
+    return failures
+
+
+@contextmanager
+def local_postgres():
+    """
+    Yield a URL for a throwaway PostgreSQL cluster, or None when the server
+    binaries or a driver are not available
+    """
+    initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+    driver = next((name for name in POSTGRES_DRIVERS if importlib.util.find_spec(name)), None)
+    if not (initdb and pg_ctl and driver):
+        yield None
+        return
+
+    data_dir = tempfile.mkdtemp(prefix="csr_pg_")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    user = getpass.getuser()
+    subprocess.run([initdb, "-D", data_dir, "-U", user, "--auth=trust"], check=True, capture_output=True)
+    subprocess.run([pg_ctl, "-D", data_dir, "-w", "-l", os.path.join(data_dir, "server.log"),
+                    "-o", f"-p {port} -k {data_dir} -c listen_addresses=127.0.0.1", "start"],
+                   check=True, capture_output=True)
+    try:
+        time.sleep(0.5)
+        yield f"postgresql+{driver}://{user}@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run([pg_ctl, "-D", data_dir, "-m", "fast", "stop"], capture_output=True)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", default=[], help="extra backend URL (repeatable)")
+    parser.add_argument("--no-local-postgres", action="store_true", help="do not launch a local PostgreSQL")
+    args = parser.parse_args()
+
+    urls = args.url + [url for url in os.environ.get("DATABASE_TEST_URLS", "").split(",") if url.strip()]
+
+    fd, path = tempfile.mkstemp(prefix="csr_matrix_", suffix=".db")
+    os.close(fd)
+    os.remove(path)
+    failures = 0
+    try:
+        failures += run_backend("sqlite", f"sqlite:///{path}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    for url in urls:
+        failures += run_backend(url.split(":", 1)[0], url.strip())
+
+    if not args.no_local_postgres:
+        with local_postgres() as url:
+            if url is None:
+                print(f"skip local postgres: needs initdb, pg_ctl and one of {', '.join(POSTGRES_DRIVERS)}")
+            else:
+                failures += run_backend("postgres", url)
+
+    if failures:
+        print(f"{failures} check(s) failed")
+        sys.exit(1)
+    print("All backends agree")
+
+
+if __name__ == "__main__":
+    main()
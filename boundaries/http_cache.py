@@ -0,0 +1,96 @@
+"""
+HTTP Cache
+Conditional GET for read-heavy pages: ETags and 304 Not Modified
+
+A route decorated with conditional_get(version) answers a GET whose
+If-None-Match holds the page's current ETag with an empty 304, without running
+the view (no page query, no template rendering):
+
+    @app.route('/categories')
+    @require_login
+    @conditional_get(listCategoryUI.pageVersion)
+    def listCategories():
+        ...
+
+version is called with the route's arguments and returns a value that changes
+whenever the rendered page would (e.g. the updated_at of the rows it shows),
+or None when the page should not be cached (not found, not authorised). The
+ETag hashes that value with what else the page depends on: the logged-in user
+(base.html shows their name and role), the URL and the templates.
+
+Pages are private to the logged-in user and must be revalidated on every use,
+so responses carry Cache-Control: private, no-cache and Vary: Cookie. A
+request with flash messages waiting is never answered with a 304, so the
+messages are shown.
+"""
+
+import hashlib
+import os
+from functools import lru_cache, wraps
+
+from flask import current_app, request, session
+
+# Send ETags and answer conditional GETs with 304 Not Modified
+HTTP_ETAGS = os.environ.get("HTTP_ETAGS", "1").lower() in ("1", "true", "yes")
+
+CACHE_CONTROL = "private, no-cache"
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+@lru_cache(maxsize=1)
+def _templates_fingerprint():
+    """Hash of every template, so ETags change when a deploy changes a page's markup"""
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(TEMPLATE_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, TEMPLATE_DIR).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def page_etag(value):
+    """ETag of the current request's page for version value"""
+    key = (
+        _templates_fingerprint(),
+        request.full_path,
+        session.get('user_id'),
+        session.get('username'),
+        session.get('user_profile'),
+        value,
+    )
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def _set_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Cookie')
+
+
+def conditional_get(version):
+    """Decorator: ETag the view's page from version(*args, **kwargs) and answer matching GETs with 304"""
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            if not HTTP_ETAGS or request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+                return view(*args, **kwargs)
+            value = version(*args, **kwargs)
+            if value is None:
+                return view(*args, **kwargs)
+
+            etag = page_etag(value)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+                _set_cache_headers(response, etag)
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _set_cache_headers(response, etag)
+            return response
+        return decorated_function
+    return decorator
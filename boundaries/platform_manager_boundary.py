@@ -1,4 +1,4 @@
-from flask import render_template, request, redirect, url_for, flash
+from flask import render_template, request, redirect, url_for, flash, jsonify, g
 from database.db_config import close_session
 from controllers.authentication_controller import AuthenticationController
 from controllers.Category.createCategoryCtrl import CreateCategoryCtrl
@@ -9,17 +9,45 @@ from controllers.Category.searchCategoryCtrl import SearchCategoryCtrl
 from controllers.PM.createDailyReportCtrl import CreateDailyReportCtrl
 from controllers.PM.createWeeklyReportCtrl import CreateWeeklyReportCtrl
 from controllers.PM.createMonthlyReportCtrl import CreateMonthlyReportCtrl
+from controllers.PM.reportCache import report_cache
 from datetime import datetime
 
+
+def _reportDateParam():
+    """(date, valid) from the date argument: YYYY-MM-DD or YYYY-MM (None = today)"""
+    date_param = request.args.get('date', None)
+    if not date_param:
+        return None, True
+    for value in (date_param, f"{date_param}-01"):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date(), True
+        except ValueError:
+            pass
+    return None, False
+
+
+def _oncePerRequest(load, *args):
+    """load(*args), run once per request: the page's ETag version and the page share the result"""
+    results = g.setdefault('page_data', {})
+    key = (load, args)
+    if key not in results:
+        results[key] = load(*args)
+    return results[key]
+
+
 class ListCategoryUI:
     def __init__(self):
         self.c = ViewCategoryCtrl()
 
     def DisplayPage(self):
-        categories = self.c.listCategories()
+        categories = _oncePerRequest(self.c.listCategories)
         close_session()
         return render_template('categories/list.html', categories=categories)
 
+    def pageVersion(self):
+        """Every listed category's ID and updated_at, from the list query the page renders"""
+        return tuple((category.category_id, category.updated_at) for category in _oncePerRequest(self.c.listCategories))
+
 class CreateCategoryUI:
     def __init__(self):
         self.a = AuthenticationController()
@@ -53,7 +81,7 @@ class ViewCategoryUI:
     def viewCategory(self, category_id):
         current_user = self.a.get_current_user()
         user_profile = current_user.user_profile.profile_name if current_user else None
-        category = self.c.viewCategory(category_id)
+        category = self.c.viewCategory(category_id, view='detail')
         if not category:  # Not found
             flash(f"Category with ID {category_id} not found", 'error')
             return redirect(url_for('listCategories'))
@@ -61,6 +89,9 @@ class ViewCategoryUI:
         render = render_template('categories/view.html', category=category, user_profile=user_profile)
         close_session()
         return render
+
+    def pageVersion(self, category_id):
+        return self.c.getCategoryVersion(category_id)
     
 class UpdateCategoryUI:
     def __init__(self):
@@ -154,21 +185,18 @@ class DailyReportUI:
 
     def handle_create_daily_report(self):
         """Generate daily report"""
-        date_param = request.args.get('date', None)
-        report_date = None
-        if date_param:
-            try:
-                report_date = datetime.strptime(date_param, '%Y-%m-%d').date()
-            except ValueError:
-                try:
-                    report_date = datetime.strptime(f"{date_param}-01", '%Y-%m-%d').date()
-                except ValueError:
-                    flash("Invalid date format. Use YYYY-MM or YYYY-MM-DD", 'error')
-                    report_date = None
-
-        report_data = self.c.createDailyReport(report_date)
+        report_date, valid = _reportDateParam()
+        if not valid:
+            flash("Invalid date format. Use YYYY-MM or YYYY-MM-DD", 'error')
+
+        report_data = _oncePerRequest(self.c.createDailyReport, report_date)
         return render_template('reports/daily.html', report=report_data)
 
+    def pageVersion(self):
+        """The report's figures, which are what the page shows (None for an invalid date)"""
+        report_date, valid = _reportDateParam()
+        return _oncePerRequest(self.c.createDailyReport, report_date) if valid else None
+
 
 class WeeklyReportUI:
     def __init__(self):
@@ -176,21 +204,18 @@ class WeeklyReportUI:
 
     def handle_create_weekly_report(self):
         """Generate weekly report"""
-        date_param = request.args.get('date', None)
-        report_date = None
-        if date_param:
-            try:
-                report_date = datetime.strptime(date_param, '%Y-%m-%d').date()
-            except ValueError:
-                try:
-                    report_date = datetime.strptime(f"{date_param}-01", '%Y-%m-%d').date()
-                except ValueError:
-                    flash("Invalid date format. Use YYYY-MM or YYYY-MM-DD", 'error')
-                    report_date = None
-
-        report_data = self.c.createWeeklyReport(report_date)
+        report_date, valid = _reportDateParam()
+        if not valid:
+            flash("Invalid date format. Use YYYY-MM or YYYY-MM-DD", 'error')
+
+        report_data = _oncePerRequest(self.c.createWeeklyReport, report_date)
         return render_template('reports/weekly.html', report=report_data)
 
+    def pageVersion(self):
+        """The report's figures, which are what the page shows (None for an invalid date)"""
+        report_date, valid = _reportDateParam()
+        return _oncePerRequest(self.c.createWeeklyReport, report_date) if valid else None
+
 
 class MonthlyReportUI:
     def __init__(self):
@@ -198,17 +223,20 @@ class MonthlyReportUI:
 
     def handle_create_monthly_report(self):
         """Generate monthly report"""
-        date_param = request.args.get('date', None)
-        report_date = None
-        if date_param:
-            try:
-                report_date = datetime.strptime(date_param, '%Y-%m-%d').date()
-            except ValueError:
-                try:
-                    report_date = datetime.strptime(f"{date_param}-01", '%Y-%m-%d').date()
-                except ValueError:
-                    flash("Invalid date format. Use YYYY-MM or YYYY-MM-DD", 'error')
-                    report_date = None
-
-        report_data = self.c.createMonthlyReport(report_date)
-        return render_template('reports/monthly.html', report=report_data)
\ No newline at end of file
+        report_date, valid = _reportDateParam()
+        if not valid:
+            flash("Invalid date format. Use YYYY-MM or YYYY-MM-DD", 'error')
+
+        report_data = _oncePerRequest(self.c.createMonthlyReport, report_date)
+        return render_template('reports/monthly.html', report=report_data)
+
+    def pageVersion(self):
+        """The report's figures, which are what the page shows (None for an invalid date)"""
+        report_date, valid = _reportDateParam()
+        return _oncePerRequest(self.c.createMonthlyReport, report_date) if valid else None
+
+
+class ReportCacheStatsUI:
+    def handle_view_cache_stats(self):
+        """Report cache hit/miss counters (JSON)"""
+        return jsonify(report_cache.stats())
@@ -27,31 +27,39 @@ class ListRequestUI:
         print("User:", current_user)
         user_profile_name = current_user.user_profile.profile_name if current_user else None
 
-        # Get requests based on user role
+        page = request.args.get('page', 1, type=int)
+
+        # Get one page of requests based on user role
         if user_profile_name == 'PIN':
             # PIN users only see requests they created
-            all_requests = self.c.listRequests()
-            requests = [req for req in all_requests if req.user_account_id == current_user.id]
+            requests, total_count, page_meta = self.c.listRequests(ownerID=current_user.id, page=page, view='list')
         else:
             # CSR Reps see all requests
-            requests = self.c.listRequests()
+            requests, total_count, page_meta = self.c.listRequests(page=page, view='list')
 
         # Get shortlist counts for PIN users
         shortlist_counts = {}
         csr_shortlisted = {}
 
         if user_profile_name == 'PIN':
-            shortlist_counts = self.v.getShortlistCountsForUser(current_user.id)
+            # Only the requests on this page
+            shortlist_counts = self.v.getShortlistCountsForUser(
+                current_user.id, [req.request_id for req in requests]
+            )
         elif user_profile_name == 'CSR Rep':
-            # Get CSR Rep's shortlist status for each request
-            for req in requests:
-                csr_shortlisted[req.request_id] = self.s.isShortlisted(req.request_id, current_user.id)
+            # Get CSR Rep's shortlist status for all listed requests in one lookup
+            shortlisted_ids = self.s.getShortlistedRequestIds(
+                [req.request_id for req in requests], current_user.id
+            )
+            csr_shortlisted = {req.request_id: req.request_id in shortlisted_ids for req in requests}
         
         # Pass user profile for template logic
         user_profile = user_profile_name
 
         render = render_template('requests/list.html', 
                                requests=requests,
+                               total_count=total_count,
+                               page_meta=page_meta,
                                shortlist_counts=shortlist_counts,
                                csr_shortlisted=csr_shortlisted,
                                user_profile=user_profile)
@@ -97,7 +105,7 @@ class ViewRequestUI:
         self.v = ViewShortlistCountCtrl()
 
     def viewRequest(self, request_id):
-        request_obj = self.c.viewRequest(request_id)
+        request_obj = self.c.viewRequest(request_id, view='detail')
         if not request_obj:
             flash(f"Request with ID {request_id} not found", 'error')
             return redirect(url_for('listRequests'))
@@ -108,7 +116,7 @@ class ViewRequestUI:
         shortlist_count = 0
 
         if current_user and current_user.user_profile.profile_name == 'CSR Rep':
-            is_shortlisted = self.s.isShortlisted(request_id, current_user.id)
+            is_shortlisted = request_id in self.s.getShortlistedRequestIds([request_id], current_user.id)
         elif current_user and current_user.user_profile.profile_name == 'PIN':
             # Get shortlist count for PIN users
             shortlist_count = self.v.getShortlistCount(request_id)
@@ -182,26 +190,40 @@ class SearchRequestUI:
     def __init__(self):
         self.a = AuthenticationController()
         self.c = SearchRequestCtrl()
+        self.s = ShortlistRequestCtrl()
 
     def onClick(self):
         keyword = request.args.get('keyword', '')
         status = request.args.get('status', '')
+        page = request.args.get('page', 1, type=int)
     
         current_user = self.a.get_current_user()
         user_profile = current_user.user_profile.profile_name if current_user else None
 
         if user_profile == 'PIN':
             # PIN users only search their own requests
-            all_requests = self.c.searchRequests(keyword or None, status)
-            requests = [req for req in all_requests if req.user_account_id == current_user.id]
+            requests, total_count, page_meta = self.c.searchRequests(
+                keyword or None, status, ownerID=current_user.id, page=page, view='search'
+            )
         else:
             # CSR Reps search all requests
-            requests = self.c.searchRequests(keyword or None, status)
+            requests, total_count, page_meta = self.c.searchRequests(keyword or None, status, page=page, view='search')
+
+        # CSR Rep's shortlist status for the results in one lookup
+        csr_shortlisted = {}
+        if user_profile == 'CSR Rep':
+            shortlisted_ids = self.s.getShortlistedRequestIds(
+                [req.request_id for req in requests], current_user.id
+            )
+            csr_shortlisted = {req.request_id: req.request_id in shortlisted_ids for req in requests}
         
         render = render_template('requests/search.html', 
                             requests=requests,
+                            total_count=total_count,
+                            page_meta=page_meta,
                             keyword=keyword,
                             status=status,
+                            csr_shortlisted=csr_shortlisted,
                             user_profile=user_profile)
         
         close_session()
@@ -212,7 +234,6 @@ class ViewCompletedHistoryUI:
     def __init__(self):
         self.a = AuthenticationController()
         self.c = ViewHistoryCtrl()
-        self.cat = ViewCategoryCtrl()
 
     def onClickHistory(self):
         current_user = self.a.get_current_user()
@@ -221,12 +242,12 @@ class ViewCompletedHistoryUI:
             return redirect(url_for('dashboard'))
         
         page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor') or None
 
-        items, total_count, page_meta = self.c.viewHistory(current_user.id, page)
+        items, total_count, page_meta = self.c.viewHistory(current_user.id, page, cursor)
         print ("Items: ", items)
 
-        categories = self.cat.listCategories()
-        service_types = [cat.title for cat in categories] if categories else []
+        facets = self.c.getServiceTypeFacets(current_user.id)
 
         render = render_template(
                     'completed_history/list.html',
@@ -234,7 +255,8 @@ class ViewCompletedHistoryUI:
                     total_count=total_count,
                     page_meta=page_meta,
                     user = current_user,
-                    service_types = service_types
+                    service_types = [service_type for service_type, _ in facets],
+                    service_type_counts = dict(facets)
         )
         close_session()
         return render
@@ -244,7 +266,6 @@ class CompletedHistoryUI:
     def __init__(self):
         self.a = AuthenticationController()
         self.c = CompletedHistoryCtrl()
-        self.cat = ViewCategoryCtrl()
 
     def onSearchClick(self):
         current_user = self.a.get_current_user()
@@ -257,28 +278,30 @@ class CompletedHistoryUI:
         from_date = request.args.get('from', '').strip() or None
         to_date = request.args.get('to', '').strip() or None
         page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor') or None
 
         items, total_count, page_meta = self.c.searchCompleted(
             current_user.id,
             service_type,
             from_date,
             to_date,
-            page
+            page,
+            cursor
         )
         filters = {
             'serviceType': service_type,
             'from': from_date,
             'to': to_date
         }
-        categories = self.cat.listCategories()
-        service_types = [cat.title for cat in categories] if categories else []
+        facets = self.c.getServiceTypeFacets(current_user.id)
         render = render_template(
                     'completed_history/list.html',
                     items=items,
                     total_count=total_count,
                     page_meta=page_meta,
                     user = current_user,
-                    service_types = service_types,
+                    service_types = [service_type for service_type, _ in facets],
+                    service_type_counts = dict(facets),
                     filters = filters,
         )
         close_session()
@@ -296,6 +319,7 @@ class CSRRepBoundary:
         current_user = self.a.get_current_user()
         if not current_user or current_user.user_profile.profile_name != 'CSR Rep':
             flash("Only CSR Reps can shortlist requests.", 'error')
+            return redirect(url_for('viewRequest', request_id=request_id))
 
         request = self.c.viewRequest(request_id)
         if not request:
@@ -309,13 +333,14 @@ class CSRRepBoundary:
             flash("Request is already shortlisted.", 'info')
         elif result == 2:
             flash("Request added to shortlist successfully.", 'success')
-            return redirect(url_for('viewRequest', request_id=request_id))
+        return redirect(url_for('viewRequest', request_id=request_id))
         
     def removeShortlist(self, request_id):
         """Handle removing shortlist from web interface"""
         current_user = self.a.get_current_user()
         if not current_user or current_user.user_profile.profile_name != 'CSR Rep':
             flash("Only CSR Reps can remove shortlists.", 'error')
+            return redirect(url_for('viewRequest', request_id=request_id))
 
         request = self.c.viewRequest(request_id)
         if not request:
@@ -329,7 +354,7 @@ class CSRRepBoundary:
             flash("Request is not in your shortlist.", 'info')
         elif result == 2:
             flash("Request removed from shortlist successfully.", 'success')
-            return redirect(url_for('viewRequest', request_id=request_id))
+        return redirect(url_for('viewRequest', request_id=request_id))
         
 # CSR Rep Search and filter Shortlist
 class SearchShortlistUI:
@@ -346,7 +371,11 @@ class SearchShortlistUI:
         
         keyword = request.args.get('keyword', '').strip()
         categoryID = request.args.get('category_id', '').strip()
-        shortlist = self.c.searchShortlist(current_user.id, keyword, categoryID)
+        status = request.args.get('status', '').strip()
+        page = request.args.get('page', 1, type=int)
+        shortlist, total_count, page_meta = self.c.searchShortlist(
+            current_user.id, keyword or None, categoryID or None, status or None, page=page, view='list'
+        )
         print("Requests: ", shortlist)
 
         categories = self.cat.listCategories()        
@@ -354,7 +383,11 @@ class SearchShortlistUI:
                     'shortlist.html', 
                     requests=shortlist,
                     keyword=keyword,
-                    categories=categories
+                    category_id=categoryID,
+                    status=status,
+                    categories=categories,
+                    total_count=total_count,
+                    page_meta=page_meta
                 )
         close_session()
         return render
@@ -372,15 +405,17 @@ class ListCompletedHistoryUI:
             return redirect(url_for('dashboard'))
         
         page = request.args.get('page', 1, type=int)
-        items, total_count, page_meta = self.c.viewHistory(current_user.id, page)
-        service_types = self.c.getServiceTypes(current_user.id)
+        cursor = request.args.get('cursor') or None
+        items, total_count, page_meta = self.c.viewHistory(current_user.id, page, cursor)
+        facets = self.c.getServiceTypeFacets(current_user.id)
 
         render = render_template(
                     'completed_history/csr_list.html',
                     items=items,
                     total_count=total_count,
                     page_meta=page_meta,
-                    service_types = service_types,
+                    service_types = [service_type for service_type, _ in facets],
+                    service_type_counts = dict(facets),
                     filters = None
         )
         close_session()
@@ -405,6 +440,7 @@ class CSRCompletedHistoryUI:
         from_date = request.args.get('from', '').strip() or None
         to_date = request.args.get('to', '').strip() or None
         page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor') or None
 
         try:
             items, total_count, page_meta = self.c.searchCompleted(
@@ -412,20 +448,22 @@ class CSRCompletedHistoryUI:
                 service_type,
                 from_date,
                 to_date,
-                page
+                page,
+                cursor
             )
         except (ValidationError) as e:
             flash(str(e), 'error')
             return redirect(url_for('csrViewCompletedHistory'))
         
-        # To populate service type filter dropdown
-        service_types = self.cs.getServiceTypes(current_user.id)
+        # To populate service type filter dropdown (cached facets, no match scan)
+        facets = self.cs.getServiceTypeFacets(current_user.id)
         render = render_template(
                     'completed_history/csr_list.html',
                     items=items,
                     total_count=total_count,
                     page_meta=page_meta,
-                    service_types = service_types,
+                    service_types = [service_type for service_type, _ in facets],
+                    service_type_counts = dict(facets),
                     filters = {'serviceType': service_type, 'from': from_date, 'to': to_date}
         )
         close_session()
@@ -443,7 +481,7 @@ class ViewCompletedDetailsUI:
             flash("Only CSR Reps can view completed match history.", 'error')
             return redirect(url_for('dashboard'))
         
-        m = self.c.viewDetails(current_user.id, match_id)
+        m = self.c.viewDetails(current_user.id, match_id, view='detail')
         if m == 0:
             flash("Not authorised to view this CSR's completed services.", 'error')
             return redirect(url_for('dashboard'))
@@ -462,4 +500,10 @@ class ViewCompletedDetailsUI:
                     m=m
         )
         close_session()
-        return render
\ No newline at end of file
+        return render
+
+    def pageVersion(self, match_id):
+        current_user = self.a.get_current_user()
+        if not current_user or current_user.user_profile.profile_name != 'CSR Rep':
+            return None
+        return self.c.getDetailsVersion(current_user.id, match_id)
@@ -1,4 +1,4 @@
-from flask import render_template, request, redirect, url_for, flash
+from flask import render_template, request, redirect, url_for, flash, jsonify
 from database.db_config import close_session
 from controllers.UserAdmin.UserAccount.viewUserAccountCtrl import ViewUserAccountCtrl
 from controllers.UserAdmin.UserProfile.viewUserProfileCtrl import ViewUserProfileCtrl
@@ -6,15 +6,25 @@ from controllers.UserAdmin.UserAccount.createUserAccountCtrl import CreateUserAc
 from controllers.UserAdmin.UserAccount.updateUserAccountCtrl import UpdateUserAccountCtrl
 from controllers.UserAdmin.UserAccount.suspendUserAccountCtrl import SuspendUserAccountCtrl
 from controllers.UserAdmin.UserAccount.searchUserAccountController import SearchUserAccountController
+from controllers.passwordHasher import password_hasher
 
 class ListUserAccountUI:
     def __init__(self):
         self.c = ViewUserAccountCtrl()
 
     def displayPage(self):
-        users = self.c.listAccounts()
+        users, total_count, page_meta = self.c.listAccounts(
+            page=request.args.get('page', 1, type=int),
+            sortBy=request.args.get('sort', 'id'),
+            direction=request.args.get('direction', 'asc'),
+            pageSize=request.args.get('page_size', type=int)
+        )
+        render = render_template('user_accounts/list.html',
+                                 users=users,
+                                 total_count=total_count,
+                                 page_meta=page_meta)
         close_session()
-        return render_template('user_accounts/list.html', users=users)
+        return render
     
 class CreateUserAccountUI:
     def __init__(self):
@@ -47,6 +57,8 @@ class CreateUserAccountUI:
             elif result == 4:
                 flash("User account created successfully", 'success')
                 return redirect(url_for('list_user_accounts'))
+            elif result == 5:
+                flash("The server is busy. Please try again in a moment.", 'error')
     
         # Get active profiles for dropdown
         profiles = self.p.getActiveProfiles()
@@ -149,6 +161,7 @@ class SearchUserAccountUI:
         keyword = request.args.get('keyword', '')
         profile_id = request.args.get('profile_id', '')
         status = request.args.get('status', '')
+        page = request.args.get('page', 1, type=int)
 
         # Convert to appropriate types
         profile_id = int(profile_id) if profile_id else None
@@ -159,10 +172,11 @@ class SearchUserAccountUI:
             is_active = False
         
         # Search
-        users = self.c.searchUserAccount(
+        users, total_count, page_meta = self.c.searchUserAccount(
             keyword if keyword else None,
             profile_id,
-            is_active
+            is_active,
+            page=page
         )
         close_session()
         profiles = self.p.getAllProfiles()
@@ -172,4 +186,12 @@ class SearchUserAccountUI:
                                profiles = profiles,
                                keyword = keyword,
                                selected_profile = profile_id,
-                               selected_status = status)
\ No newline at end of file
+                               selected_status = status,
+                               total_count = total_count,
+                               page_meta = page_meta)
+
+
+class PasswordHashStatsUI:
+    def handle_view_hash_stats(self):
+        """Password hashing pool queue / timing metrics (JSON)"""
+        return jsonify(password_hasher.stats())
@@ -11,9 +11,18 @@ class ListUserProfileUI:
         self.c = ViewUserProfileCtrl()
 
     def displayPage(self):
-        profiles = self.c.getAllProfiles()
+        profiles, total_count, page_meta = self.c.listProfiles(
+            page=request.args.get('page', 1, type=int),
+            sortBy=request.args.get('sort', 'id'),
+            direction=request.args.get('direction', 'asc'),
+            pageSize=request.args.get('page_size', type=int)
+        )
+        render = render_template('user_profiles/list.html',
+                                 profiles=profiles,
+                                 total_count=total_count,
+                                 page_meta=page_meta)
         close_session()
-        return render_template('user_profiles/list.html', profiles=profiles)
+        return render
     
 class CreateUserProfileUI:
     def __init__(self):
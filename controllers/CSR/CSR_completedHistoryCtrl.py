@@ -8,6 +8,8 @@ from datetime import date, datetime
 from typing import Any, Dict, List, Optional, Tuple, Union
 from database.db_config import get_session
 from entities.match import Match
+from controllers.historyPaging import make_history_page_meta, sanitize_cursor
+from controllers.paging import sanitize_page
 
 class ValidationError(Exception):
     pass
@@ -17,14 +19,17 @@ DateLike = Union[str, date, datetime, None]
 class CSRCompletedHistoryCtrl:
     """
     Public API:
-      - searchCompleted(csrRepID, serviceType?, fromDate?, toDate?, page?)
-        -> (items, total_count, page_meta)
+      - searchCompleted(csrRepID, serviceType?, fromDate?, toDate?, page?, cursor?)
+        -> (items, total_count, page_meta), items as MatchSummary rows
     """
 
-    def __init__(self, session=None, page_size: int = 10, auth_service: Optional[Any] = None):
+    def __init__(self, session=None, page_size: int = 10, auth_service: Optional[Any] = None,
+                 exact_total: bool = True):
+        """exact_total=False: no full count, totalCount is "at least N" (see Match.AtLeast)"""
         self.session = session or get_session()
         self.page_size = int(page_size) if page_size and page_size > 0 else 10
         self.auth_service = auth_service
+        self.exact_total = exact_total
 
     def searchCompleted(
         self,
@@ -33,14 +38,15 @@ class CSRCompletedHistoryCtrl:
         fromDate: DateLike = None,
         toDate: DateLike = None,
         page: int = 1,
-    ) -> Tuple[List[Any], int, Dict[str, int]]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Any], int, Dict[str, Any]]:
 
 
-        page = self._sanitize_page(page)
+        page = sanitize_page(page)
         norm_from, norm_to = self._validate_date_range(fromDate, toDate)
         norm_type = self._sanitize_service_type(serviceType)
 
-        items, total_count = Match.findCompletedByCSRWithFilters(
+        result = Match.findCompletedByCSRWithFilters(
             self.session,
             csrRepID=csrRepID,
             serviceType=norm_type,
@@ -48,8 +54,13 @@ class CSRCompletedHistoryCtrl:
             toDate=norm_to,
             page=page,
             page_size=self.page_size,
+            cursor=sanitize_cursor(cursor),
+            exact_total=self.exact_total,
+            lean=True,
         )
-        page_meta = self._make_page_meta(total_count, page)
+        items, total_count = result[0], result[1]
+        cursors = result[2] if len(result) > 2 else None
+        page_meta = make_history_page_meta(total_count, page, self.page_size, items, cursors)
         return items, total_count, page_meta
 
     # ----------------- helpers -----------------
@@ -59,13 +70,6 @@ class CSRCompletedHistoryCtrl:
             return True
         return bool(self.auth_service.can_view_completed_history_for_csr(csrRepID))
 
-    def _sanitize_page(self, page: Optional[int]) -> int:
-        try:
-            p = int(page or 1)
-        except (TypeError, ValueError):
-            p = 1
-        return max(1, p)
-
     def _sanitize_service_type(self, serviceType: Optional[str]) -> Optional[str]:
         if serviceType is None:
             return None
@@ -93,18 +97,3 @@ class CSRCompletedHistoryCtrl:
         if f and t and f > t:
             raise ValidationError("Start date cannot be after end date.")
         return f, t
-
-    def _make_page_meta(self, total_count: int, page: int) -> Dict[str, int]:
-        size = self.page_size
-        total_pages = max(1, (total_count + size - 1) // size)
-        current_page = min(max(1, page), total_pages)
-        return {
-            "page": current_page,
-            "pageSize": size,
-            "totalPages": total_pages,
-            "totalCount": total_count,
-            "hasPrev": 1 if current_page > 1 else 0,
-            "hasNext": 1 if current_page < total_pages else 0,
-            "offset": (current_page - 1) * size,
-            "limit": size,
-        }
\ No newline at end of file
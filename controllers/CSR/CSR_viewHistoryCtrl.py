@@ -6,12 +6,18 @@ CSR Rep - view completed services list and a specific completed service
 from typing import Any, Dict, List, Optional, Tuple
 from database.db_config import get_session
 from entities.match import Match
+from controllers.historyPaging import make_history_page_meta, sanitize_cursor
+from controllers.paging import sanitize_page
+from controllers.historyFacetCache import history_facet_cache
 
 class CSRViewHistoryCtrl:
     """
     Public API:
-      - viewHistory(csrRepID, page=1)  -> (items, total_count, page_meta)
+      - viewHistory(csrRepID, page=1, cursor=None)  -> (items, total_count, page_meta)
+        (items are MatchSummary rows)
+      - getServiceTypeFacets(csrRepID) -> [(service_type, count)]
       - viewDetails(csrRepID, matchID) -> Match
+      - getDetailsVersion(csrRepID, matchID) -> tuple | None
     """
 
     def __init__(self, session=None, page_size: int = 10, auth_service: Optional[Any] = None):
@@ -23,24 +29,34 @@ class CSRViewHistoryCtrl:
     # Public API
     # -------------------------
 
-    def viewHistory(self, csrRepID: int, page: int = 1) -> Tuple[List[Any], int, Dict[str, int]]:
-        page = self._sanitize_page(page)
-        items, total_count = Match.findCompletedByCSR(
+    def viewHistory(
+        self, csrRepID: int, page: int = 1, cursor: Optional[str] = None
+    ) -> Tuple[List[Any], int, Dict[str, Any]]:
+        page = sanitize_page(page)
+        result = Match.findCompletedByCSR(
             self.session,
             csr_rep_id=int(csrRepID),
             page=page,
             page_size=self.page_size,
+            cursor=sanitize_cursor(cursor),
+            lean=True,
         )
-        page_meta = self._make_page_meta(total_count, page)
+        items, total_count = result[0], result[1]
+        cursors = result[2] if len(result) > 2 else None
+        page_meta = make_history_page_meta(total_count, page, self.page_size, items, cursors)
         return items, total_count, page_meta
     
     def getServiceTypes(self, csrRepID: int) -> List[str]:
-        return Match.getServiceTypes(self.session, csrRepID)
+        return [service_type for service_type, _ in self.getServiceTypeFacets(csrRepID)]
 
-    def viewDetails(self, csrRepID: int, matchID: int):
+    def getServiceTypeFacets(self, csrRepID: int) -> List[Tuple[str, int]]:
+        """Service types of the CSR Rep's completed matches with their counts (cached)"""
+        return history_facet_cache.get(self.session, "csr", csrRepID)
+
+    def viewDetails(self, csrRepID: int, matchID: int, view: Optional[str] = "detail"):
         if not self._validate_access(csrRepID):
             return 0 # Unauthorized
-        m = Match.findById(self.session, int(matchID))
+        m = Match.findById(self.session, int(matchID), view=view)
         if not m:
             return 1 # Not found
         elif m.csr_rep_id != int(csrRepID):
@@ -49,6 +65,15 @@ class CSRViewHistoryCtrl:
             return 3 # Not completed
         return m
 
+    def getDetailsVersion(self, csrRepID: int, matchID: int) -> Optional[Tuple[Any, ...]]:
+        """What the details page shows changes with, or None when viewDetails would not show it"""
+        if not self._validate_access(csrRepID):
+            return None
+        version = Match.getDetailVersion(self.session, int(matchID))
+        if version is None or version.csr_rep_id != int(csrRepID) or version.status != "Completed":
+            return None
+        return tuple(version)
+
     # -------------------------
     # Helpers
     # -------------------------
@@ -57,25 +82,3 @@ class CSRViewHistoryCtrl:
         if self.auth_service is None:
             return True
         return bool(self.auth_service.can_view_completed_history_for_csr(csrRepID))
-
-    def _sanitize_page(self, page: Optional[int]) -> int:
-        try:
-            p = int(page or 1)
-        except (TypeError, ValueError):
-            p = 1
-        return max(1, p)
-
-    def _make_page_meta(self, total_count: int, page: int) -> Dict[str, int]:
-        size = self.page_size
-        total_pages = max(1, (total_count + size - 1) // size)
-        current_page = min(max(1, page), total_pages)
-        return {
-            "page": current_page,
-            "pageSize": size,
-            "totalPages": total_pages,
-            "totalCount": total_count,
-            "hasPrev": 1 if current_page > 1 else 0,
-            "hasNext": 1 if current_page < total_pages else 0,
-            "offset": (current_page - 1) * size,
-            "limit": size,
-        }
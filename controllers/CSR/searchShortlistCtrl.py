@@ -1,9 +1,23 @@
 from entities.shortlist import Shortlist
 from database.db_config import get_session
+from controllers.paging import make_page_meta, sanitize_page
 
 class searchShortlistCtrl:
-    def __init__(self):
+    def __init__(self, page_size=20):
         self.session = get_session()
+        self.page_size = int(page_size) if page_size and page_size > 0 else 20
 
-    def searchShortlist(self, userID, keyword=None, categoryID= None):
-        return Shortlist.searchShortlist(self.session, userID, keyword, categoryID)
\ No newline at end of file
+    def searchShortlist(self, userID, keyword=None, categoryID=None, status=None, page=1, view='list'):
+        """Return (items, total_count, page_meta) for one page of the CSR Rep's matching shortlist"""
+        page = sanitize_page(page)
+        items, total_count = Shortlist.findShortlists(
+            self.session,
+            userID,
+            keyword=keyword,
+            categoryID=categoryID,
+            status=status,
+            page=page,
+            page_size=self.page_size,
+            view=view
+        )
+        return items, total_count, make_page_meta(total_count, page, self.page_size)
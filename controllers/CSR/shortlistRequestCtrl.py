@@ -33,6 +33,15 @@ class ShortlistRequestCtrl:
         )
         return result # True/False
     
+    def getShortlistedRequestIds(self, request_ids, csr_rep_id):
+        
+        result = Shortlist.getShortlistedRequestIds(
+            self.session,
+            csr_rep_id,
+            request_ids
+        )
+        return result # Set of shortlisted request IDs
+    
     def removeShortlist(self, request_id, csr_rep_id):
         result = Shortlist.removeShortlist(self.session, request_id, csr_rep_id)
         return result # 1: Not shortlisted, 2: Successful
\ No newline at end of file
@@ -5,14 +5,17 @@ class ViewCategoryCtrl:
     def __init__(self, session=None):
         self.session = session or get_session()
 
-    def viewCategory(self, categoryID):
-        category = Category.findById(self.session, categoryID)
+    def viewCategory(self, categoryID, view=None):
+        category = Category.findById(self.session, categoryID, view=view)
         if not category:
             return None  # Not found
         return category
     
     def listCategories(self):
         return Category.getAllCategories(self.session)
+
+    def getCategoryVersion(self, categoryID):
+        return Category.getVersion(self.session, categoryID)
     
     def listActiveCategories(self):
         return Category.getActiveCategories(self.session)
\ No newline at end of file
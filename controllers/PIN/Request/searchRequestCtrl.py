@@ -1,10 +1,23 @@
 from entities.request import Request
 from database.db_config import get_session
+from controllers.paging import make_page_meta, sanitize_page
 
 class SearchRequestCtrl:
-    def __init__(self):
+    def __init__(self, page_size=20):
         self.session = get_session()
+        self.page_size = int(page_size) if page_size and page_size > 0 else 20
 
-    def searchRequests(self, keyword, status):
-        request = Request.searchRequests(self.session, keyword, status)
-        return request # Return the list of matching requests
\ No newline at end of file
+    def searchRequests(self, keyword, status, ownerID=None, categoryID=None, page=1, view='search'):
+        """Return (items, total_count, page_meta) for one page of matching requests"""
+        page = sanitize_page(page)
+        items, total_count = Request.findRequests(
+            self.session,
+            ownerID=ownerID,
+            keyword=keyword,
+            status=status,
+            categoryID=categoryID,
+            page=page,
+            page_size=self.page_size,
+            view=view
+        )
+        return items, total_count, make_page_meta(total_count, page, self.page_size)
@@ -0,0 +1,158 @@
+"""
+View Counter
+Buffers request page views in memory and writes them in batches
+
+Every request view used to be a read-modify-write of view_count followed by a
+commit, so concurrent views could overwrite each other and SQLite paid an fsync
+per page hit. Views are now counted per process and flushed as
+UPDATE requests SET view_count = view_count + :n (see Request.addViews):
+
+    - every VIEW_COUNT_FLUSH_INTERVAL seconds
+    - as soon as VIEW_COUNT_FLUSH_THRESHOLD views are pending
+    - when the process exits
+
+Flushes run on a background thread, so a page view never waits for a second
+pool connection while holding its own.
+
+Views still pending when a process is killed are lost.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from database.db_config import SessionLocal
+from entities.request import Request
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background flushes (0 = flush only on the threshold)
+FLUSH_INTERVAL_SECONDS = float(os.environ.get("VIEW_COUNT_FLUSH_INTERVAL", 5))
+
+# Pending views that trigger an immediate flush (1 = write through on every view)
+FLUSH_THRESHOLD = int(os.environ.get("VIEW_COUNT_FLUSH_THRESHOLD", 100))
+
+
+class ViewCounter:
+    """
+    Per-process buffer of request_id -> views not yet written
+
+    Flushes use their own session, so they never commit (or roll back) the
+    caller's work.
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL_SECONDS, flush_threshold=FLUSH_THRESHOLD,
+                 session_factory=SessionLocal):
+        self.flush_interval = flush_interval
+        self.flush_threshold = max(1, int(flush_threshold))
+        self.session_factory = session_factory
+        self._pending = Counter()
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.flushed_views = 0
+        self.failed_flushes = 0
+
+    def record(self, request_id, views=1):
+        """Count views of a request; wakes the flush thread once the threshold is reached"""
+        with self._lock:
+            self._pending[request_id] += views
+            self._pending_total += views
+            flush_now = self._pending_total >= self.flush_threshold
+            started = self._start_thread()
+        if flush_now:
+            if started:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def pending(self, request_id):
+        """Views of request_id recorded but not yet written"""
+        with self._lock:
+            return self._pending.get(request_id, 0)
+
+    def flush(self):
+        """
+        Write every pending view in one batch
+
+        On failure the views are put back and retried on the next flush.
+
+        Returns:
+            int: Number of views written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, Counter()
+                self._pending_total = 0
+            if not batch:
+                return 0
+
+            session = self.session_factory()
+            try:
+                Request.addViews(session, batch)
+                session.commit()
+            except Exception:
+                session.rollback()
+                with self._lock:
+                    self._pending.update(batch)
+                    self._pending_total += sum(batch.values())
+                    self.failed_flushes += 1
+                logger.exception("View count flush failed; %d views kept for retry", sum(batch.values()))
+                return 0
+            finally:
+                session.close()
+
+            written = sum(batch.values())
+            with self._lock:
+                self.flushes += 1
+                self.flushed_views += written
+            return written
+
+    def close(self):
+        """Stop the background thread and write whatever is pending"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.flush_interval))
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        """Flush counters and current backlog"""
+        with self._lock:
+            return {
+                'pending_views': self._pending_total,
+                'pending_requests': len(self._pending),
+                'flushes': self.flushes,
+                'flushed_views': self.flushed_views,
+                'failed_flushes': self.failed_flushes,
+                'flush_interval': self.flush_interval,
+                'flush_threshold': self.flush_threshold,
+            }
+
+    def _start_thread(self):
+        """Start the flush thread if needed; False once closed. Called with self._lock held."""
+        if self._stop.is_set():
+            return False
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval or None)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.flush()
+
+
+# Shared by every request view in this process
+view_counter = ViewCounter()
+atexit.register(view_counter.close)
@@ -1,16 +1,33 @@
+from sqlalchemy.orm.attributes import set_committed_value
+
 from entities.request import Request
 from database.db_config import get_session
+from controllers.paging import make_page_meta, sanitize_page
+from controllers.PIN.Request.viewCounter import view_counter
 
 class ViewRequestCtrl:
-    def __init__(self, session=None):
+    def __init__(self, session=None, page_size=20):
         self.session = session or get_session()
+        self.page_size = int(page_size) if page_size and page_size > 0 else 20
 
-    def viewRequest(self, requestID):
-        request = Request.findById(self.session, requestID)
+    def viewRequest(self, requestID, view=None):
+        """The request (None if not found), eager-loading what view's template reads"""
+        request = Request.findById(self.session, requestID, view=view)
         if not request:
             return None  # Not found
-        request.increment_view(self.session)
+        view_counter.record(request.request_id)
+        # Show buffered views without marking the row dirty
+        set_committed_value(request, 'view_count', request.view_count + view_counter.pending(request.request_id))
         return request
     
-    def listRequests(self):
-        return Request.getAllRequests(self.session)
\ No newline at end of file
+    def listRequests(self, ownerID=None, page=1, view='list'):
+        """Return (items, total_count, page_meta) for one page of requests (optionally one owner's)"""
+        page = sanitize_page(page)
+        items, total_count = Request.findRequests(
+            self.session,
+            ownerID=ownerID,
+            page=page,
+            page_size=self.page_size,
+            view=view
+        )
+        return items, total_count, make_page_meta(total_count, page, self.page_size)
@@ -13,6 +13,7 @@ Sequence (from your diagram):
 Notes:
 - Results are 'completed only' and should be sorted by most recent (enforced by the Entity).
 - Pagination metadata is returned alongside items and totalCount.
+- Items are lean MatchSummary rows (only the columns the list shows).
 """
 
 from __future__ import annotations
@@ -22,6 +23,9 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 from database.db_config import get_session
 from entities.match import Match
+from controllers.historyPaging import make_history_page_meta, sanitize_cursor
+from controllers.paging import sanitize_page
+from controllers.historyFacetCache import history_facet_cache
 
 
 class AuthError(Exception):
@@ -40,8 +44,9 @@ class CompletedHistoryCtrl:
     Controller for the 'Search & Filter Completed Match History' flow.
 
     Public API:
-      - searchCompleted(pinID, serviceType?, fromDate?, toDate?, page?)
+      - searchCompleted(pinID, serviceType?, fromDate?, toDate?, page?, cursor?)
       - validateDateRange(fromDate?, toDate?)
+      - getServiceTypeFacets(pinID) -> [(service_type, count)]
     """
 
     def __init__(
@@ -49,16 +54,21 @@ class CompletedHistoryCtrl:
         session=None,
         page_size: int = 10,
         auth_service: Optional[Any] = None,
+        exact_total: bool = True,
     ):
         """
         :param session: DB session (defaults to database.db_config.get_session()).
         :param page_size: page size for pagination (defaults to 10).
         :param auth_service: optional service providing access checks. If supplied,
                              it should expose can_view_completed_history(pin_id) -> bool.
+        :param exact_total: False skips counting the whole history; totalCount is
+                            then "at least N" (pageMeta totalCountExact = 0) and
+                            only ever runs one page ahead. For very large histories.
         """
         self.session = session or get_session()
         self.page_size = int(page_size) if page_size and page_size > 0 else 10
         self.auth_service = auth_service
+        self.exact_total = exact_total
 
     # -------------------------
     # Public API (called by UI)
@@ -71,10 +81,15 @@ class CompletedHistoryCtrl:
         fromDate: DateLike = None,
         toDate: DateLike = None,
         page: int = 1,
-    ) -> Tuple[List[Any], int, Dict[str, int]]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Any], int, Dict[str, Any]]:
         """
         Search/filter completed matches for a PIN.
 
+        :param cursor: pageMeta's nextCursor/prevCursor from a previous call with
+                       the same filters; when given the page is fetched by keyset
+                       seek and page is only used for display.
+
         :returns: (items, totalCount, pageMeta)
         :raises AuthError: when access is not permitted.
         :raises ValidationError: when date range inputs are invalid.
@@ -83,7 +98,7 @@ class CompletedHistoryCtrl:
             raise AuthError("Not authorised to view this PIN's completed history.")
 
         # Normalize and validate inputs
-        page = self._sanitize_page(page)
+        page = sanitize_page(page)
         norm_from, norm_to = self.validateDateRange(fromDate, toDate)
         norm_type = self._sanitize_service_type(serviceType)
 
@@ -91,7 +106,7 @@ class CompletedHistoryCtrl:
         #   - completed-only filter
         #   - sorted by most recent
         #   - scoping by pinID
-        items, total_count = Match.findCompletedByPinWithFilters(
+        result = Match.findCompletedByPinWithFilters(
             self.session,
             pinID,
             serviceType=norm_type,
@@ -99,11 +114,20 @@ class CompletedHistoryCtrl:
             toDate=norm_to,
             page=page,
             page_size=self.page_size,
+            cursor=sanitize_cursor(cursor),
+            exact_total=self.exact_total,
+            lean=True,
         )
+        items, total_count = result[0], result[1]
+        cursors = result[2] if len(result) > 2 else None
 
-        page_meta = self._make_page_meta(total_count, page)
+        page_meta = make_history_page_meta(total_count, page, self.page_size, items, cursors)
         return items, total_count, page_meta
 
+    def getServiceTypeFacets(self, pinID: int) -> List[Tuple[str, int]]:
+        """Service types of the PIN's completed matches with their counts (cached)"""
+        return history_facet_cache.get(self.session, "pin", pinID)
+
     def validateDateRange(
         self, fromDate: DateLike, toDate: DateLike
     ) -> Tuple[Optional[date], Optional[date]]:
@@ -129,13 +153,6 @@ class CompletedHistoryCtrl:
             return True
         return bool(self.auth_service.can_view_completed_history(pinID))
 
-    def _sanitize_page(self, page: Optional[int]) -> int:
-        try:
-            p = int(page or 1)
-        except (TypeError, ValueError):
-            p = 1
-        return max(1, p)
-
     def _sanitize_service_type(self, serviceType: Optional[str]) -> Optional[str]:
         if serviceType is None:
             return None
@@ -158,21 +175,6 @@ class CompletedHistoryCtrl:
         except ValueError as e:
             raise ValidationError(f"Invalid date format '{s}'. Use YYYY-MM-DD.") from e
 
-    def _make_page_meta(self, total_count: int, page: int) -> Dict[str, int]:
-        size = self.page_size
-        total_pages = max(1, (total_count + size - 1) // size)
-        current_page = min(max(1, page), total_pages)
-        return {
-            "page": current_page,
-            "pageSize": size,
-            "totalPages": total_pages,
-            "totalCount": total_count,
-            "hasPrev": 1 if current_page > 1 else 0,
-            "hasNext": 1 if current_page < total_pages else 0,
-            "offset": (current_page - 1) * size,
-            "limit": size,
-        }
-
 
 # Optional: tiny demo guard (safe to remove in production)
 if __name__ == "__main__":
@@ -6,6 +6,9 @@ Handles viewing completed match history for PIN users
 from typing import Any, Dict, List, Optional, Tuple
 from database.db_config import get_session
 from entities.match import Match
+from controllers.historyPaging import make_history_page_meta, sanitize_cursor
+from controllers.paging import sanitize_page
+from controllers.historyFacetCache import history_facet_cache
 
 
 class AuthError(Exception):
@@ -25,6 +28,7 @@ class ViewHistoryCtrl:
     Notes:
     - Results are 'completed only' and should be sorted by most recent.
     - Pagination metadata is returned alongside items and totalCount.
+    - Items are lean MatchSummary rows (only the columns the list shows).
     """
 
     def __init__(
@@ -47,10 +51,15 @@ class ViewHistoryCtrl:
     # Public API (called by UI)
     # -------------------------
 
-    def viewHistory(self, pinID: int, page: int = 1) -> Tuple[List[Any], int, Dict[str, int]]:
+    def viewHistory(
+        self, pinID: int, page: int = 1, cursor: Optional[str] = None
+    ) -> Tuple[List[Any], int, Dict[str, Any]]:
         """
         Main entry point used by the boundary/UI.
 
+        :param cursor: pageMeta's nextCursor/prevCursor from a previous call; when
+                       given the page is fetched by keyset seek and page is only
+                       used for display.
         :returns: (items, totalCount, pageMeta)
         :raises AuthError: when access is not permitted.
         """
@@ -58,21 +67,29 @@ class ViewHistoryCtrl:
             # UI may catch this and call showAuthError()
             raise AuthError("Not authorised to view this PIN's completed history.")
 
-        page = self._sanitize_page(page)
+        page = sanitize_page(page)
 
         # Entity call – expected to enforce:
         #   - completed-only filter
         #   - sorted by most recent
         # Implement findCompletedByPin(session, pin_id, page, page_size) in entities.match.Match
-        items, total_count = Match.findCompletedByPin(
-            self.session, pinID, page=page, page_size=self.page_size
+        result = Match.findCompletedByPin(
+            self.session, pinID, page=page, page_size=self.page_size,
+            cursor=sanitize_cursor(cursor),
+            lean=True,
         )
+        items, total_count = result[0], result[1]
+        cursors = result[2] if len(result) > 2 else None
 
-        page_meta = self._make_page_meta(total_count, page)
+        page_meta = make_history_page_meta(total_count, page, self.page_size, items, cursors)
 
         # (Optional) UI may showEmptyState() if total_count == 0
         return items, total_count, page_meta
 
+    def getServiceTypeFacets(self, pinID: int) -> List[Tuple[str, int]]:
+        """Service types of the PIN's completed matches with their counts (cached)"""
+        return history_facet_cache.get(self.session, "pin", pinID)
+
     def validateAccess(self, pinID: int) -> bool:
         """
         Access control hook (shown in your sequence diagram).
@@ -83,33 +100,6 @@ class ViewHistoryCtrl:
             return True
         return bool(self.auth_service.can_view_completed_history(pinID))
 
-    # -------------------------
-    # Helpers
-    # -------------------------
-
-    def _sanitize_page(self, page: Optional[int]) -> int:
-        try:
-            p = int(page or 1)
-        except (TypeError, ValueError):
-            p = 1
-        return max(1, p)
-
-    def _make_page_meta(self, total_count: int, page: int) -> Dict[str, int]:
-        size = self.page_size
-        total_pages = max(1, (total_count + size - 1) // size)
-        # If requested page > total_pages, clamp to the last page in metadata
-        current_page = min(page, total_pages)
-        return {
-            "page": current_page,
-            "pageSize": size,
-            "totalPages": total_pages,
-            "totalCount": total_count,
-            "hasPrev": 1 if current_page > 1 else 0,
-            "hasNext": 1 if current_page < total_pages else 0,
-            "offset": (current_page - 1) * size,
-            "limit": size,
-        }
-
 # Optional: tiny demo guard (safe to remove in production)
 if __name__ == "__main__":
     ctrl = ViewHistoryCtrl()
@@ -29,25 +29,18 @@ class ViewShortlistCountCtrl:
         """
         return Shortlist.countShortlistsForRequest(self.session, request_id)
     
-    def getShortlistCountsForUser(self, user_id):
+    def getShortlistCountsForUser(self, user_id, request_ids=None):
         """
-        Get shortlist counts for all requests overnight by a specific user (PIN)
+        Get shortlist counts for the requests owned by a specific user (PIN)
         
         Args:
             user_id (int): The ID of the PIN user
+            request_ids (list, optional): Only these of the user's requests,
+                e.g. the current list page. Defaults to all of them.
             
         Returns:
             dict: Dictionary mapping request_id to shortlist count
             Example: {1: 3, 2: 0, 3: 1}
         """
-        from entities.request import Request
-        
-        # Get all requests for this user
-        user_requests = self.session.query(Request).filter_by(user_account_id=user_id).all()
-        
-        # Build a dictionary of request_id -> shortlist_count
-        counts = {}
-        for request in user_requests:
-            counts[request.request_id] = Shortlist.countShortlistsForRequest(self.session, request.request_id)
-        
-        return counts
+        # One GROUP BY request_id query; requests never shortlisted map to 0
+        return Shortlist.countShortlistsForUser(self.session, user_id, request_ids)
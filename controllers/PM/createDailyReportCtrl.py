@@ -8,8 +8,20 @@ from entities.match import Match
 from entities.user_account import UserAccount
 from entities.shortlist import Shortlist
 from entities.category import Category
+from entities.daily_stat import DailyStat, METRICS
+from controllers.PM.reportCache import report_cache
 from datetime import datetime, timedelta, date
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, case
+
+
+def _between(column, start, end):
+    """Inclusive range predicate on a date/datetime column"""
+    return and_(column >= start, column <= end)
+
+
+def _count_if(condition):
+    """Conditional aggregate: number of rows in the group matching condition"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
 
 
 class CreateDailyReportCtrl:
@@ -44,20 +56,24 @@ class CreateDailyReportCtrl:
         elif isinstance(report_date, datetime):
             report_date = report_date.date()
         
+        # Reuse a cached report for this day if its data has not changed
+        previous_date = report_date - timedelta(days=1)
+        cached = self._getCachedReport('daily', report_date, ('today_stats', 'yesterday_stats'))
+        if cached is not None:
+            return cached
+        
         # Calculate date range for the report day (start and end of day)
         start_of_day = datetime.combine(report_date, datetime.min.time())
         end_of_day = datetime.combine(report_date, datetime.max.time())
         
         # Calculate previous day for comparison
-        previous_date = report_date - timedelta(days=1)
         start_of_previous = datetime.combine(previous_date, datetime.min.time())
         end_of_previous = datetime.combine(previous_date, datetime.max.time())
         
-        # Get today's statistics
-        today_stats = self._getDailyStats(start_of_day, end_of_day)
-        
-        # Get yesterday's statistics for comparison
-        yesterday_stats = self._getDailyStats(start_of_previous, end_of_previous)
+        # Get today's statistics and yesterday's statistics for comparison
+        today_stats, yesterday_stats = self._getPeriodStats(
+            start_of_day, end_of_day, start_of_previous, end_of_previous
+        )
         
         # Calculate changes (differences)
         changes = self._calculateChanges(today_stats, yesterday_stats)
@@ -65,13 +81,52 @@ class CreateDailyReportCtrl:
         # Get category breakdown
         category_breakdown = self._getCategoryBreakdown(start_of_day, end_of_day)
         
-        return {
+        report = {
             'report_date': report_date,
             'today_stats': today_stats,
             'yesterday_stats': yesterday_stats,
             'changes': changes,
             'category_breakdown': category_breakdown
         }
+        report_cache.put('daily', report_date, report, previous_date, report_date)
+        return report
+    
+    def _getCachedReport(self, report_type, period_start, stats_keys):
+        """
+        Look up a finished report in the report cache
+        
+        Args:
+            report_type: 'daily', 'weekly' or 'monthly'
+            period_start: First day of the report period
+            stats_keys: Report keys holding stats dicts (current and previous period)
+            
+        Returns:
+            dict: The cached report with cumulative figures refreshed, or None
+        """
+        report = report_cache.get(report_type, period_start)
+        if report is None:
+            return None
+        
+        # Cumulative figures describe the current state, so refresh them on every hit
+        cumulative = self._getCumulativeStats()
+        for key in stats_keys:
+            report[key].update(cumulative)
+        for key, value in cumulative.items():
+            report['changes'][key]['value'] = value
+        return report
+    
+    def _getCumulativeStats(self):
+        """
+        Get the all-time request figures shown alongside every report
+        
+        Returns:
+            dict: total_requests and pending_requests
+        """
+        total_requests, pending_requests = self.session.query(
+            func.count(Request.request_id),
+            _count_if(Request.status == 'Pending'),
+        ).one()
+        return {'total_requests': total_requests, 'pending_requests': pending_requests}
     
     def _getDailyStats(self, start_datetime, end_datetime):
         """
@@ -84,72 +139,92 @@ class CreateDailyReportCtrl:
         Returns:
             dict: Statistics for the period
         """
-        # New requests created
-        new_requests = self.session.query(Request).filter(
-            and_(
-                Request.created_at >= start_datetime,
-                Request.created_at <= end_datetime
-            )
-        ).count()
-        
-        # Requests completed (status changed to Completed)
-        completed_requests = self.session.query(Request).filter(
-            and_(
-                Request.updated_at >= start_datetime,
-                Request.updated_at <= end_datetime,
-                Request.status == 'Completed'
-            )
-        ).count()
+        stats, _ = self._getPeriodStats(start_datetime, end_datetime, start_datetime, end_datetime)
+        return stats
+    
+    def _getPeriodStats(self, start_datetime, end_datetime, prev_start_datetime, prev_end_datetime):
+        """
+        Get statistics for the report period and the period it is compared with
         
-        # New matches created
-        new_matches = self.session.query(Match).filter(
-            and_(
-                Match.created_at >= start_datetime,
-                Match.created_at <= end_datetime
-            )
-        ).count()
-        
-        # Matches completed
-        completed_matches = self.session.query(Match).filter(
-            and_(
-                Match.completed_at >= start_datetime,
-                Match.completed_at <= end_datetime,
-                Match.status == 'Completed'
-            )
-        ).count()
+        Both windows are counted in a single pass over each table using
+        conditional aggregates (SUM(CASE ...)), so a report costs one query
+        per table instead of one COUNT per statistic per period.
         
-        # New shortlists created
-        new_shortlists = self.session.query(Shortlist).filter(
-            and_(
-                Shortlist.shortlisted_at >= start_datetime,
-                Shortlist.shortlisted_at <= end_datetime
-            )
-        ).count()
+        Args:
+            start_datetime: Start of the report period
+            end_datetime: End of the report period
+            prev_start_datetime: Start of the comparison period
+            prev_end_datetime: End of the comparison period
+            
+        Returns:
+            tuple: (current_stats, previous_stats) dicts with the same keys
+        """
+        window_start = min(start_datetime, prev_start_datetime)
+        window_end = max(end_datetime, prev_end_datetime)
         
-        # New user accounts created
-        new_users = self.session.query(UserAccount).filter(
-            and_(
-                UserAccount.created_at >= start_datetime,
-                UserAccount.created_at <= end_datetime
+        # Requests: new/completed per period, plus all-time total and current pending
+        request_row = self.session.query(
+            _count_if(_between(Request.created_at, start_datetime, end_datetime)),
+            _count_if(_between(Request.created_at, prev_start_datetime, prev_end_datetime)),
+            _count_if(and_(_between(Request.updated_at, start_datetime, end_datetime),
+                           Request.status == 'Completed')),
+            _count_if(and_(_between(Request.updated_at, prev_start_datetime, prev_end_datetime),
+                           Request.status == 'Completed')),
+            func.count(Request.request_id),
+            _count_if(Request.status == 'Pending'),
+        ).one()
+        
+        # Matches: new (by created_at) and completed (by completed_at) per period
+        match_row = self.session.query(
+            _count_if(_between(Match.created_at, start_datetime, end_datetime)),
+            _count_if(_between(Match.created_at, prev_start_datetime, prev_end_datetime)),
+            _count_if(and_(_between(Match.completed_at, start_datetime, end_datetime),
+                           Match.status == 'Completed')),
+            _count_if(and_(_between(Match.completed_at, prev_start_datetime, prev_end_datetime),
+                           Match.status == 'Completed')),
+        ).filter(
+            or_(
+                _between(Match.created_at, window_start, window_end),
+                _between(Match.completed_at, window_start, window_end)
             )
-        ).count()
+        ).one()
+        
+        # Shortlists created per period
+        shortlist_row = self.session.query(
+            _count_if(_between(Shortlist.shortlisted_at, start_datetime, end_datetime)),
+            _count_if(_between(Shortlist.shortlisted_at, prev_start_datetime, prev_end_datetime)),
+        ).filter(_between(Shortlist.shortlisted_at, window_start, window_end)).one()
         
-        # Total requests (all time, for context)
-        total_requests = self.session.query(Request).count()
+        # User accounts created per period
+        user_row = self.session.query(
+            _count_if(_between(UserAccount.created_at, start_datetime, end_datetime)),
+            _count_if(_between(UserAccount.created_at, prev_start_datetime, prev_end_datetime)),
+        ).filter(_between(UserAccount.created_at, window_start, window_end)).one()
         
-        # Pending requests (current)
-        pending_requests = self.session.query(Request).filter_by(status='Pending').count()
+        total_requests = request_row[4]
+        pending_requests = request_row[5]
         
-        return {
-            'new_requests': new_requests,
-            'completed_requests': completed_requests,
-            'new_matches': new_matches,
-            'completed_matches': completed_matches,
-            'new_shortlists': new_shortlists,
-            'new_users': new_users,
+        current_stats = {
+            'new_requests': request_row[0],
+            'completed_requests': request_row[2],
+            'new_matches': match_row[0],
+            'completed_matches': match_row[2],
+            'new_shortlists': shortlist_row[0],
+            'new_users': user_row[0],
+            'total_requests': total_requests,
+            'pending_requests': pending_requests
+        }
+        previous_stats = {
+            'new_requests': request_row[1],
+            'completed_requests': request_row[3],
+            'new_matches': match_row[1],
+            'completed_matches': match_row[3],
+            'new_shortlists': shortlist_row[1],
+            'new_users': user_row[1],
             'total_requests': total_requests,
             'pending_requests': pending_requests
         }
+        return current_stats, previous_stats
     
     def _calculateChanges(self, today_stats, yesterday_stats):
         """
@@ -209,41 +284,124 @@ class CreateDailyReportCtrl:
         Returns:
             list: List of dicts with category statistics
         """
-        # Get all categories
-        categories = self.session.query(Category).all()
+        # Count new and completed requests per category in one grouped pass
+        category_counts = (
+            self.session.query(
+                Request.category_id.label('category_id'),
+                _count_if(_between(Request.created_at, start_datetime, end_datetime)).label('new_requests'),
+                _count_if(and_(_between(Request.updated_at, start_datetime, end_datetime),
+                               Request.status == 'Completed')).label('completed_requests'),
+            )
+            .filter(
+                or_(
+                    _between(Request.created_at, start_datetime, end_datetime),
+                    _between(Request.updated_at, start_datetime, end_datetime)
+                )
+            )
+            .group_by(Request.category_id)
+            .subquery()
+        )
         
-        breakdown = []
+        return self._joinCategoryCounts(category_counts)
+    
+    def _joinCategoryCounts(self, category_counts):
+        """
+        Attach per-category counts to every category
         
-        for category in categories:
-            # Count new requests in this category for the day
-            category_requests = self.session.query(Request).filter(
-                and_(
-                    Request.category_id == category.category_id,
-                    Request.created_at >= start_datetime,
-                    Request.created_at <= end_datetime
-                )
-            ).count()
-            
-            # Count completed requests in this category for the day
-            category_completed = self.session.query(Request).filter(
-                and_(
-                    Request.category_id == category.category_id,
-                    Request.updated_at >= start_datetime,
-                    Request.updated_at <= end_datetime,
-                    Request.status == 'Completed'
-                )
-            ).count()
+        Args:
+            category_counts: Subquery with category_id, new_requests and completed_requests columns
             
-            breakdown.append({
-                'category_id': category.category_id,
-                'category_title': category.title,
-                'new_requests': category_requests,
-                'completed_requests': category_completed,
-                'is_active': category.is_active
-            })
+        Returns:
+            list: List of dicts with category statistics, sorted by new_requests descending
+        """
+        # Outer join so categories with no activity still appear with zero counts
+        rows = (
+            self.session.query(
+                Category.category_id,
+                Category.title,
+                Category.is_active,
+                func.coalesce(category_counts.c.new_requests, 0),
+                func.coalesce(category_counts.c.completed_requests, 0),
+            )
+            .outerjoin(category_counts, category_counts.c.category_id == Category.category_id)
+            .order_by(Category.category_id)
+            .all()
+        )
+        
+        breakdown = [
+            {
+                'category_id': category_id,
+                'category_title': title,
+                'new_requests': new_requests,
+                'completed_requests': completed_requests,
+                'is_active': is_active
+            }
+            for category_id, title, is_active, new_requests, completed_requests in rows
+        ]
         
         # Sort by new_requests descending
         breakdown.sort(key=lambda x: x['new_requests'], reverse=True)
         
         return breakdown
-
+    
+    def _getRollupPeriodStats(self, start_date, end_date, prev_start_date, prev_end_date):
+        """
+        Same as _getPeriodStats, but summed from the daily_stats rollup instead of
+        scanning the fact tables (used for multi-day reports)
+        
+        Args:
+            start_date: First day of the report period
+            end_date: Last day of the report period
+            prev_start_date: First day of the comparison period
+            prev_end_date: Last day of the comparison period
+            
+        Returns:
+            tuple: (current_stats, previous_stats) dicts with the same keys
+        """
+        def sum_if(condition, column):
+            return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+        
+        current_window = _between(DailyStat.stat_date, start_date, end_date)
+        previous_window = _between(DailyStat.stat_date, prev_start_date, prev_end_date)
+        
+        columns = []
+        for metric in METRICS:
+            column = getattr(DailyStat, metric)
+            columns.append(sum_if(current_window, column))
+            columns.append(sum_if(previous_window, column))
+        
+        rollup_row = self.session.query(*columns).filter(
+            _between(DailyStat.stat_date, min(start_date, prev_start_date), max(end_date, prev_end_date))
+        ).one()
+        
+        # Cumulative figures are current state, not per-day activity
+        cumulative = self._getCumulativeStats()
+        
+        current_stats = {metric: rollup_row[2 * i] for i, metric in enumerate(METRICS)}
+        previous_stats = {metric: rollup_row[2 * i + 1] for i, metric in enumerate(METRICS)}
+        current_stats.update(cumulative)
+        previous_stats.update(cumulative)
+        return current_stats, previous_stats
+    
+    def _getRollupCategoryBreakdown(self, start_date, end_date):
+        """
+        Same as _getCategoryBreakdown, but summed from the daily_stats rollup
+        
+        Args:
+            start_date: First day of the report period
+            end_date: Last day of the report period
+            
+        Returns:
+            list: List of dicts with category statistics
+        """
+        category_counts = (
+            self.session.query(
+                DailyStat.category_id.label('category_id'),
+                func.sum(DailyStat.new_requests).label('new_requests'),
+                func.sum(DailyStat.completed_requests).label('completed_requests'),
+            )
+            .filter(_between(DailyStat.stat_date, start_date, end_date))
+            .group_by(DailyStat.category_id)
+            .subquery()
+        )
+        return self._joinCategoryCounts(category_counts)
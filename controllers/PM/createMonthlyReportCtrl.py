@@ -6,6 +6,7 @@ Generates monthly reports for Platform Managers
 from datetime import date, datetime, timedelta
 
 from controllers.PM.createDailyReportCtrl import CreateDailyReportCtrl
+from controllers.PM.reportCache import report_cache
 
 
 class CreateMonthlyReportCtrl(CreateDailyReportCtrl):
@@ -34,21 +35,23 @@ class CreateMonthlyReportCtrl(CreateDailyReportCtrl):
 
         last_of_month = next_month - timedelta(days=1)
 
-        start_datetime = datetime.combine(first_of_month, datetime.min.time())
-        end_datetime = datetime.combine(last_of_month, datetime.max.time())
-
         # previous month range
         prev_last = first_of_month - timedelta(days=1)
         prev_first = prev_last.replace(day=1)
-        prev_start_dt = datetime.combine(prev_first, datetime.min.time())
-        prev_end_dt = datetime.combine(prev_last, datetime.max.time())
 
-        current_stats = self._getDailyStats(start_datetime, end_datetime)
-        previous_stats = self._getDailyStats(prev_start_dt, prev_end_dt)
+        cached = self._getCachedReport("monthly", first_of_month, ("current_stats", "previous_stats"))
+        if cached is not None:
+            cached["report_date"] = anchor_date
+            return cached
+
+        # Multi-day periods are summed from the daily_stats rollup
+        current_stats, previous_stats = self._getRollupPeriodStats(
+            first_of_month, last_of_month, prev_first, prev_last
+        )
         changes = self._calculateChanges(current_stats, previous_stats)
-        category_breakdown = self._getCategoryBreakdown(start_datetime, end_datetime)
+        category_breakdown = self._getRollupCategoryBreakdown(first_of_month, last_of_month)
 
-        return {
+        report = {
             "report_date": anchor_date,
             "month_start": first_of_month,
             "month_end": last_of_month,
@@ -57,4 +60,6 @@ class CreateMonthlyReportCtrl(CreateDailyReportCtrl):
             "changes": changes,
             "category_breakdown": category_breakdown,
         }
+        report_cache.put("monthly", first_of_month, report, prev_first, last_of_month)
+        return report
 
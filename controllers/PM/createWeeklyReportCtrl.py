@@ -6,6 +6,7 @@ Generates weekly reports for Platform Managers
 from datetime import date, datetime, timedelta
 
 from controllers.PM.createDailyReportCtrl import CreateDailyReportCtrl
+from controllers.PM.reportCache import report_cache
 
 
 class CreateWeeklyReportCtrl(CreateDailyReportCtrl):
@@ -34,21 +35,22 @@ class CreateWeeklyReportCtrl(CreateDailyReportCtrl):
         start_of_week = anchor_date - timedelta(days=anchor_date.weekday())
         end_of_week = start_of_week + timedelta(days=6)
 
-        start_datetime = datetime.combine(start_of_week, datetime.min.time())
-        end_datetime = datetime.combine(end_of_week, datetime.max.time())
-
         previous_start = start_of_week - timedelta(days=7)
         previous_end = start_of_week - timedelta(days=1)
 
-        prev_start_dt = datetime.combine(previous_start, datetime.min.time())
-        prev_end_dt = datetime.combine(previous_end, datetime.max.time())
+        cached = self._getCachedReport("weekly", start_of_week, ("current_stats", "previous_stats"))
+        if cached is not None:
+            cached["report_date"] = anchor_date
+            return cached
 
-        current_stats = self._getDailyStats(start_datetime, end_datetime)
-        previous_stats = self._getDailyStats(prev_start_dt, prev_end_dt)
+        # Multi-day periods are summed from the daily_stats rollup
+        current_stats, previous_stats = self._getRollupPeriodStats(
+            start_of_week, end_of_week, previous_start, previous_end
+        )
         changes = self._calculateChanges(current_stats, previous_stats)
-        category_breakdown = self._getCategoryBreakdown(start_datetime, end_datetime)
+        category_breakdown = self._getRollupCategoryBreakdown(start_of_week, end_of_week)
 
-        return {
+        report = {
             "report_date": anchor_date,
             "week_start": start_of_week,
             "week_end": end_of_week,
@@ -57,4 +59,6 @@ class CreateWeeklyReportCtrl(CreateDailyReportCtrl):
             "changes": changes,
             "category_breakdown": category_breakdown,
         }
+        report_cache.put("weekly", start_of_week, report, previous_start, end_of_week)
+        return report
 
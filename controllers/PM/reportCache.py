@@ -0,0 +1,165 @@
+"""
+Report Cache
+In-process cache of finished Platform Manager report dicts
+
+Reports for fully elapsed periods (yesterday, last week, last month) are kept
+until evicted; reports for a period that is still running expire after a short
+TTL. Entries are dropped as soon as a committed write touches a day inside the
+window they were computed from (see DailyStat's dirty-day tracking). Every
+report lists the categories with their titles and status, so a committed
+category write drops them all.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import event
+
+from database.db_config import SessionLocal
+from entities.category import Category
+from entities.daily_stat import DIRTY_DAYS_KEY
+
+# Entries kept before the least recently used one is evicted
+MAX_ENTRIES = 256
+
+# Seconds a report for the current (still open) period stays valid
+CURRENT_PERIOD_TTL_SECONDS = 60
+
+# session.info flag: the open transaction wrote a category
+_CATEGORIES_CHANGED_KEY = 'report_categories_changed'
+
+
+class ReportCache:
+    """
+    LRU cache keyed by (report type, period start)
+
+    Each entry remembers the date window (comparison period start .. report
+    period end) its figures were computed from, so writes can invalidate
+    exactly the reports they affect.
+
+    Invalidation only sees commits made in this process; after running
+    database/rollup_daily_stats.py against a live server, restart it or call
+    clear().
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, current_ttl=CURRENT_PERIOD_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max(1, int(max_entries))
+        self.current_ttl = current_ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, report_type, period_start):
+        """Return a copy of the cached report, or None on a miss"""
+        key = (report_type, period_start)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] is not None and entry['expires_at'] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            report = entry['report']
+        return copy.deepcopy(report)
+
+    def put(self, report_type, period_start, report, window_start, window_end, today=None):
+        """
+        Store a finished report
+
+        Args:
+            report_type: 'daily', 'weekly' or 'monthly'
+            period_start: First day of the report period (cache key)
+            report: The report dict
+            window_start: First day whose data the report depends on (comparison period start)
+            window_end: Last day of the report period
+            today: Override for the current date (defaults to date.today())
+        """
+        today = today or date.today()
+        closed = window_end < today
+        entry = {
+            'report': copy.deepcopy(report),
+            'window_start': window_start,
+            'window_end': window_end,
+            'expires_at': None if closed else self.clock() + self.current_ttl,
+        }
+        key = (report_type, period_start)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, start_date, end_date=None):
+        """
+        Drop every report whose window overlaps start_date..end_date
+
+        Returns:
+            int: Number of entries removed
+        """
+        end_date = end_date or start_date
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry['window_start'] <= end_date and start_date <= entry['window_end']
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+# Shared by every report controller in this process
+report_cache = ReportCache()
+
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _note_category_changes(db_session, flush_context):
+    """Remember that this transaction created, edited or deleted a category"""
+    if any(isinstance(obj, Category) for obj in (*db_session.new, *db_session.dirty, *db_session.deleted)):
+        db_session.info[_CATEGORIES_CHANGED_KEY] = True
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _invalidate_committed_days(db_session):
+    """Invalidate cached reports covering days written by the committed transaction"""
+    if db_session.info.pop(_CATEGORIES_CHANGED_KEY, False):
+        # Titles, status and the list of categories appear in every report
+        report_cache.invalidate(date.min, date.max)
+    for start_date, end_date in db_session.info.pop(DIRTY_DAYS_KEY, ()):
+        report_cache.invalidate(start_date, end_date)
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_rolled_back_days(db_session):
+    db_session.info.pop(DIRTY_DAYS_KEY, None)
+    db_session.info.pop(_CATEGORIES_CHANGED_KEY, None)
@@ -0,0 +1,324 @@
+"""
+Account Search Index
+In-process trigram index over user account names for the User Admin search
+
+UserAccount.searchUserAccount runs four LIKE '%kw%' predicates and returns
+every match unsorted. This index keeps the distinct words of every account's
+username, email, first and last name, with trigram postings over those words,
+so a search scores each candidate word once instead of every account row. It
+tolerates typos ('jhon' finds "john") and returns the ids ranked best match
+first.
+
+Each query word is scored against the account's closest word:
+
+    1.0   same word
+    0.95  the account word starts with it
+    0.9   the account word contains it (so every old LIKE match still scores >= 0.9)
+    else  the better of the trigram similarity |shared| / |union| (as in
+          PostgreSQL's pg_trgm) and 1 - edit distance / longer length, the
+          latter only within typo_edits() edits (a swap of neighbouring
+          letters counts as one)
+
+An account matches when every query word scores above zero and their mean
+reaches ACCOUNT_SEARCH_MIN_SIMILARITY.
+
+The index is loaded on the first search. Accounts written through the ORM in
+this process (createAccount, updateAccount, suspendUser, activate, ...) are
+reloaded on the next search after their transaction commits; writes made by
+other processes are picked up by the full reload every
+ACCOUNT_SEARCH_REFRESH_SECONDS.
+"""
+
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from sqlalchemy import event
+
+from database.db_config import SessionLocal
+from entities.user_account import UserAccount
+
+# Lowest mean word score for a match (0..1)
+MIN_SIMILARITY = float(os.environ.get("ACCOUNT_SEARCH_MIN_SIMILARITY", 0.5))
+
+# Seconds between full reloads from the database (0 = never)
+REFRESH_SECONDS = float(os.environ.get("ACCOUNT_SEARCH_REFRESH_SECONDS", 300))
+
+# session.info key listing the account ids flushed by the open transaction
+CHANGED_ACCOUNTS_KEY = 'account_search_changed'
+
+# Bound parameters per IN (...) query when reloading changed accounts
+REFRESH_CHUNK_SIZE = 900
+
+
+def normalize(text):
+    """Lower-case and strip accents, so 'Élodie' and 'elodie' index alike"""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def words(text):
+    return re.findall(r"\w+", normalize(text))
+
+
+def trigrams(word):
+    """Trigrams of one word, padded like pg_trgm: two spaces before, one after"""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def typo_edits(word):
+    """Edits tolerated in a query word: none up to 2 letters, 1 up to 5, else 2"""
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+def edit_distance(a, b):
+    """Optimal string alignment distance: insertions, deletions, substitutions and adjacent swaps"""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+def word_score(query_word, query_grams, word, grams):
+    if word == query_word:
+        return 1.0
+    if word.startswith(query_word):
+        return 0.95
+    if query_word in word:
+        return 0.9
+    shared = len(query_grams & grams)
+    score = shared / (len(query_grams) + len(grams) - shared) if shared else 0.0
+    edits = typo_edits(query_word)
+    if edits and abs(len(word) - len(query_word)) <= edits:
+        distance = edit_distance(query_word, word)
+        if distance <= edits:
+            score = max(score, 1.0 - distance / max(len(word), len(query_word)))
+    return score
+
+
+class _Account:
+    """What the index keeps per account"""
+
+    __slots__ = ('words', 'sort_key', 'user_profile_id', 'is_active')
+
+    def __init__(self, row):
+        user_id, username, email, first_name, last_name, user_profile_id, is_active = row
+        self.words = frozenset(
+            word for value in (username, email, first_name, last_name) for word in words(value)
+        )
+        self.sort_key = (normalize(username), user_id)
+        self.user_profile_id = user_profile_id
+        self.is_active = is_active
+
+
+class AccountSearchIndex:
+    """
+    Word vocabulary (word -> account ids, word -> trigrams) and trigram
+    postings (trigram -> words) over every account
+    """
+
+    def __init__(self, min_similarity=MIN_SIMILARITY, refresh_seconds=REFRESH_SECONDS, clock=time.monotonic):
+        self.min_similarity = min_similarity
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._reset()
+        self._stale = set()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.searches = 0
+        self.full_loads = 0
+        self.refreshed_accounts = 0
+
+    def search(self, session, keyword=None, profile_id=None, is_active=None):
+        """
+        Return the ids of the accounts matching keyword (all accounts without
+        one) and the profile / status filters: ranked best match first, or in
+        id order without a keyword
+        """
+        self._ensure_fresh(session)
+        query_words = [(word, trigrams(word)) for word in dict.fromkeys(words(keyword))]
+
+        with self._lock:
+            self.searches += 1
+            if not query_words:
+                return sorted(
+                    user_id for user_id, account in self._accounts.items()
+                    if self._passes(account, profile_id, is_active)
+                )
+
+            totals, matched = defaultdict(float), defaultdict(int)
+            for query_word, query_grams in query_words:
+                for user_id, score in self._best_scores(query_word, query_grams).items():
+                    totals[user_id] += score
+                    matched[user_id] += 1
+
+            ranked = []
+            for user_id, total in totals.items():
+                if matched[user_id] < len(query_words):
+                    continue
+                score = total / len(query_words)
+                account = self._accounts[user_id]
+                if score >= self.min_similarity and self._passes(account, profile_id, is_active):
+                    ranked.append((-score, account.sort_key, user_id))
+        ranked.sort()
+        return [user_id for _, _, user_id in ranked]
+
+    def invalidate(self, user_ids):
+        """Reload these accounts on the next search"""
+        with self._lock:
+            self._stale.update(user_ids)
+
+    def clear(self):
+        """Drop everything; the next search reloads every account"""
+        with self._lock:
+            self._reset()
+            self._stale.clear()
+            self._loaded_at = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'accounts': len(self._accounts),
+                'words': len(self._word_ids),
+                'trigrams': len(self._gram_words),
+                'stale': len(self._stale),
+                'searches': self.searches,
+                'full_loads': self.full_loads,
+                'refreshed_accounts': self.refreshed_accounts,
+            }
+
+    def _reset(self):
+        self._accounts = {}
+        self._word_ids = defaultdict(set)
+        self._word_grams = {}
+        self._gram_words = defaultdict(set)
+
+    def _best_scores(self, query_word, query_grams):
+        """user_id -> best word_score() of query_word among the account's words (zeros left out)"""
+        if len(query_word) >= 3:
+            candidates = set()
+            for gram in query_grams:
+                candidates.update(self._gram_words.get(gram, ()))
+        else:
+            # One- and two-letter words share no trigram with the words containing them
+            candidates = self._word_ids.keys()
+
+        best = {}
+        for word in candidates:
+            score = word_score(query_word, query_grams, word, self._word_grams[word])
+            if not score:
+                continue
+            for user_id in self._word_ids[word]:
+                if score > best.get(user_id, 0.0):
+                    best[user_id] = score
+        return best
+
+    @staticmethod
+    def _passes(account, profile_id, is_active):
+        if profile_id and account.user_profile_id != int(profile_id):
+            return False
+        return is_active is None or account.is_active == is_active
+
+    def _add(self, user_id, account):
+        """Called with self._lock held (or on structures not yet shared)"""
+        self._accounts[user_id] = account
+        for word in account.words:
+            if word not in self._word_grams:
+                grams = trigrams(word)
+                self._word_grams[word] = grams
+                for gram in grams:
+                    self._gram_words[gram].add(word)
+            self._word_ids[word].add(user_id)
+
+    def _remove(self, user_id):
+        """Called with self._lock held"""
+        account = self._accounts.pop(user_id, None)
+        if account is None:
+            return
+        for word in account.words:
+            ids = self._word_ids.get(word)
+            if ids is None:
+                continue
+            ids.discard(user_id)
+            if not ids:
+                del self._word_ids[word]
+                for gram in self._word_grams.pop(word):
+                    self._gram_words[gram].discard(word)
+                    if not self._gram_words[gram]:
+                        del self._gram_words[gram]
+
+    def _ensure_fresh(self, session):
+        with self._refresh_lock:
+            with self._lock:
+                expired = self._loaded_at is None or (
+                    self.refresh_seconds and self.clock() - self._loaded_at >= self.refresh_seconds
+                )
+                stale, self._stale = self._stale, set()
+            if expired:
+                self._load_all(session)
+            elif stale:
+                self._reload(session, stale)
+
+    def _load_all(self, session):
+        fresh = AccountSearchIndex.__new__(AccountSearchIndex)
+        fresh._reset()
+        for row in UserAccount.getSearchRows(session):
+            fresh._add(row[0], _Account(row))
+        with self._lock:
+            self._accounts, self._word_ids = fresh._accounts, fresh._word_ids
+            self._word_grams, self._gram_words = fresh._word_grams, fresh._gram_words
+            self._loaded_at = self.clock()
+            self.full_loads += 1
+
+    def _reload(self, session, user_ids):
+        user_ids = sorted(user_ids)
+        rows = {}
+        for start in range(0, len(user_ids), REFRESH_CHUNK_SIZE):
+            for row in UserAccount.getSearchRows(session, user_ids[start:start + REFRESH_CHUNK_SIZE]):
+                rows[row[0]] = row
+        with self._lock:
+            for user_id in user_ids:
+                self._remove(user_id)
+                if user_id in rows:
+                    self._add(user_id, _Account(rows[user_id]))
+            self.refreshed_accounts += len(user_ids)
+
+
+# Shared by every SearchUserAccountController in this process
+account_search_index = AccountSearchIndex()
+
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _collect_changed_accounts(db_session, flush_context):
+    """Remember which accounts this transaction wrote (ids are assigned by now)"""
+    changed = [
+        obj.id for obj in (*db_session.new, *db_session.dirty, *db_session.deleted)
+        if isinstance(obj, UserAccount) and obj.id is not None
+    ]
+    if changed:
+        db_session.info.setdefault(CHANGED_ACCOUNTS_KEY, set()).update(changed)
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _invalidate_changed_accounts(db_session):
+    changed = db_session.info.pop(CHANGED_ACCOUNTS_KEY, None)
+    if changed:
+        account_search_index.invalidate(changed)
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_rolled_back_accounts(db_session):
+    db_session.info.pop(CHANGED_ACCOUNTS_KEY, None)
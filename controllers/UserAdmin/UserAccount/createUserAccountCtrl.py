@@ -1,6 +1,7 @@
 # createUserAccountCtrl.py
 from entities.user_account import UserAccount as UA
 from database.db_config import get_session
+from controllers.passwordHasher import password_hasher, PasswordHasherBusy
 
 class CreateUserAccountCtrl:
     def __init__(self, session=None):
@@ -9,14 +10,19 @@ class CreateUserAccountCtrl:
     def createAccount(self, email, userName, firstName, lastName,
                 phoneNumber, userProfileID, password):
         
-        result = UA.createAccount(
-            self.session,
-            email=email,
-            userName=userName,
-            firstName=firstName,
-            lastName=lastName,
-            phoneNumber=phoneNumber,
-            userProfileID=userProfileID,
-            password=password,
-        )
-        return result # 1: Email in use, 2: Username in use, 3: Invalid profile, 4: Success
+        try:
+            result = UA.createAccount(
+                self.session,
+                email=email,
+                userName=userName,
+                firstName=firstName,
+                lastName=lastName,
+                phoneNumber=phoneNumber,
+                userProfileID=userProfileID,
+                password=password,
+                hasher=password_hasher,
+            )
+        except PasswordHasherBusy:
+            self.session.rollback()
+            return 5
+        return result # 1: Email in use, 2: Username in use, 3: Invalid profile, 4: Success, 5: Server busy
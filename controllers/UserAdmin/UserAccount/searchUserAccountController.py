@@ -1,10 +1,22 @@
 from entities.user_account import UserAccount as UA
 from database.db_config import get_session
+from controllers.paging import make_page_meta, sanitize_page
+from controllers.UserAdmin.UserAccount.accountSearchIndex import account_search_index
 
 class SearchUserAccountController:
-    def __init__(self):
+    def __init__(self, page_size=20):
         self.session = get_session()
+        self.page_size = int(page_size) if page_size and page_size > 0 else 20
 
-    def searchUserAccount(self, keyword, profile_id, is_active):
-        users = UA.searchUserAccount(self.session, keyword, profile_id, is_active)
-        return users
\ No newline at end of file
+    def searchUserAccount(self, keyword, profile_id, is_active, page=1):
+        """
+        Return (users, total_count, page_meta) for one page of matching accounts,
+        best keyword matches first (see accountSearchIndex.py)
+        """
+        page = sanitize_page(page)
+        user_ids = account_search_index.search(self.session, keyword, profile_id, is_active)
+        total_count = len(user_ids)
+        page_meta = make_page_meta(total_count, page, self.page_size)
+        page_ids = user_ids[page_meta["offset"]:page_meta["offset"] + page_meta["limit"]]
+        users = UA.findByIds(self.session, page_ids)
+        return users, total_count, page_meta
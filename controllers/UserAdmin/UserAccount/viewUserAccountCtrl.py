@@ -1,9 +1,14 @@
-from entities.user_account import UserAccount as UA
+from entities.user_account import UserAccount as UA, ACCOUNT_SORT_COLUMNS
 from database.db_config import get_session
+from controllers.paging import make_page_meta, sanitize_page
+
+# Largest page a caller may ask for
+MAX_PAGE_SIZE = 100
 
 class ViewUserAccountCtrl:
-    def __init__(self, session=None):
+    def __init__(self, session=None, page_size=20):
         self.session = session or get_session()
+        self.page_size = int(page_size) if page_size and page_size > 0 else 20
 
     def viewAccount(self, userID):
         user = UA.findById(self.session, userID)
@@ -11,5 +16,29 @@ class ViewUserAccountCtrl:
             return None  # Not found
         return user
     
-    def listAccounts(self):
-        return UA.getAllAccounts(self.session)
+    def listAccounts(self, page=1, sortBy='id', direction='asc', pageSize=None):
+        """
+        Return (items, total_count, page_meta) for one page of accounts, sorted
+        by a key of ACCOUNT_SORT_COLUMNS; page_meta also carries the sort applied
+        """
+        page = sanitize_page(page)
+        size = self._sanitize_page_size(pageSize)
+        sortBy = sortBy if sortBy in ACCOUNT_SORT_COLUMNS else 'id'
+        direction = 'desc' if direction == 'desc' else 'asc'
+        items, total_count = UA.findAccounts(
+            self.session,
+            sortBy=sortBy,
+            direction=direction,
+            page=page,
+            page_size=size
+        )
+        page_meta = make_page_meta(total_count, page, size)
+        page_meta.update(sort=sortBy, direction=direction)
+        return items, total_count, page_meta
+
+    def _sanitize_page_size(self, page_size):
+        try:
+            size = int(page_size or self.page_size)
+        except (TypeError, ValueError):
+            size = self.page_size
+        return min(max(1, size), MAX_PAGE_SIZE)
@@ -1,9 +1,14 @@
-from entities.user_profile import UserProfile as UP
+from entities.user_profile import UserProfile as UP, PROFILE_SORT_COLUMNS
 from database.db_config import get_session
+from controllers.paging import make_page_meta, sanitize_page
+
+# Largest page a caller may ask for
+MAX_PAGE_SIZE = 100
 
 class ViewUserProfileCtrl:
-    def __init__(self):
+    def __init__(self, page_size=20):
         self.session = get_session()
+        self.page_size = int(page_size) if page_size and page_size > 0 else 20
 
     def viewProfile(self, profileID):
         profile = UP.findById(self.session, profileID)
@@ -15,4 +20,31 @@ class ViewUserProfileCtrl:
         return UP.getActiveProfiles(self.session)
     
     def getAllProfiles(self):
-        return UP.getAllProfiles(self.session)
\ No newline at end of file
+        return UP.getAllProfiles(self.session)
+
+    def listProfiles(self, page=1, sortBy='id', direction='asc', pageSize=None):
+        """
+        Return (items, total_count, page_meta) for one page of profiles, sorted
+        by a key of PROFILE_SORT_COLUMNS; page_meta also carries the sort applied
+        """
+        page = sanitize_page(page)
+        size = self._sanitize_page_size(pageSize)
+        sortBy = sortBy if sortBy in PROFILE_SORT_COLUMNS else 'id'
+        direction = 'desc' if direction == 'desc' else 'asc'
+        items, total_count = UP.findProfiles(
+            self.session,
+            sortBy=sortBy,
+            direction=direction,
+            page=page,
+            page_size=size
+        )
+        page_meta = make_page_meta(total_count, page, size)
+        page_meta.update(sort=sortBy, direction=direction)
+        return items, total_count, page_meta
+
+    def _sanitize_page_size(self, page_size):
+        try:
+            size = int(page_size or self.page_size)
+        except (TypeError, ValueError):
+            size = self.page_size
+        return min(max(1, size), MAX_PAGE_SIZE)
@@ -1,7 +1,10 @@
 import bcrypt
-from flask import session
+from flask import session, g, has_request_context
+from sqlalchemy import inspect
 from entities.user_account import UserAccount
 from database.db_config import get_session
+from controllers.userCache import user_cache
+from controllers.passwordHasher import password_hasher
 
 
 class AuthenticationController:
@@ -11,7 +14,7 @@ class AuthenticationController:
     
     def login(self, username, password):
         try:
-            user = UserAccount.login(self.session, username, password)
+            user = UserAccount.login(self.session, username, password, hasher=password_hasher)
             if user:
                 session['user_id'] = user.id
                 session['username'] = user.username
@@ -21,12 +24,29 @@ class AuthenticationController:
             raise e
     
     def get_current_user(self):
+        """
+        Return the logged-in UserAccount (profile loaded), or None
+        
+        Resolved once per Flask request and kept in flask.g, so every boundary
+        and decorator on a page shares one lookup; across requests the
+        optional TTL user_cache can skip the query entirely.
+        """
         user_id = session.get('user_id')
         if not user_id:
             return None
         
-        db = get_session()
-        user = UserAccount.findById(self.session, user_id)
+        cached = g.get('current_user') if has_request_context() else None
+        if cached is not None and cached.id == user_id and not inspect(cached).detached:
+            return cached
+        
+        user = user_cache.get(self.session, user_id)
+        if user is None:
+            user = UserAccount.findById(self.session, user_id)
+            if user is not None:
+                user_cache.put(user)
+        
+        if has_request_context():
+            g.current_user = user
         return user
     
     def is_logged_in(self):
@@ -0,0 +1,145 @@
+"""
+History Facet Cache
+In-process cache of each user's completed-history service types and their
+match counts, used for the service type filter on the PIN and CSR Rep
+completed-history pages
+
+A user's facets are counted from the matches table on first use and then kept
+current incrementally: completing (or deleting) a completed match notes the
+change on the session (see Match.markFacetChange), and committed changes are
+applied to the cached counts of the match's PIN and CSR Rep. Writes made by
+other processes or scripts (seeding) are picked up once HISTORY_FACET_CACHE_TTL
+runs out.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+from database.db_config import SessionLocal
+from entities.match import FACET_CHANGES_KEY, Match
+
+# Seconds a user's facets stay valid (0 disables the cache)
+HISTORY_FACET_CACHE_TTL = float(os.environ.get("HISTORY_FACET_CACHE_TTL", 300))
+
+# Users kept before the least recently used one is evicted
+HISTORY_FACET_CACHE_SIZE = int(os.environ.get("HISTORY_FACET_CACHE_SIZE", 10000))
+
+
+class HistoryFacetCache:
+    """LRU cache of (role, user_id) -> {service_type: completed matches}"""
+
+    def __init__(self, ttl=HISTORY_FACET_CACHE_TTL, max_entries=HISTORY_FACET_CACHE_SIZE, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every applied change, so a count that raced one is not cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.updates = 0
+
+    @property
+    def enabled(self):
+        return bool(self.ttl and self.ttl > 0)
+
+    def get(self, session, role, user_id):
+        """
+        [(service_type, count)] of the user's completed matches by name
+
+        Args:
+            role: 'pin' or 'csr' (see Match.HISTORY_ROLES)
+        """
+        key = (role, int(user_id))
+        if self.enabled:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= self.clock():
+                    del self._entries[key]
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return sorted(entry[1].items())
+                self.misses += 1
+                generation = self._generation
+
+        facets = Match.countServiceTypes(session, role, user_id)
+        if self.enabled:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (self.clock() + self.ttl, dict(facets))
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return facets
+
+    def apply(self, changes):
+        """
+        Add committed changes to the cached users' counts
+
+        Args:
+            changes: (pin_id, csr_rep_id, service_type, delta) from Match.markFacetChange
+        """
+        with self._lock:
+            self._generation += 1
+            for pin_id, csr_rep_id, service_type, delta in changes:
+                if service_type is None:
+                    continue
+                for key in (("pin", pin_id), ("csr", csr_rep_id)):
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        continue
+                    counts = entry[1]
+                    count = counts.get(service_type, 0) + delta
+                    if count > 0:
+                        counts[service_type] = count
+                    else:
+                        counts.pop(service_type, None)
+                    self.updates += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'updates': self.updates,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+# Shared by the PIN and CSR Rep history controllers in this process
+history_facet_cache = HistoryFacetCache()
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _apply_committed_facet_changes(db_session):
+    """Update cached facets for the matches completed or deleted by the committed transaction"""
+    changes = db_session.info.pop(FACET_CHANGES_KEY, None)
+    if changes:
+        history_facet_cache.apply(changes)
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_rolled_back_facet_changes(db_session):
+    db_session.info.pop(FACET_CHANGES_KEY, None)
@@ -0,0 +1,69 @@
+"""
+History Paging
+Cursor and page-metadata helpers for the PIN and CSR Rep completed-history
+controllers (list and search)
+
+The history finders (Match.findCompletedBy*) page either by OFFSET (page) or by
+keyset seek (cursor); these helpers turn a finder's result into the pageMeta
+dict the boundaries render: controllers/paging.py's, plus the cursors.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+from controllers.paging import make_page_meta
+from entities.match import AtLeast, Match
+
+
+def sanitize_cursor(cursor: Optional[str]) -> Optional[str]:
+    """Drop malformed or stale-format cursors so the request falls back to page mode"""
+    if not cursor:
+        return None
+    try:
+        Match.decodeCursor(cursor)
+    except ValueError:
+        return None
+    return cursor
+
+
+def make_history_page_meta(
+    total_count: int,
+    page: int,
+    page_size: int,
+    items: Sequence[Any] = (),
+    cursors: Optional[Dict[str, Optional[str]]] = None,
+) -> Dict[str, Any]:
+    """
+    pageMeta for one history page
+
+    :param cursors: the finder's {"next", "prev"} cursors in cursor mode, None in
+                    page mode (cursors are then made from the page's first and
+                    last items)
+    """
+    page_meta = make_page_meta(total_count, page, page_size)
+    if cursors is None:
+        # Page mode: also hand out cursors so the next hop can seek
+        cursors = {
+            "next": Match.encodeCursor(items[-1], "next") if items and page_meta["hasNext"] else None,
+            "prev": Match.encodeCursor(items[0], "prev") if items and page_meta["hasPrev"] else None,
+        }
+    else:
+        # Cursor mode: page is only the caller's display hint
+        has_prev = cursors["prev"] is not None
+        has_next = cursors["next"] is not None
+        current_page = page_meta["page"]
+        if not has_prev:
+            current_page = 1
+        elif not has_next:
+            current_page = page_meta["totalPages"]
+        page_meta.update(
+            page=current_page,
+            hasPrev=1 if has_prev else 0,
+            hasNext=1 if has_next else 0,
+            offset=(current_page - 1) * page_size,
+        )
+    page_meta.update(
+        nextCursor=cursors["next"],
+        prevCursor=cursors["prev"],
+        totalCountExact=0 if isinstance(total_count, AtLeast) else 1,
+    )
+    return page_meta
@@ -0,0 +1,37 @@
+"""
+Paging
+Page-number and page-metadata helpers shared by the list and search controllers
+
+Controllers take the page number straight from the query string; these helpers
+sanitise it and turn a finder's total into the pageMeta dict the boundaries
+render. The completed-history controllers add cursors on top (see
+controllers/historyPaging.py).
+"""
+
+from typing import Any, Dict
+
+
+def sanitize_page(page: Any) -> int:
+    """The 1-based page number, 1 when missing or not a number"""
+    try:
+        p = int(page or 1)
+    except (TypeError, ValueError):
+        p = 1
+    return max(1, p)
+
+
+def make_page_meta(total_count: int, page: int, page_size: int) -> Dict[str, Any]:
+    """pageMeta for one page of page_size rows out of total_count"""
+    total_pages = max(1, (total_count + page_size - 1) // page_size)
+    # If requested page > total_pages, clamp to the last page in metadata
+    current_page = min(max(1, page), total_pages)
+    return {
+        "page": current_page,
+        "pageSize": page_size,
+        "totalPages": total_pages,
+        "totalCount": total_count,
+        "hasPrev": 1 if current_page > 1 else 0,
+        "hasNext": 1 if current_page < total_pages else 0,
+        "offset": (current_page - 1) * page_size,
+        "limit": page_size,
+    }
@@ -0,0 +1,217 @@
+"""
+Password Hasher
+Runs bcrypt hashing and checking on a bounded worker pool instead of the
+Flask request thread
+
+A bcrypt call costs tens to hundreds of milliseconds of CPU at the default
+work factor. Done inline, a burst of logins occupies every request thread and
+stalls unrelated pages. Here:
+
+    - hashes run on PASSWORD_HASH_WORKERS worker processes (default: one per core)
+    - at most PASSWORD_HASH_MAX_QUEUE calls wait for a worker; further calls are
+      rejected at once with PasswordHasherBusy instead of piling up
+    - a caller waits at most PASSWORD_HASH_TIMEOUT seconds for its result
+    - new hashes use PASSWORD_HASH_ROUNDS (bcrypt work factor; existing hashes
+      keep the factor they were made with)
+
+stats() reports queue wait and hash time (mean, p50, p95, max over the last
+METRICS_WINDOW calls) so the work factor and pool size can be tuned; it is
+served as JSON at /user-accounts/hash-stats.
+
+PASSWORD_HASH_EXECUTOR=thread uses threads instead of processes (bcrypt
+releases the GIL while hashing, so this still keeps request threads free, with
+less overhead); =inline hashes on the calling thread as before.
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing import get_context
+
+import bcrypt
+
+# Worker count (default: one per CPU core)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+# Calls allowed to wait for a worker before new ones are rejected
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", PASSWORD_HASH_WORKERS * 8))
+
+# Seconds a caller waits for its result (queue wait included)
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
+
+# bcrypt work factor for new hashes (each step doubles the cost)
+PASSWORD_HASH_ROUNDS = int(os.environ.get("PASSWORD_HASH_ROUNDS", 12))
+
+# 'process', 'thread' or 'inline'
+PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "process")
+
+# Calls kept for the percentile metrics
+METRICS_WINDOW = 1000
+
+
+class PasswordHasherBusy(ValueError):
+    """Raised when the hashing queue is full or a result does not arrive in time"""
+
+    def __init__(self, message="The server is busy. Please try again in a moment."):
+        super().__init__(message)
+
+
+def _timed(function, *args):
+    """Run in the worker: (result, wall-clock start, seconds spent)"""
+    started_at = time.time()
+    start = time.perf_counter()
+    result = function(*args)
+    return result, started_at, time.perf_counter() - start
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def _summary(samples):
+    if not samples:
+        return {'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    ordered = sorted(samples)
+    return {
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000.0, 2),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000.0, 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000.0, 2),
+        'max_ms': round(ordered[-1] * 1000.0, 2),
+    }
+
+
+class PasswordHasher:
+    """
+    hash() / check() with the same meaning as bcrypt.hashpw / bcrypt.checkpw,
+    executed on a lazily started worker pool
+    """
+
+    def __init__(self, workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_MAX_QUEUE,
+                 timeout=PASSWORD_HASH_TIMEOUT, rounds=PASSWORD_HASH_ROUNDS, executor=PASSWORD_HASH_EXECUTOR):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout = timeout
+        self.rounds = int(rounds)
+        self.executor_kind = executor
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # Free slots: one per worker plus one per allowed waiter
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._metrics_lock = threading.Lock()
+        self._queue_waits = deque(maxlen=METRICS_WINDOW)
+        self._hash_times = deque(maxlen=METRICS_WINDOW)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def hash(self, password):
+        """Return a new bcrypt hash (str) of password"""
+        return self._run(_hash, password, self.rounds)
+
+    def check(self, password, password_hash):
+        """True when password matches the stored bcrypt hash"""
+        return self._run(_check, password, password_hash)
+
+    def stats(self):
+        with self._metrics_lock:
+            return {
+                'executor': self.executor_kind,
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'timeout_s': self.timeout,
+                'rounds': self.rounds,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'queue_wait': _summary(self._queue_waits),
+                'hash_time': _summary(self._hash_times),
+            }
+
+    def shutdown(self):
+        self._discard_executor()
+
+    def _run(self, function, *args):
+        if self.executor_kind == "inline":
+            result, started_at, elapsed = _timed(function, *args)
+            self._record(0.0, elapsed)
+            return result
+
+        if not self._slots.acquire(blocking=False):
+            with self._metrics_lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+
+        submitted_at = time.time()
+        with self._metrics_lock:
+            self.in_flight += 1
+        try:
+            future = self._get_executor().submit(_timed, function, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+        try:
+            result, started_at, elapsed = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise PasswordHasherBusy()
+        except BrokenExecutor:
+            # A worker died; start a fresh pool for the next call
+            with self._metrics_lock:
+                self.errors += 1
+            self._discard_executor()
+            raise
+        except Exception:
+            with self._metrics_lock:
+                self.errors += 1
+            raise
+        self._record(max(0.0, started_at - submitted_at), elapsed)
+        return result
+
+    def _release(self):
+        with self._metrics_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _record(self, queue_wait, elapsed):
+        with self._metrics_lock:
+            self.completed += 1
+            self._queue_waits.append(queue_wait)
+            self._hash_times.append(elapsed)
+
+    def _discard_executor(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                if self.executor_kind == "thread":
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+                else:
+                    # spawn: never fork a process that may be holding other threads' locks.
+                    # Workers import the main module, so scripts must keep their
+                    # work under if __name__ == '__main__' (app.py does)
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+            return self._executor
+
+
+# Shared by the login and account-creation paths in this process
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.shutdown)
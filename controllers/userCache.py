@@ -0,0 +1,133 @@
+"""
+User Cache
+Short-lived, cross-request cache of the logged-in users' account and profile rows
+
+AuthenticationController.get_current_user() always keeps the resolved user in
+flask.g for the rest of the request. With CURRENT_USER_CACHE_TTL > 0 it also
+keeps the account and profile column values here, so later requests rebuild
+the user without a query. Entries are dropped when a committed transaction
+changed the account or any profile (see UserAccount.markChanged); changes made
+by other processes are picked up once the TTL runs out.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from database.db_config import SessionLocal
+from entities.user_account import UserAccount, CHANGED_USERS_KEY, ALL_USERS
+from entities.user_profile import UserProfile
+
+# Seconds a cached user stays valid (0 disables the cross-request cache)
+CURRENT_USER_CACHE_TTL = float(os.environ.get("CURRENT_USER_CACHE_TTL", 0))
+
+# Never cached: loaded from the database only if something asks for it
+UNCACHED_COLUMNS = {'password_hash'}
+
+
+def _columns(instance, exclude=()):
+    return {
+        attr.key: getattr(instance, attr.key)
+        for attr in inspect(instance).mapper.column_attrs
+        if attr.key not in exclude
+    }
+
+
+class UserCache:
+    """TTL cache of user_id -> (account columns, profile columns)"""
+
+    def __init__(self, ttl=CURRENT_USER_CACHE_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return bool(self.ttl and self.ttl > 0)
+
+    def get(self, session, user_id):
+        """
+        Return the cached user merged into session (no query), or None on a miss
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            _, account_columns, profile_columns = entry
+
+        profile = UserProfile(**profile_columns)
+        make_transient_to_detached(profile)
+        user = UserAccount(**account_columns)
+        user.user_profile = profile
+        make_transient_to_detached(user)
+        return session.merge(user, load=False)
+
+    def put(self, user):
+        """Remember a loaded user and its profile"""
+        if not self.enabled:
+            return
+        entry = (
+            self.clock() + self.ttl,
+            _columns(user, exclude=UNCACHED_COLUMNS),
+            _columns(user.user_profile),
+        )
+        with self._lock:
+            self._entries[user.id] = entry
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+            }
+
+
+# Shared by every AuthenticationController in this process
+user_cache = UserCache()
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _invalidate_changed_users(db_session):
+    """Drop cached users changed by the committed transaction"""
+    changed = db_session.info.pop(CHANGED_USERS_KEY, ())
+    if ALL_USERS in changed:
+        user_cache.clear()
+        return
+    for user_id in changed:
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _discard_rolled_back_users(db_session):
+    db_session.info.pop(CHANGED_USERS_KEY, None)
@@ -0,0 +1,408 @@
+"""
+Bulk Seed Script
+Generates production-sized data sets for load testing, much faster than
+seed_comprehensive_data.py:
+
+    - rows are built in memory and written with Core insert() executemany
+      batches of --batch-size rows, one transaction per table
+    - primary keys are assigned here (continuing after the current maximum),
+      so no row is read back to link requests, shortlists and matches
+    - the request search index is dropped during the load and rebuilt once
+    - the daily_stats rollup is rebuilt and the planner statistics refreshed
+      at the end
+
+Output is deterministic for a given --seed and --anchor date, whatever the
+local timezone. Accounts share the password --password, hashed once with a
+salt drawn from the seed. Run against an initialised database
+(python -m database.init_db) with no other writers.
+
+Usage:
+    python -m database.bulk_seed --users 100000 --categories 200 --requests 1000000 \\
+        --shortlists 500000 --matches 500000
+    python -m database.bulk_seed --requests 50000 --seed 7 --anchor 2025-06-30
+"""
+
+import argparse
+import random
+import time as clock
+from array import array
+from datetime import date, datetime, time, timedelta
+
+import bcrypt
+from sqlalchemy import func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from database import search_index
+from database.db_config import engine as default_engine
+from entities.category import Category
+from entities.daily_stat import DailyStat
+from entities.match import Match
+from entities.request import Request
+from entities.shortlist import Shortlist
+from entities.user_account import UserAccount
+from entities.user_profile import UserProfile
+
+FIRST_NAMES = ["John", "Sally", "Maria", "Wei", "Aisha", "Carlos", "Elodie", "Priya", "Tom", "Hana",
+               "Omar", "Grace", "Ivan", "Mei", "Lucas", "Zara", "Kofi", "Nina", "Raj", "Sofia"]
+LAST_NAMES = ["Smith", "Johnson", "Tan", "Garcia", "Nguyen", "Martin", "Okafor", "Lee", "Brown", "Khan",
+              "Silva", "Cohen", "Ito", "Novak", "Rossi", "Kim", "Ali", "Dubois", "Meyer", "Lopez"]
+REQUEST_TITLES = [
+    "Transportation to medical appointment", "Help with medication pickup", "Wheelchair assistance needed",
+    "Help moving furniture", "Home repairs needed", "Cleaning help needed", "Gardening assistance",
+    "Companionship needed", "Reading assistance", "Phone assistance", "Childcare assistance",
+    "Homework help for kids", "Meal preparation help", "Shopping assistance", "Event setup help",
+    "Community cleanup", "Tree planting help", "Document help", "Tech support", "Language learning",
+]
+REQUEST_DESCRIPTIONS = [
+    "Looking for a volunteer who can help this week.",
+    "Need assistance, flexible on timing.",
+    "Please contact me if you can help. Thank you!",
+    "Would appreciate help from someone nearby.",
+]
+# Share of requests that are completed (the rest are pending)
+COMPLETED_SHARE = 0.4
+# Timestamps are kept as seconds since this naive epoch, not datetime.timestamp(),
+# which reads naive datetimes as local time (and so shifts them across DST changes)
+EPOCH = datetime(1970, 1, 1)
+# bcrypt's base64 alphabet
+BCRYPT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def _random_time(rng, anchor, days):
+    """A datetime within the `days` days before anchor, to the second"""
+    return anchor - timedelta(seconds=rng.randrange(max(1, days) * 86400))
+
+
+def _seconds(value):
+    """Seconds since EPOCH of a naive datetime"""
+    return (value - EPOCH).total_seconds()
+
+
+def _from_seconds(seconds):
+    """Naive datetime `seconds` after EPOCH"""
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def _bcrypt_salt(rng, rounds):
+    """A bcrypt salt drawn from rng (gensalt() reads os.urandom)"""
+    # 16 salt bytes are 22 characters; the last holds 2 bits, so its low 4 are zero
+    chars = "".join(rng.choice(BCRYPT_ALPHABET) for _ in range(21)) + rng.choice(BCRYPT_ALPHABET[::16])
+    return f"$2b${rounds:02d}${chars}".encode("ascii")
+
+
+def _next_id(conn, column):
+    return (conn.execute(select(func.max(column))).scalar() or 0) + 1
+
+
+def _reset_sequence(conn, column):
+    """PostgreSQL: move the serial sequence past the ids assigned here"""
+    if conn.dialect.name == "postgresql":
+        table = column.table.name
+        conn.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table}', '{column.name}'), "
+            f"(SELECT MAX({column.name}) FROM {table}))"
+        )
+
+
+def _insert_rows(table, rows, count, batch_size, bind, label):
+    """Write the rows generator in executemany batches, in one transaction"""
+    started = clock.perf_counter()
+    written = 0
+    with bind.begin() as conn:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                conn.execute(insert(table), batch)
+                written += len(batch)
+                batch = []
+                print(f"  {label}: {written}/{count}", end="\r", flush=True)
+        if batch:
+            conn.execute(insert(table), batch)
+            written += len(batch)
+        _reset_sequence(conn, table.primary_key.columns.values()[0])
+    elapsed = clock.perf_counter() - started
+    print(f"✓ {written} {label} in {elapsed:.1f}s ({written / max(elapsed, 1e-9):,.0f} rows/s)")
+    return written
+
+
+class BulkSeeder:
+    """Generates and inserts one data set; ids of new rows are kept for linking"""
+
+    def __init__(self, bind=None, seed=42, anchor=None, days=365, batch_size=10000, password="bulk123",
+                 password_rounds=4, csr_share=0.5):
+        self.bind = bind or default_engine
+        self.seed = seed
+        self.anchor = datetime.combine(anchor or date.today(), time(12))
+        self.days = days
+        self.batch_size = batch_size
+        self.password = password
+        self.password_rounds = password_rounds
+        self.csr_share = csr_share
+        self.pin_ids, self.csr_ids = array('l'), array('l')
+        self.category_ids, self.category_titles = array('l'), {}
+        # Per request, in id order: owner, category, completed flag, created_at (epoch seconds)
+        self.first_request_id = None
+        self.request_owners, self.request_categories = array('l'), array('l')
+        self.request_completed, self.request_created = bytearray(), array('d')
+
+    def rng(self, table):
+        """Independent stream per table, so changing one count leaves the other tables unchanged"""
+        return random.Random(f"{self.seed}:{table}")
+
+    def seedUsers(self, count):
+        with self.bind.connect() as conn:
+            profiles = dict(conn.execute(select(UserProfile.profile_name, UserProfile.id)).all())
+            next_id = _next_id(conn, UserAccount.id)
+        if "PIN" not in profiles or "CSR Rep" not in profiles:
+            raise RuntimeError("PIN / CSR Rep profiles not found; run python -m database.init_db first")
+
+        rng = self.rng("users")
+        password_hash = bcrypt.hashpw(self.password.encode("utf-8"),
+                                      _bcrypt_salt(self.rng("password"), self.password_rounds)).decode("utf-8")
+
+        def rows():
+            for user_id in range(next_id, next_id + count):
+                is_csr = rng.random() < self.csr_share
+                (self.csr_ids if is_csr else self.pin_ids).append(user_id)
+                kind = "csr" if is_csr else "pin"
+                created_at = _random_time(rng, self.anchor, self.days)
+                yield {
+                    'id': user_id,
+                    'username': f"bulk{kind}{user_id}",
+                    'email': f"bulk{kind}{user_id}@example.com",
+                    'password_hash': password_hash,
+                    'first_name': rng.choice(FIRST_NAMES),
+                    'last_name': rng.choice(LAST_NAMES),
+                    'phone_number': f"555-{user_id % 10000:04d}",
+                    'user_profile_id': profiles["CSR Rep" if is_csr else "PIN"],
+                    'is_active': rng.random() >= 0.02,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+
+        return _insert_rows(UserAccount.__table__, rows(), count, self.batch_size, self.bind, "user accounts")
+
+    def seedCategories(self, count):
+        with self.bind.connect() as conn:
+            next_id = _next_id(conn, Category.category_id)
+            creator = conn.execute(
+                select(UserAccount.id).join(UserProfile, UserAccount.user_profile_id == UserProfile.id)
+                .where(UserProfile.profile_name == "Platform Manager").order_by(UserAccount.id).limit(1)
+            ).scalar() or conn.execute(select(func.min(UserAccount.id))).scalar()
+        if creator is None:
+            raise RuntimeError("No user accounts found; run python -m database.init_db first")
+
+        rng = self.rng("categories")
+
+        def rows():
+            for category_id in range(next_id, next_id + count):
+                created_at = _random_time(rng, self.anchor, self.days)
+                yield {
+                    'category_id': category_id,
+                    'created_by': creator,
+                    'title': f"Bulk Category {category_id}",
+                    'description': "Generated for load testing",
+                    'status': "Active",
+                    'is_active': True,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+
+        return _insert_rows(Category.__table__, rows(), count, self.batch_size, self.bind, "categories")
+
+    def _load_existing(self):
+        """Link to existing accounts and categories for whatever this run did not create"""
+        with self.bind.connect() as conn:
+            def ids_of(profile_name):
+                return array('l', conn.execute(
+                    select(UserAccount.id).join(UserProfile, UserAccount.user_profile_id == UserProfile.id)
+                    .where(UserProfile.profile_name == profile_name).order_by(UserAccount.id)
+                ).scalars())
+            if not self.pin_ids:
+                self.pin_ids = ids_of("PIN")
+            if not self.csr_ids:
+                self.csr_ids = ids_of("CSR Rep")
+            categories = conn.execute(
+                select(Category.category_id, Category.title).where(Category.is_active.is_(True))
+                .order_by(Category.category_id)
+            ).all()
+        self.category_titles = dict(categories)
+        self.category_ids = array('l', self.category_titles)
+
+    def seedRequests(self, count):
+        self._load_existing()
+        if not self.pin_ids or not self.category_ids:
+            raise RuntimeError("Requests need at least one PIN account and one active category")
+        with self.bind.connect() as conn:
+            next_id = _next_id(conn, Request.request_id)
+        self.first_request_id = next_id
+        rng = self.rng("requests")
+
+        def rows():
+            for request_id in range(next_id, next_id + count):
+                owner = self.pin_ids[rng.randrange(len(self.pin_ids))]
+                category_id = self.category_ids[rng.randrange(len(self.category_ids))]
+                completed = rng.random() < COMPLETED_SHARE
+                created_at = _random_time(rng, self.anchor, self.days)
+                self.request_owners.append(owner)
+                self.request_categories.append(category_id)
+                self.request_completed.append(completed)
+                self.request_created.append(_seconds(created_at))
+                yield {
+                    'request_id': request_id,
+                    'user_account_id': owner,
+                    'category_id': category_id,
+                    'title': f"{rng.choice(REQUEST_TITLES)} #{request_id}",
+                    'description': rng.choice(REQUEST_DESCRIPTIONS),
+                    'status': "Completed" if completed else "Pending",
+                    'view_count': rng.randint(0, 200),
+                    'created_at': created_at,
+                    'updated_at': created_at + timedelta(hours=rng.randint(0, 48)),
+                }
+
+        # Rebuilding the keyword index once is far cheaper than its per-row triggers
+        with self.bind.begin() as conn:
+            had_search_index = inspect(conn).has_table(search_index.FTS_TABLE)
+            if had_search_index:
+                search_index.drop_search_index(conn)
+        written = _insert_rows(Request.__table__, rows(), count, self.batch_size, self.bind, "requests")
+        if had_search_index:
+            started = clock.perf_counter()
+            with self.bind.begin() as conn:
+                search_index.create_search_index(conn, rebuild=True)
+            print(f"✓ search index rebuilt in {clock.perf_counter() - started:.1f}s")
+        return written
+
+    def _require_requests(self, what):
+        if not self.request_owners:
+            raise RuntimeError(f"{what} link to the requests generated in the same run; pass --requests")
+        if not self.csr_ids:
+            raise RuntimeError(f"{what} need at least one CSR Rep account")
+
+    def seedShortlists(self, count):
+        self._require_requests("Shortlists")
+        count = min(count, len(self.request_owners) * len(self.csr_ids))
+        with self.bind.connect() as conn:
+            next_id = _next_id(conn, Shortlist.shortlist_id)
+        rng = self.rng("shortlists")
+        anchor = _seconds(self.anchor)
+
+        def rows():
+            # (request, CSR Rep) pairs are unique (uq_shortlists_request_csr)
+            taken = set()
+            shortlist_id = next_id
+            while len(taken) < count:
+                index = rng.randrange(len(self.request_owners))
+                csr_id = self.csr_ids[rng.randrange(len(self.csr_ids))]
+                key = (index, csr_id)
+                if key in taken:
+                    continue
+                taken.add(key)
+                created = self.request_created[index]
+                yield {
+                    'shortlist_id': shortlist_id,
+                    'request_id': self.first_request_id + index,
+                    'csr_rep_id': csr_id,
+                    'shortlisted_at': _from_seconds(rng.uniform(created, max(created, anchor))),
+                }
+                shortlist_id += 1
+
+        return _insert_rows(Shortlist.__table__, rows(), count, self.batch_size, self.bind, "shortlists")
+
+    def seedMatches(self, count):
+        self._require_requests("Matches")
+        with self.bind.connect() as conn:
+            next_id = _next_id(conn, Match.match_id)
+        rng = self.rng("matches")
+        anchor = _seconds(self.anchor)
+
+        def rows():
+            for match_id in range(next_id, next_id + count):
+                index = rng.randrange(len(self.request_owners))
+                created = self.request_created[index]
+                created_at = _from_seconds(int(rng.uniform(created, max(created, anchor))))
+                if self.request_completed[index]:
+                    status = "Completed"
+                    completed_at = min(created_at + timedelta(days=rng.randint(1, 14)), self.anchor)
+                else:
+                    status, completed_at = rng.choice(("Pending", "In Progress")), None
+                yield {
+                    'match_id': match_id,
+                    'request_id': self.first_request_id + index,
+                    'pin_id': self.request_owners[index],
+                    'csr_rep_id': self.csr_ids[rng.randrange(len(self.csr_ids))],
+                    'status': status,
+                    'service_type': self.category_titles.get(self.request_categories[index]),
+                    'notes': "Generated for load testing",
+                    'created_at': created_at,
+                    'completed_at': completed_at,
+                    'updated_at': completed_at or created_at,
+                }
+
+        return _insert_rows(Match.__table__, rows(), count, self.batch_size, self.bind, "matches")
+
+    def finish(self):
+        """Rebuild the daily_stats rollup and refresh planner statistics"""
+        started = clock.perf_counter()
+        # On the seeder's own bind: the global session may point at another database
+        with Session(bind=self.bind) as session:
+            # Core inserts bypass the entity hooks, so rebuild the rollup from the facts
+            rollup_rows = DailyStat.backfill(session)
+        with self.bind.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        print(f"✓ {rollup_rows} daily stats rows rebuilt and statistics refreshed "
+              f"in {clock.perf_counter() - started:.1f}s")
+
+
+def run_bulk_seed(users=0, categories=0, requests=0, shortlists=0, matches=0, **options):
+    """
+    Generate the given number of rows per table (see BulkSeeder for options)
+
+    Returns:
+        dict: Rows written per table
+    """
+    seeder = BulkSeeder(**options)
+    written = {
+        'users': seeder.seedUsers(users) if users else 0,
+        'categories': seeder.seedCategories(categories) if categories else 0,
+        'requests': seeder.seedRequests(requests) if requests else 0,
+        'shortlists': seeder.seedShortlists(shortlists) if shortlists else 0,
+        'matches': seeder.seedMatches(matches) if matches else 0,
+    }
+    seeder.finish()
+    return written
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate large data sets for load testing")
+    parser.add_argument("--users", type=int, default=10000, help="PIN and CSR Rep accounts")
+    parser.add_argument("--csr-share", type=float, default=0.5, help="share of the accounts that are CSR Reps")
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--shortlists", type=int, default=50000)
+    parser.add_argument("--matches", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=365, help="days of history the timestamps cover")
+    parser.add_argument("--anchor", type=_parse_date, help="last day of history (YYYY-MM-DD, default today)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per executemany batch")
+    parser.add_argument("--password", default="bulk123", help="password of every generated account")
+    parser.add_argument("--password-rounds", type=int, default=4, help="bcrypt work factor of that password")
+    args = parser.parse_args()
+
+    started = clock.perf_counter()
+    written = run_bulk_seed(
+        users=args.users, categories=args.categories, requests=args.requests,
+        shortlists=args.shortlists, matches=args.matches,
+        seed=args.seed, anchor=args.anchor, days=args.days, batch_size=args.batch_size,
+        password=args.password, password_rounds=args.password_rounds, csr_share=args.csr_share,
+    )
+    print(f"✓ {sum(written.values())} rows in {clock.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from database.db_config import init_database, get_session
 from entities.user_profile import UserProfile
 from entities.user_account import UserAccount
 from entities.category import Category
+from entities.daily_stat import DailyStat
 import bcrypt
 
 
@@ -180,6 +181,10 @@ def seed_initial_data():
         else:
             print("✓ Categories already exists")
         
+        # Seeded accounts bypass the entity hooks, so rebuild the report rollup
+        DailyStat.backfill(session)
+        print("✓ Daily stats rollup rebuilt")
+        
     except Exception as e:
         session.rollback()
         print(f"✗ Error seeding data: {e}")
@@ -0,0 +1,93 @@
+"""
+Loader Options
+Per-view eager-loading profiles and a guard against lazy loads from templates
+
+Entities register the relationships each kind of page reads in a
+LOADER_OPTIONS dict, mapping a view name ('list', 'search', 'detail', ...) to a
+function that returns SQLAlchemy loader options:
+
+    LOADER_OPTIONS = {
+        'list': lambda: (joinedload(Request.pin),),
+    }
+
+Finders take a view argument and apply options_for(entity, view), and the
+boundaries name the view of the template they render. This way a page loads its
+relationships with its main query, not one lazy SELECT per row.
+
+With LAZY_LOAD_RAISE=1 (or app.testing) a relationship loaded from the database
+while a template renders raises LazyLoadDuringRender. This is the same check as
+lazy="raise", scoped to rendering, so a template that starts reading a
+relationship its view does not load fails in tests instead of quietly adding
+an N+1.
+Relationships already in the session's identity map cost no query and are allowed.
+"""
+
+import os
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import RelationshipProperty, Session
+
+# Raise on relationship lazy loads while a template renders
+LAZY_LOAD_RAISE = os.environ.get("LAZY_LOAD_RAISE", "0").lower() in ("1", "true", "yes")
+
+_rendering = ContextVar("rendering_template", default=None)
+
+
+class LazyLoadDuringRender(InvalidRequestError):
+    """A template read a relationship that its view did not eager-load"""
+
+
+def options_for(entity, view):
+    """
+    Loader options registered for view on entity (none for view=None)
+
+    Raises:
+        ValueError: If the entity has no such view
+    """
+    if view is None:
+        return ()
+    try:
+        factory = entity.LOADER_OPTIONS[view]
+    except (AttributeError, KeyError):
+        raise ValueError(f"{entity.__name__} has no loader options for view {view!r}") from None
+    return tuple(factory())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _refuse_lazy_load_while_rendering(orm_execute_state):
+    template = _rendering.get()
+    if template is None or not orm_execute_state.is_relationship_load:
+        return
+    path = orm_execute_state.loader_strategy_path
+    relationships = [str(p) for p in path.natural_path if isinstance(p, RelationshipProperty)] if path else []
+    relationship = " -> ".join(relationships) or "a relationship"
+    raise LazyLoadDuringRender(
+        f"Template {template!r} lazy-loaded {relationship}; "
+        f"eager-load it in the view's LOADER_OPTIONS"
+    )
+
+
+def init_app(app):
+    """Raise on lazy loads during this app's template rendering (LAZY_LOAD_RAISE or app.testing)"""
+    from flask import before_render_template, template_rendered
+
+    def _enabled():
+        return LAZY_LOAD_RAISE or app.testing
+
+    def _start_rendering(sender, template, context, **extra):
+        if _enabled():
+            _rendering.set(template.name)
+
+    def _finish_rendering(sender, template, context, **extra):
+        _rendering.set(None)
+
+    # weak=False: the receivers are closures with no other reference
+    before_render_template.connect(_start_rendering, app, weak=False)
+    template_rendered.connect(_finish_rendering, app, weak=False)
+
+    @app.teardown_request
+    def _stop_lazy_load_guard(exception=None):
+        # template_rendered does not fire when rendering raised
+        _rendering.set(None)
@@ -0,0 +1,154 @@
+"""
+Index Migration
+Brings an existing csr_volunteering.db up to the index set declared on the
+entity models.
+
+Base.metadata.create_all() only creates indexes together with their table, so
+databases created before the indexes were declared need this once:
+
+    1. create any missing tables (e.g. daily_stats)
+    2. remove duplicate (request_id, csr_rep_id) shortlists, keeping the oldest,
+       so the unique index can be built, and recount their days in daily_stats
+    3. create every missing index
+    4. ANALYZE so SQLite's planner has statistics for the new indexes
+    5. create and fill the request keyword search index (database/search_index.py)
+
+Safe to run repeatedly.
+
+Usage:
+    python -m database.migrate_indexes
+    python -m database.migrate_indexes --dry-run           # report only
+    python -m database.migrate_indexes --rebuild-search    # also refill the search index
+"""
+
+import argparse
+
+from sqlalchemy import func, inspect
+
+from database.db_config import Base, engine, get_session, close_session
+from database import search_index
+
+
+def find_duplicate_shortlists(session):
+    """
+    Return the Shortlist rows that duplicate an older shortlist of the same
+    request by the same CSR Rep
+    """
+    from entities.shortlist import Shortlist
+
+    keepers = (
+        session.query(func.min(Shortlist.shortlist_id))
+        .group_by(Shortlist.request_id, Shortlist.csr_rep_id)
+    )
+    return (
+        session.query(Shortlist)
+        .filter(Shortlist.shortlist_id.notin_(keepers))
+        .order_by(Shortlist.shortlist_id)
+        .all()
+    )
+
+
+def missing_indexes(bind):
+    """Return the declared Index objects that do not exist in the database yet"""
+    import entities  # noqa: F401  (registers every model with Base)
+
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(sorted(
+            (index for index in table.indexes if index.name not in existing), key=lambda index: index.name
+        ))
+    return missing
+
+
+def run_migration(dry_run=False, verbose=True, rebuild_search=False):
+    """
+    Apply the migration steps above
+
+    Args:
+        rebuild_search: refill the search index even if it already exists
+
+    Returns:
+        dict: Counts of removed duplicates and created indexes, and whether
+        the search index was created or rebuilt
+    """
+    import entities  # noqa: F401  (registers every model with Base)
+    from entities.daily_stat import DailyStat
+
+    def log(message):
+        if verbose:
+            print(message)
+
+    had_daily_stats = inspect(engine).has_table(DailyStat.__tablename__)
+    if not dry_run:
+        Base.metadata.create_all(bind=engine)
+
+    session = get_session()
+    try:
+        duplicates = find_duplicate_shortlists(session)
+        log(f"  duplicate shortlists: {len(duplicates)}")
+        if duplicates and not dry_run:
+            affected_days = {shortlist.shortlisted_at.date() for shortlist in duplicates}
+            for shortlist in duplicates:
+                session.delete(shortlist)
+            session.flush()
+            if had_daily_stats:
+                # Duplicates may or may not have been counted; recount their days
+                for day in sorted(affected_days):
+                    DailyStat.rebuildRange(session, day, day)
+            session.commit()
+
+        if not had_daily_stats and not dry_run:
+            log("  daily_stats was missing; backfilling")
+            DailyStat.backfill(session)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        close_session()
+
+    missing = missing_indexes(engine)
+    for index in missing:
+        columns = ", ".join(column.name for column in index.columns)
+        log(f"  {'would create' if dry_run else 'creating'} {index.name} ON {index.table.name} ({columns})")
+        if not dry_run:
+            index.create(bind=engine)
+
+    if missing and not dry_run:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+
+    search_built = False
+    with engine.begin() as conn:
+        if not search_index.supports_fts5(conn):
+            log("  search index: not supported by this database, keyword search uses ILIKE")
+        elif rebuild_search or not inspect(conn).has_table(search_index.FTS_TABLE):
+            log(f"  {'would build' if dry_run else 'building'} search index {search_index.FTS_TABLE}")
+            if not dry_run:
+                search_index.create_search_index(conn, rebuild=True)
+            search_built = True
+
+    return {'duplicate_shortlists': len(duplicates), 'indexes': len(missing), 'search_index': search_built}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create missing indexes on an existing database")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--rebuild-search", action="store_true", help="refill the keyword search index")
+    args = parser.parse_args()
+
+    print("Migrating database indexes...")
+    result = run_migration(dry_run=args.dry_run, rebuild_search=args.rebuild_search)
+    verb = "would be" if args.dry_run else "were"
+    print(f"✓ {result['duplicate_shortlists']} duplicate shortlists and "
+          f"{result['indexes']} missing indexes {verb} handled")
+    if result['search_index']:
+        print(f"✓ search index {'would be' if args.dry_run else 'was'} built")
+
+
+if __name__ == "__main__":
+    main()
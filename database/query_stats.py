@@ -0,0 +1,197 @@
+"""
+Query Statistics
+Counts the SQL statements each HTTP request runs, with their total database
+time and the slowest statements, from SQLAlchemy engine events.
+
+After init_app(app), every Flask request:
+
+    - is logged (logger "database.query_stats", WARNING) when it runs more
+      than QUERY_LOG_MAX_QUERIES statements, spends more than
+      QUERY_LOG_SLOW_MS in the database, or has a statement slower than
+      QUERY_LOG_SLOW_STATEMENT_MS; the log line names the slowest statements
+    - is added to route_stats, the per-route totals (requests, statements per
+      request, database time), e.g. for benchmarks/load_test.py
+    - in debug mode (or with QUERY_STATS_HEADERS=1) gets response headers
+      X-Query-Count, X-Query-Time-Ms and X-Query-Slowest-Ms
+
+A jump in statements per request on one route is usually an N+1: a template
+or loop touching a lazy relationship once per row.
+
+Statements run outside a Flask request (background flushes, scripts) are not
+counted.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Log a request above any of these (0 = never)
+QUERY_LOG_MAX_QUERIES = int(os.environ.get("QUERY_LOG_MAX_QUERIES", 30))
+QUERY_LOG_SLOW_MS = float(os.environ.get("QUERY_LOG_SLOW_MS", 500))
+QUERY_LOG_SLOW_STATEMENT_MS = float(os.environ.get("QUERY_LOG_SLOW_STATEMENT_MS", 200))
+
+# Add the X-Query-* headers outside debug mode too
+QUERY_STATS_HEADERS = os.environ.get("QUERY_STATS_HEADERS", "0").lower() in ("1", "true", "yes")
+
+# Slowest statements kept per request, and the characters logged of each
+SLOWEST_KEPT = 3
+STATEMENT_LOG_CHARS = 300
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("query_tracker", default=None)
+
+# connection.info key: start times of the statements running on it
+_START_TIMES_KEY = "query_stats_start"
+
+
+class QueryTracker:
+    """Statements run while one tracker is active"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self._slowest = []  # min-heap of (seconds, sequence, statement)
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        entry = (seconds, self.count, statement)
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, entry)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def total_ms(self):
+        return self.total_seconds * 1000.0
+
+    def slowest(self):
+        """[(ms, statement)] slowest first"""
+        return [(seconds * 1000.0, statement) for seconds, _, statement in sorted(self._slowest, reverse=True)]
+
+
+def start_tracking():
+    """Begin counting statements in this context; returns the token for stop_tracking()"""
+    return _current.set(QueryTracker())
+
+
+def stop_tracking(token):
+    """Stop counting and return the QueryTracker"""
+    tracker = _current.get()
+    try:
+        _current.reset(token)
+    except ValueError:
+        # Token from another context (e.g. a copied one); just stop tracking here
+        _current.set(None)
+    return tracker
+
+
+def current_tracker():
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tracker = _current.get()
+    start_times = conn.info.get(_START_TIMES_KEY)
+    if tracker is not None and start_times:
+        tracker.record(statement, time.perf_counter() - start_times.pop())
+
+
+class RouteStats:
+    """Totals per URL rule across requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def add(self, route, tracker):
+        with self._lock:
+            totals = self._routes.setdefault(route, [0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += tracker.count
+            totals[2] += tracker.total_ms
+            totals[3] = max(totals[3], tracker.count)
+
+    def snapshot(self):
+        """route -> {requests, queries_per_request, max_queries, db_ms_per_request}"""
+        with self._lock:
+            return {
+                route: {
+                    'requests': requests,
+                    'queries_per_request': round(queries / requests, 2),
+                    'max_queries': max_queries,
+                    'db_ms_per_request': round(db_ms / requests, 2),
+                }
+                for route, (requests, queries, db_ms, max_queries) in self._routes.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
+
+
+def _exceeds_thresholds(tracker):
+    if QUERY_LOG_MAX_QUERIES and tracker.count > QUERY_LOG_MAX_QUERIES:
+        return True
+    if QUERY_LOG_SLOW_MS and tracker.total_ms > QUERY_LOG_SLOW_MS:
+        return True
+    slowest = tracker.slowest()
+    return bool(QUERY_LOG_SLOW_STATEMENT_MS and slowest and slowest[0][0] > QUERY_LOG_SLOW_STATEMENT_MS)
+
+
+def init_app(app):
+    """Track the statements of every request handled by this Flask app"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_query_tracking():
+        g.query_stats_token = start_tracking()
+
+    @app.after_request
+    def _finish_query_tracking(response):
+        token = g.pop('query_stats_token', None)
+        if token is None:
+            return response
+        tracker = stop_tracking(token)
+        # Unmatched URLs share one bucket so stray paths cannot grow the table
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        route_stats.add(route, tracker)
+
+        if _exceeds_thresholds(tracker):
+            slowest = "; ".join(
+                f"{ms:.1f} ms {' '.join(statement.split())[:STATEMENT_LOG_CHARS]}"
+                for ms, statement in tracker.slowest()
+            )
+            logger.warning("%s %s: %d statements, %.1f ms in the database; slowest: %s",
+                           request.method, request.full_path.rstrip('?'), tracker.count, tracker.total_ms, slowest)
+
+        if app.debug or QUERY_STATS_HEADERS:
+            slowest = tracker.slowest()
+            response.headers['X-Query-Count'] = str(tracker.count)
+            response.headers['X-Query-Time-Ms'] = f"{tracker.total_ms:.1f}"
+            response.headers['X-Query-Slowest-Ms'] = f"{slowest[0][0]:.1f}" if slowest else "0.0"
+        return response
+
+    @app.teardown_request
+    def _drop_query_tracking(exception=None):
+        # after_request does not run when the view raised
+        token = g.pop('query_stats_token', None)
+        if token is not None:
+            stop_tracking(token)
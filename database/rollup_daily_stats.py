@@ -0,0 +1,77 @@
+"""
+Daily Stats Rollup Job
+Rebuilds the daily_stats rollup table from the requests, matches, shortlists
+and user_accounts tables.
+
+Day-to-day the rollup is maintained by hooks in the entity write paths; this
+job repairs it after writes that bypass those hooks (seed scripts, manual SQL).
+
+Usage:
+    python -m database.rollup_daily_stats               # rebuild yesterday and today
+    python -m database.rollup_daily_stats --days 7      # rebuild the last 7 days
+    python -m database.rollup_daily_stats --backfill    # rebuild the full history
+    python -m database.rollup_daily_stats --from 2025-01-01 --to 2025-03-31
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from database.db_config import get_session, close_session
+from entities.daily_stat import DailyStat
+
+
+def run_rollup(start_date=None, end_date=None, batch_days=31, verbose=True):
+    """
+    Rebuild the rollup for start_date..end_date in batches of batch_days days.
+    With no start_date the whole history is rebuilt.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    session = get_session()
+
+    def progress(batch_start, batch_end, written):
+        if verbose:
+            print(f"  {batch_start} .. {batch_end}: {written} rows written so far")
+
+    try:
+        return DailyStat.backfill(
+            session,
+            start_date=start_date,
+            end_date=end_date,
+            batch_days=batch_days,
+            progress=progress,
+        )
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        close_session()
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the daily_stats rollup table")
+    parser.add_argument("--backfill", action="store_true", help="rebuild the full history")
+    parser.add_argument("--days", type=int, default=2, help="rebuild the last N days (default 2)")
+    parser.add_argument("--from", dest="from_date", type=_parse_date, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="to_date", type=_parse_date, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--batch-days", type=int, default=31, help="days rebuilt per transaction")
+    args = parser.parse_args()
+
+    if args.backfill:
+        start_date, end_date = args.from_date, args.to_date
+    else:
+        end_date = args.to_date or date.today()
+        start_date = args.from_date or end_date - timedelta(days=max(1, args.days) - 1)
+
+    print("Rebuilding daily stats rollup...")
+    written = run_rollup(start_date, end_date, batch_days=args.batch_days)
+    print(f"✓ Daily stats rollup rebuilt ({written} rows)")
+
+
+if __name__ == "__main__":
+    main()
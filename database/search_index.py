@@ -0,0 +1,160 @@
+"""
+Request Search Index
+SQLite FTS5 index over the text a request keyword search looks at: the
+request's title and description and its PIN's username and first name.
+
+Keyword searches used to be four ILIKE '%kw%' predicates across requests and
+user_accounts, which no index can serve. requests_fts holds one row per
+request (rowid = request_id) and is kept in sync by triggers, so every write
+path - ORM, bulk UPDATE or raw SQL - updates it in the same transaction:
+
+    - requests: insert, delete, and updates of title / description / owner
+    - user_accounts: updates of username / first_name
+
+The index is created together with the requests table (see
+entities/request.py); existing databases get it from
+python -m database.migrate_indexes. Other backends, or SQLite builds without
+FTS5, keep using the ILIKE search.
+"""
+
+import re
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, Text, func, inspect, literal_column, select, text
+
+FTS_TABLE = "requests_fts"
+
+# bm25() column weights: title, description, username, first_name
+RANK_WEIGHTS = (10.0, 1.0, 4.0, 4.0)
+
+# Kept out of Base.metadata: create_all() must not create this as a plain table
+requests_fts = Table(
+    FTS_TABLE, MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("title", Text),
+    Column("description", Text),
+    Column("username", Text),
+    Column("first_name", Text),
+    # FTS5's hidden column named after the table; the left operand of MATCH
+    Column(FTS_TABLE, Text),
+)
+
+_OWNER_COLUMNS = (
+    "(SELECT username FROM user_accounts WHERE id = new.user_account_id), "
+    "(SELECT first_name FROM user_accounts WHERE id = new.user_account_id)"
+)
+
+DDL_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, description, username, first_name, tokenize = 'unicode61 remove_diacritics 2')",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON requests BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description, username, first_name) "
+    f"VALUES (new.request_id, new.title, new.description, {_OWNER_COLUMNS}); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON requests BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.request_id; END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    f"AFTER UPDATE OF title, description, user_account_id ON requests BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.request_id; "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description, username, first_name) "
+    f"VALUES (new.request_id, new.title, new.description, {_OWNER_COLUMNS}); END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_owner_au "
+    f"AFTER UPDATE OF username, first_name ON user_accounts BEGIN "
+    f"UPDATE {FTS_TABLE} SET username = new.username, first_name = new.first_name "
+    f"WHERE rowid IN (SELECT request_id FROM requests WHERE user_account_id = new.id); END",
+]
+
+TRIGGERS = (f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au", f"{FTS_TABLE}_owner_au")
+
+REBUILD_STATEMENTS = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description, username, first_name) "
+    "SELECT r.request_id, r.title, r.description, u.username, u.first_name "
+    "FROM requests r LEFT JOIN user_accounts u ON u.id = r.user_account_id",
+]
+
+# Engines known to have the index; negative answers are not cached so an index
+# added by the migration is picked up without a restart
+_indexed_engines = set()
+
+
+def supports_fts5(connection):
+    """True when the connection is SQLite with the FTS5 extension compiled in"""
+    if connection.dialect.name != "sqlite":
+        return False
+    options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def create_search_index(connection, rebuild=False):
+    """
+    Create requests_fts and its triggers if missing, filling the index when it
+    is new (or always, with rebuild=True). Runs on the given connection's
+    transaction.
+
+    Returns:
+        bool: False when the backend has no FTS5 (nothing was created)
+    """
+    if not supports_fts5(connection):
+        return False
+    existed = inspect(connection).has_table(FTS_TABLE)
+    for statement in DDL_STATEMENTS:
+        connection.exec_driver_sql(statement)
+    if rebuild or not existed:
+        for statement in REBUILD_STATEMENTS:
+            connection.exec_driver_sql(statement)
+    return True
+
+
+def drop_search_index(connection):
+    """Drop requests_fts and its triggers"""
+    if connection.dialect.name == "sqlite":
+        for trigger in TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        _indexed_engines.discard(connection.engine)
+
+
+def has_search_index(session):
+    """True when the session's database has requests_fts"""
+    bind = session.get_bind()
+    engine = getattr(bind, "engine", bind)
+    if engine in _indexed_engines:
+        return True
+    if engine.dialect.name != "sqlite":
+        return False
+    found = session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first() is not None
+    if found:
+        _indexed_engines.add(engine)
+    return found
+
+
+def build_match_query(keyword):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix
+    ('gro run' finds "Weekly Grocery Run"). None when the keyword has no words.
+    """
+    words = re.findall(r"\w+", keyword or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def ranked_matches(keyword):
+    """
+    Subquery of (request_id, rank) for the requests matching keyword, where a
+    lower rank is a better match, or None when the keyword has no words
+    """
+    match_query = build_match_query(keyword)
+    if match_query is None:
+        return None
+    rank = func.bm25(literal_column(FTS_TABLE), *RANK_WEIGHTS, type_=Float)
+    return (
+        select(requests_fts.c.rowid.label("request_id"), rank.label("rank"))
+        .where(requests_fts.c[FTS_TABLE].op("MATCH")(match_query))
+        .subquery("search_matches")
+    )
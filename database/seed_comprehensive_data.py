@@ -15,6 +15,7 @@ Generates large-scale demo data for final product demonstration:
   * 120 completed matches specifically by default CSR Rep (username: csr)
 
 This creates realistic data with timestamps for proper Daily/Weekly/Monthly report testing.
+For load-testing volumes use database/bulk_seed.py instead.
 """
 
 from database.db_config import get_session
@@ -24,6 +25,7 @@ from entities.request import Request
 from entities.shortlist import Shortlist
 from entities.match import Match
 from entities.category import Category
+from entities.daily_stat import DailyStat
 from datetime import datetime, timedelta
 import random
 import bcrypt
@@ -541,6 +543,13 @@ def generate_comprehensive_data():
         
         print(f"\n  Total Matches: {matches_created}")
         
+        print("\n6. REBUILDING DAILY STATS ROLLUP")
+        print("-" * 60)
+        
+        # Seeded rows bypass the entity hooks, so rebuild the report rollup from scratch
+        rollup_rows = DailyStat.backfill(session)
+        print(f"✓ {rollup_rows} daily stats rows rebuilt")
+        
         print("\n" + "=" * 60)
         print("COMPREHENSIVE DATA GENERATION COMPLETE!")
         print("=" * 60)
@@ -6,3 +6,4 @@ from .request import Request
 from .shortlist import Shortlist
 from .match import Match
 from .category import Category
+from .daily_stat import DailyStat
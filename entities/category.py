@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload
 from datetime import datetime
 from database.db_config import Base
+from database.loader_options import options_for
 
 class Category(Base):
     __tablename__ = 'categories'
@@ -30,16 +31,31 @@ class Category(Base):
     created_at = Column(DateTime, default=datetime.now, nullable=False)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
+    # Relationships each view's template reads (see database/loader_options.py)
+    LOADER_OPTIONS = {
+        'detail': lambda: (joinedload(Category.creator),),  # categories/view.html
+    }
+
     def __repr__(self):
         return f"<Category(id={self.category_id}, name='{self.title}')>"
     
-    def findById(session, category_id):
-        """Find a category by its ID"""
-        return session.query(Category).filter_by(category_id=category_id).first()
+    def findById(session, category_id, view=None):
+        """Find a category by its ID, eager-loading what view's template reads"""
+        return session.query(Category).options(*options_for(Category, view)).filter_by(category_id=category_id).first()
     
     def getAllCategories(session):
         """Get all categories"""
         return session.query(Category).all()
+
+    def getVersion(session, category_id):
+        """(updated_at of the category, of its creator) for the detail page, or None if not found"""
+        from entities.user_account import UserAccount as UA
+        return (
+            session.query(Category.updated_at, UA.updated_at)
+            .outerjoin(UA, Category.created_by == UA.id)
+            .filter(Category.category_id == category_id)
+            .first()
+        )
     
     def getActiveCategories(session):
         """Get all active categories"""
@@ -0,0 +1,295 @@
+"""
+ENTITY: DailyStat
+Pre-aggregated per-day, per-category activity counts used by Platform Manager reports
+"""
+
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Column, Integer, Date, UniqueConstraint, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from database.db_config import Base
+
+# category_id used for activity that has no category (uncategorised requests, new users)
+NO_CATEGORY = 0
+
+# session.info key listing the (start, end) day ranges touched by the open transaction
+DIRTY_DAYS_KEY = 'daily_stats_dirty_days'
+
+METRICS = (
+    'new_requests',
+    'completed_requests',
+    'new_matches',
+    'completed_matches',
+    'new_shortlists',
+    'new_users',
+)
+
+
+def _to_date(value):
+    """Normalise a DATE() result (str on SQLite, date elsewhere) or datetime to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class DailyStat(Base):
+    """
+    Entity class for the daily_stats rollup
+
+    One row per (stat_date, category_id) holding the counts that the weekly and
+    monthly reports would otherwise compute by scanning requests, matches,
+    shortlists and user_accounts. Rows are kept current by delta hooks in the
+    entity write paths and can be rebuilt from the fact tables at any time with
+    rebuildRange() (see database/rollup_daily_stats.py).
+    """
+    __tablename__ = 'daily_stats'
+    __table_args__ = (
+        UniqueConstraint('stat_date', 'category_id', name='uq_daily_stats_date_category'),
+    )
+
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Rollup key (category_id 0 = no category)
+    stat_date = Column(Date, nullable=False)
+    category_id = Column(Integer, default=NO_CATEGORY, nullable=False)
+
+    # Counters
+    new_requests = Column(Integer, default=0, nullable=False)
+    completed_requests = Column(Integer, default=0, nullable=False)
+    new_matches = Column(Integer, default=0, nullable=False)
+    completed_matches = Column(Integer, default=0, nullable=False)
+    new_shortlists = Column(Integer, default=0, nullable=False)
+    new_users = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyStat(date={self.stat_date}, category={self.category_id}, new_requests={self.new_requests})>"
+
+    # ---------------- INCREMENTAL HOOKS ----------------
+
+    @staticmethod
+    def markDirty(session, start_date, end_date=None):
+        """Note days changed by this transaction so caches can be invalidated on commit"""
+        session.info.setdefault(DIRTY_DAYS_KEY, []).append((start_date, end_date or start_date))
+
+    @classmethod
+    def applyDelta(cls, session, stat_date, category_id, **deltas):
+        """Add deltas to the counters of one (stat_date, category_id) row, creating it if needed"""
+        deltas = {k: v for k, v in deltas.items() if v}
+        if not deltas:
+            return
+        category_id = category_id or NO_CATEGORY
+        cls.markDirty(session, stat_date)
+        # One atomic upsert: a read-then-write loses concurrent increments and
+        # races the first insert of a (stat_date, category_id) row
+        session.execute(cls._upsertStatement(
+            session.get_bind().dialect.name,
+            {'stat_date': stat_date, 'category_id': category_id, **{m: deltas.get(m, 0) for m in METRICS}},
+            deltas,
+        ))
+
+    @classmethod
+    def _upsertStatement(cls, dialect, values, deltas):
+        """INSERT values, or add deltas to the existing row's counters, in this dialect"""
+        table = cls.__table__
+        if dialect in ('mysql', 'mariadb'):
+            statement = mysql.insert(table).values(**values)
+            return statement.on_duplicate_key_update(
+                {metric: table.c[metric] + statement.inserted[metric] for metric in deltas}
+            )
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        statement = insert(table).values(**values)
+        return statement.on_conflict_do_update(
+            index_elements=[table.c.stat_date, table.c.category_id],
+            set_={metric: table.c[metric] + statement.excluded[metric] for metric in deltas},
+        )
+
+    @classmethod
+    def _applyContributions(cls, session, before, after):
+        """Apply the difference between two Counters of (date, category, metric) -> count"""
+        diff = Counter(after)
+        diff.subtract(before)
+        grouped = {}
+        for (stat_date, category_id, metric), delta in diff.items():
+            if delta:
+                grouped.setdefault((stat_date, category_id), {})[metric] = delta
+        for (stat_date, category_id), deltas in grouped.items():
+            cls.applyDelta(session, stat_date, category_id, **deltas)
+
+    @staticmethod
+    def snapshotRequest(request):
+        """Capture the request fields that feed the rollup (call before and after a change)"""
+        return (request.created_at, request.updated_at, request.status, request.category_id)
+
+    @staticmethod
+    def _requestContributions(snapshot):
+        counts = Counter()
+        if snapshot is None:
+            return counts
+        created_at, updated_at, status, category_id = snapshot
+        category_id = category_id or NO_CATEGORY
+        counts[(_to_date(created_at), category_id, 'new_requests')] += 1
+        if status == 'Completed' and updated_at is not None:
+            counts[(_to_date(updated_at), category_id, 'completed_requests')] += 1
+        return counts
+
+    @classmethod
+    def recordRequestChange(cls, session, before, after):
+        """
+        Update the rollup for a request that was created (before=None), changed,
+        or deleted (after=None). before/after come from snapshotRequest().
+        """
+        cls._applyContributions(
+            session,
+            cls._requestContributions(before),
+            cls._requestContributions(after),
+        )
+
+    @staticmethod
+    def snapshotMatch(session, match):
+        """Capture the match fields that feed the rollup (call before and after a change)"""
+        from entities.request import Request
+        category_id = session.query(Request.category_id).filter_by(request_id=match.request_id).scalar()
+        return (match.created_at, match.completed_at, match.status, category_id)
+
+    @staticmethod
+    def _matchContributions(snapshot):
+        counts = Counter()
+        if snapshot is None:
+            return counts
+        created_at, completed_at, status, category_id = snapshot
+        category_id = category_id or NO_CATEGORY
+        counts[(_to_date(created_at), category_id, 'new_matches')] += 1
+        if status == 'Completed' and completed_at is not None:
+            counts[(_to_date(completed_at), category_id, 'completed_matches')] += 1
+        return counts
+
+    @classmethod
+    def recordMatchChange(cls, session, before, after):
+        """Update the rollup for a match that was created, changed or deleted"""
+        cls._applyContributions(
+            session,
+            cls._matchContributions(before),
+            cls._matchContributions(after),
+        )
+
+    @classmethod
+    def recordShortlist(cls, session, request_id, shortlisted_at, sign=1):
+        """Count (sign=1) or uncount (sign=-1) a shortlist on its request's category"""
+        from entities.request import Request
+        category_id = session.query(Request.category_id).filter_by(request_id=request_id).scalar()
+        cls.applyDelta(session, _to_date(shortlisted_at), category_id, new_shortlists=sign)
+
+    @classmethod
+    def recordUser(cls, session, created_at, sign=1):
+        """Count (sign=1) or uncount (sign=-1) a new user account"""
+        cls.applyDelta(session, _to_date(created_at), NO_CATEGORY, new_users=sign)
+
+    # ---------------- REBUILD FROM FACT TABLES ----------------
+
+    @classmethod
+    def rebuildRange(cls, session, start_date, end_date):
+        """
+        Recompute rollup rows for start_date..end_date (inclusive) from the fact
+        tables, replacing whatever is stored for those days. Does not commit.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        from entities.request import Request
+        from entities.match import Match
+        from entities.shortlist import Shortlist
+        from entities.user_account import UserAccount
+
+        start_dt = datetime.combine(start_date, time.min)
+        end_dt = datetime.combine(end_date, time.max)
+        request_category = func.coalesce(Request.category_id, NO_CATEGORY)
+
+        sources = [
+            ('new_requests', Request.created_at, request_category, None, []),
+            ('completed_requests', Request.updated_at, request_category, None,
+             [Request.status == 'Completed']),
+            ('new_matches', Match.created_at, request_category, Match.request, []),
+            ('completed_matches', Match.completed_at, request_category, Match.request,
+             [Match.status == 'Completed']),
+            ('new_shortlists', Shortlist.shortlisted_at, request_category, Shortlist.request, []),
+            ('new_users', UserAccount.created_at, None, None, []),
+        ]
+
+        totals = {}
+        for metric, column, category, join, filters in sources:
+            day = func.date(column)
+            group_by = [day] if category is None else [day, category]
+            query = session.query(*group_by, func.count())
+            if join is not None:
+                query = query.join(join)
+            rows = (
+                query.filter(column >= start_dt, column <= end_dt, *filters)
+                .group_by(*group_by)
+                .all()
+            )
+            for row in rows:
+                stat_date, count = row[0], row[-1]
+                category_id = row[1] if category is not None else NO_CATEGORY
+                key = (_to_date(stat_date), category_id or NO_CATEGORY)
+                totals.setdefault(key, dict.fromkeys(METRICS, 0))[metric] += count
+
+        session.query(cls).filter(
+            cls.stat_date >= start_date, cls.stat_date <= end_date
+        ).delete(synchronize_session=False)
+        cls.markDirty(session, start_date, end_date)
+
+        if totals:
+            session.execute(cls.__table__.insert(), [
+                {'stat_date': stat_date, 'category_id': category_id, **counts}
+                for (stat_date, category_id), counts in totals.items()
+            ])
+        return len(totals)
+
+    @classmethod
+    def backfill(cls, session, start_date=None, end_date=None, batch_days=31, progress=None):
+        """
+        Rebuild the rollup over a date range in bounded batches of batch_days,
+        committing after each batch. Defaults to the full recorded history.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        from entities.request import Request
+        from entities.match import Match
+        from entities.shortlist import Shortlist
+        from entities.user_account import UserAccount
+
+        if start_date is None or end_date is None:
+            # Facts may carry future timestamps (e.g. scheduled completions), so
+            # cover everything from the earliest to the latest recorded activity
+            columns = (Request.created_at, Request.updated_at, Match.created_at, Match.completed_at,
+                       Shortlist.shortlisted_at, UserAccount.created_at)
+            bounds = [
+                (_to_date(low), _to_date(high))
+                for low, high in (
+                    session.query(func.min(column), func.max(column)).one() for column in columns
+                )
+                if low is not None
+            ]
+            if not bounds:
+                return 0
+            if start_date is None:
+                start_date = min(low for low, _ in bounds)
+            if end_date is None:
+                end_date = max([date.today()] + [high for _, high in bounds])
+
+        batch_days = max(1, int(batch_days))
+        written = 0
+        batch_start = start_date
+        while batch_start <= end_date:
+            batch_end = min(batch_start + timedelta(days=batch_days - 1), end_date)
+            written += cls.rebuildRange(session, batch_start, batch_end)
+            session.commit()
+            if progress:
+                progress(batch_start, batch_end, written)
+            batch_start = batch_end + timedelta(days=1)
+        return written
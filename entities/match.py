@@ -3,13 +3,63 @@ ENTITY: Match
 Represents a match between a PIN's request and a CSR Rep volunteer
 """
 
+import base64
+import binascii
+import json
 from datetime import datetime, time, date
-from typing import Optional, List, Tuple
+from typing import Any, Dict, NamedTuple, Optional, List, Tuple
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, desc
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text, and_, asc, desc, func, or_
 from sqlalchemy.orm import relationship, joinedload
 from database.db_config import Base
+from database.loader_options import options_for
+from entities.category import Category
 from entities.request import Request
+from entities.user_account import UserAccount
+
+# Dialects that sort NULL above every value unless told otherwise
+NULLS_SORT_HIGH_DIALECTS = {"postgresql", "oracle"}
+
+# session.info key listing the completed matches added to / removed from the
+# users' history facets by the open transaction (see markFacetChange)
+FACET_CHANGES_KEY = "match_facets_changed"
+
+# Tables joined by the lean history query (Match._summary_query), the PIN
+# history filters and Match.getDetailVersion. Plain table aliases, built once: aliased() classes cannot be made before the mappers are
+# configured, and making them per call costs more than the page query itself
+_summary_request = Request.__table__.alias("summary_request")
+_summary_pin = UserAccount.__table__.alias("summary_pin")
+_summary_csr_rep = UserAccount.__table__.alias("summary_csr_rep")
+
+
+class AtLeast(int):
+    """
+    A history total that is only a lower bound ("at least N"), returned by
+    the finders with exact_total=False. Behaves as the int it wraps.
+    """
+
+    def __repr__(self):
+        return f"AtLeast({int(self)})"
+
+
+class MatchSummary(NamedTuple):
+    """
+    One completed-history list row, returned by the finders with lean=True:
+    the match columns the list pages show plus the request title and both
+    users' names. None title / names mean the request / user row is missing.
+    """
+    match_id: int
+    request_id: int
+    pin_id: int
+    csr_rep_id: int
+    service_type: Optional[str]
+    completed_at: Optional[datetime]
+    created_at: datetime
+    request_title: Optional[str]
+    pin_first_name: Optional[str]
+    pin_last_name: Optional[str]
+    csr_rep_first_name: Optional[str]
+    csr_rep_last_name: Optional[str]
 
 
 class Match(Base):
@@ -21,6 +71,15 @@ class Match(Base):
     - A CSR Rep volunteer
     """
     __tablename__ = "matches"
+    __table_args__ = (
+        # Completed history (findCompletedBy*) in its sort order
+        Index("ix_matches_pin_history", "pin_id", "status", "completed_at", "created_at"),
+        Index("ix_matches_csr_history", "csr_rep_id", "status", "completed_at", "created_at"),
+        Index("ix_matches_request_id", "request_id"),
+        # Report range scans on new / completed matches
+        Index("ix_matches_created_at", "created_at"),
+        Index("ix_matches_completed_at", "completed_at"),
+    )
 
     # Primary key
     match_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -45,37 +104,281 @@ class Match(Base):
     pin = relationship("UserAccount", foreign_keys=[pin_id], back_populates="matches_as_pin")
     csr_rep = relationship("UserAccount", foreign_keys=[csr_rep_id], back_populates="matches_as_csr")
 
+    # Relationships each view's template reads (see database/loader_options.py);
+    # the history lists use lean MatchSummary rows instead
+    LOADER_OPTIONS = {
+        'detail': lambda: (  # completed_history/details.html
+            joinedload(Match.request).joinedload(Request.category),
+            joinedload(Match.pin),
+            joinedload(Match.csr_rep),
+        ),
+    }
+
+    # Whose completed history a facet count or cache entry is for: the PIN's
+    # (pin_id) or the CSR Rep's (csr_rep_id)
+    HISTORY_ROLES = ("pin", "csr")
+
     def __repr__(self):
         return f"<Match(id={self.match_id}, request={self.request_id}, status='{self.status}')>"
 
+    # ---------------- HISTORY PAGINATION ----------------
+    #
+    # Completed-history finders sort by completed_at DESC (NULLs last),
+    # created_at DESC, match_id DESC. Besides the page/OFFSET API they accept an
+    # opaque cursor naming the row to continue from, so deep pages are reached
+    # with an index seek instead of scanning and discarding every earlier row.
+
+    @staticmethod
+    def encodeCursor(match: "Match", direction: str = "next") -> str:
+        """Opaque cursor for the rows after (direction='next') or before ('prev') match (a Match or MatchSummary)"""
+        key = [
+            direction,
+            match.completed_at.isoformat() if match.completed_at else None,
+            match.created_at.isoformat(),
+            match.match_id,
+        ]
+        raw = json.dumps(key, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def decodeCursor(cursor: str) -> Tuple[str, Optional[datetime], datetime, int]:
+        """
+        Return (direction, completed_at, created_at, match_id) from encodeCursor()
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, completed_at, created_at, match_id = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in ("next", "prev"):
+                raise ValueError(direction)
+            return (
+                direction,
+                datetime.fromisoformat(completed_at) if completed_at else None,
+                datetime.fromisoformat(created_at),
+                int(match_id),
+            )
+        except (TypeError, ValueError, binascii.Error) as e:
+            raise ValueError(f"Invalid history cursor: {cursor!r}") from e
+
+    @classmethod
+    def _history_order(cls, reverse: bool = False, dialect: Optional[str] = None):
+        """
+        Newest completion first, NULL completed_at last. SQLite and MySQL already
+        sort NULL lowest (and MySQL has no NULLS FIRST/LAST), so the NULL placement
+        is only spelled out for dialects that sort NULL highest.
+        """
+        completed_at = asc(cls.completed_at) if reverse else desc(cls.completed_at)
+        if dialect in NULLS_SORT_HIGH_DIALECTS:
+            completed_at = completed_at.nullsfirst() if reverse else completed_at.nullslast()
+        direction = asc if reverse else desc
+        return (completed_at, direction(cls.created_at), direction(cls.match_id))
+
+    @classmethod
+    def _seek_filter(cls, direction: str, completed_at: Optional[datetime], created_at: datetime, match_id: int):
+        """Rows strictly after ('next') or before ('prev') the cursor row in history order"""
+        if direction == "next":
+            tie = or_(cls.created_at < created_at, and_(cls.created_at == created_at, cls.match_id < match_id))
+            if completed_at is None:
+                return and_(cls.completed_at.is_(None), tie)
+            return or_(
+                cls.completed_at < completed_at,
+                cls.completed_at.is_(None),
+                and_(cls.completed_at == completed_at, tie),
+            )
+
+        tie = or_(cls.created_at > created_at, and_(cls.created_at == created_at, cls.match_id > match_id))
+        if completed_at is None:
+            return or_(cls.completed_at.isnot(None), and_(cls.completed_at.is_(None), tie))
+        return and_(
+            cls.completed_at.isnot(None),
+            or_(cls.completed_at > completed_at, and_(cls.completed_at == completed_at, tie)),
+        )
+
+    @classmethod
+    def _history_query(cls, session, lean: bool = False, eager: Tuple[Any, ...] = ()):
+        """Match query to filter; the eager relationships are only loaded for full (not lean) items"""
+        query = session.query(cls)
+        return query if lean else query.options(*(joinedload(relation) for relation in eager))
+
+    @classmethod
+    def _summary_query(cls, query, request_joined: bool = False):
+        """
+        The filtered query narrowed to the MatchSummary columns, with the
+        request and both users outer-joined for their title and names instead
+        of loading whole Request / UserAccount objects. request_joined: the
+        filters already join _summary_request, so its title is read from that
+        join rather than joining requests again
+        """
+        request, pin, csr_rep = _summary_request.c, _summary_pin.c, _summary_csr_rep.c
+        query = query.with_entities(
+            cls.match_id, cls.request_id, cls.pin_id, cls.csr_rep_id, cls.service_type,
+            cls.completed_at, cls.created_at, request.title,
+            pin.first_name, pin.last_name, csr_rep.first_name, csr_rep.last_name,
+        )
+        if not request_joined:
+            query = query.outerjoin(_summary_request, cls.request_id == request.request_id)
+        return (
+            query.outerjoin(_summary_pin, cls.pin_id == pin.id)
+            .outerjoin(_summary_csr_rep, cls.csr_rep_id == csr_rep.id)
+        )
+
+    @classmethod
+    def _paginate_history(
+        cls, query, page: int, page_size: int, cursor: Optional[str], exact_total: bool = True,
+        lean: bool = False, request_joined: bool = False,
+    ):
+        """
+        Page mode: return (items, total_count) using OFFSET.
+        Cursor mode: return (items, total_count, cursors) where cursors holds the
+        'next'/'prev' tokens for the neighbouring pages (None at either end).
+        Items are Match objects, or MatchSummary rows for a lean query
+        (request_joined as for _summary_query).
+
+        The exact total rides along as an uncorrelated scalar subquery
+        (SELECT count(*) ... without the eager-load joins), so the page and its
+        total come back in one statement. With exact_total=False nothing is
+        counted: total_count is the rows up to the end of this page plus one
+        when more follow, as AtLeast unless this is the last page. The total
+        is always counted on the filtered query alone, never the lean joins.
+        """
+        page_size = int(page_size)
+        dialect = query.session.get_bind().dialect.name
+        offset = max(0, (int(page) - 1) * page_size)
+        rows_query = cls._summary_query(query, request_joined) if lean else query
+
+        if cursor is None:
+            ordered = rows_query.order_by(*cls._history_order(dialect=dialect)).offset(offset)
+            if not exact_total:
+                rows = ordered.limit(page_size + 1).all()
+                items = cls._history_items(rows[:page_size], lean, counted=False)
+                return items, cls._lower_bound(offset + len(rows), len(rows) > page_size)
+            rows = ordered.add_columns(cls._count_column(query)).limit(page_size).all()
+            return cls._history_items(rows, lean, counted=True), cls._total_from(rows, query, offset)
+
+        direction, completed_at, created_at, match_id = cls.decodeCursor(cursor)
+        backwards = direction == "prev"
+        seek = (
+            rows_query.filter(cls._seek_filter(direction, completed_at, created_at, match_id))
+            .order_by(*cls._history_order(reverse=backwards, dialect=dialect))
+            .limit(page_size + 1)
+        )
+        if exact_total:
+            rows = seek.add_columns(cls._count_column(query)).all()
+            total_count = cls._total_from(rows, query, None)
+            rows = cls._history_items(rows, lean, counted=True)
+        else:
+            rows = cls._history_items(seek.all(), lean, counted=False)
+        has_more = len(rows) > page_size
+        items = rows[:page_size]
+        if backwards:
+            items.reverse()
+
+        cursors: Dict[str, Optional[str]] = {"next": None, "prev": None}
+        if items:
+            # Arriving from a cursor implies rows exist on the side we came from
+            if has_more or backwards:
+                cursors["next"] = cls.encodeCursor(items[-1], "next")
+            if has_more or not backwards:
+                cursors["prev"] = cls.encodeCursor(items[0], "prev")
+        if not exact_total:
+            # page is the caller's display hint of where this cursor page sits
+            total_count = cls._lower_bound(offset + len(items) + (1 if cursors["next"] else 0),
+                                           cursors["next"] is not None)
+        return items, total_count, cursors
+
+    @staticmethod
+    def _history_items(rows, lean: bool, counted: bool) -> List[Any]:
+        """Page rows without the total column: MatchSummary tuples (lean) or Match objects"""
+        if lean:
+            width = len(MatchSummary._fields)
+            return [MatchSummary._make(row[:width]) for row in rows]
+        return [row[0] for row in rows] if counted else list(rows)
+
+    @staticmethod
+    def _count_column(query):
+        """count(*) of the query's filtered rows, as a scalar subquery column"""
+        return (
+            query.enable_eagerloads(False)
+            .with_entities(func.count())
+            .order_by(None)
+            .scalar_subquery()
+            .label("total_count")
+        )
+
+    @staticmethod
+    def _total_from(rows, query, offset: Optional[int]) -> int:
+        if rows:
+            return rows[0][-1]
+        if offset == 0:
+            return 0
+        # Nothing on this page (past the end, or an exhausted cursor) to carry the total
+        return query.enable_eagerloads(False).with_entities(func.count()).order_by(None).scalar()
+
+    @staticmethod
+    def _lower_bound(count: int, more: bool) -> int:
+        return AtLeast(count) if more else count
+
+    # ---------------- HISTORY FACETS ----------------
+
+    @classmethod
+    def countServiceTypes(cls, session, role: str, user_id: int) -> List[Tuple[str, int]]:
+        """
+        [(service_type, count)] of the completed matches of a PIN (role='pin')
+        or CSR Rep (role='csr'), by service type name. Cached per user by
+        controllers.historyFacetCache.
+
+        Raises:
+            ValueError: If role is not 'pin' or 'csr'
+        """
+        if role not in cls.HISTORY_ROLES:
+            raise ValueError(f"Unknown history role: {role!r}")
+        user_column = cls.pin_id if role == "pin" else cls.csr_rep_id
+        rows = (
+            session.query(cls.service_type, func.count())
+            .filter(
+                user_column == int(user_id),
+                cls.status == "Completed",
+                cls.service_type.isnot(None),
+            )
+            .group_by(cls.service_type)
+            .order_by(cls.service_type)
+            .all()
+        )
+        return [(service_type, count) for service_type, count in rows if service_type]
+
+    def markFacetChange(self, session, delta: int):
+        """Note this completed match entering (+1) or leaving (-1) its users' facets, for caches on commit"""
+        session.info.setdefault(FACET_CHANGES_KEY, []).append(
+            (self.pin_id, self.csr_rep_id, self.service_type, delta)
+        )
+
     # ---------------- PIN QUERIES ----------------
 
     @classmethod
-    def _base_completed_query(cls, session, pin_id: int):
+    def _base_completed_query(cls, session, pin_id: int, lean: bool = False):
         return (
-            session.query(cls)
+            cls._history_query(session, lean)
             .filter(cls.pin_id == int(pin_id), cls.status == "Completed")
         )
 
     @classmethod
     def findCompletedByPin(
-        cls, session, pin_id: int, page: int = 1, page_size: int = 10
-    ) -> Tuple[List["Match"], int]:
+        cls, session, pin_id: int, page: int = 1, page_size: int = 10, cursor: Optional[str] = None,
+        exact_total: bool = True, lean: bool = False,
+    ) -> Tuple[Any, ...]:
         """
         Return (items, total_count) for completed matches belonging to pin_id,
-        sorted by most recent first, paginated.
+        sorted by most recent first, paginated. With a cursor from
+        encodeCursor() the page is fetched by keyset seek instead and
+        (items, total_count, cursors) is returned; page is then ignored.
+        exact_total=False skips counting (total_count may be an AtLeast).
+        lean=True returns MatchSummary rows instead of Match objects, for
+        list pages.
         """
-        query = cls._base_completed_query(session, pin_id)
-        total_count = query.count()
-
-        query = query.order_by(
-            desc(cls.completed_at).nullslast(),
-            desc(cls.created_at),
-        )
-
-        offset = max(0, (int(page) - 1) * int(page_size))
-        items = query.offset(offset).limit(int(page_size)).all()
-        return items, total_count
+        query = cls._base_completed_query(session, pin_id, lean)
+        return cls._paginate_history(query, page, page_size, cursor, exact_total, lean)
 
     @classmethod
     def findCompletedByPinWithFilters(
@@ -88,14 +391,19 @@ class Match(Base):
         toDate: Optional[date] = None,
         page: int = 1,
         page_size: int = 10,
-    ) -> Tuple[List["Match"], int]:
+        cursor: Optional[str] = None,
+        exact_total: bool = True,
+        lean: bool = False,
+    ) -> Tuple[Any, ...]:
         """
-        Completed matches for a PIN with optional filters and pagination.
+        Completed matches for a PIN with optional filters and pagination
+        (page or cursor, exact_total and lean, see findCompletedByPin).
         """
+        # Joined through the lean projection's alias, so a lean page reads the
+        # title from this join instead of joining requests a second time
         query = (
-            session.query(cls)
-            .join(cls.request)
-            .options(joinedload(cls.request))
+            cls._history_query(session, lean, eager=(cls.request,))
+            .join(_summary_request, cls.request_id == _summary_request.c.request_id)
             .filter(cls.pin_id == int(pinID), cls.status == "Completed")
         )
 
@@ -103,48 +411,27 @@ class Match(Base):
             query = query.filter(cls.service_type == str(serviceType).strip())
 
         if categoryID is not None:
-            query = query.filter(Request.category_id == int(categoryID))
+            query = query.filter(_summary_request.c.category_id == int(categoryID))
 
         if fromDate:
             query = query.filter(cls.completed_at >= datetime.combine(fromDate, time.min))
         if toDate:
             query = query.filter(cls.completed_at <= datetime.combine(toDate, time.max))
 
-        total_count = query.count()
-        query = query.order_by(desc(cls.completed_at).nullslast(), desc(cls.created_at))
-
-        offset = max(0, (int(page) - 1) * int(page_size))
-        items = query.offset(offset).limit(int(page_size)).all()
-        return items, total_count
+        return cls._paginate_history(query, page, page_size, cursor, exact_total, lean, request_joined=True)
 
     # ---------------- CSR QUERIES ----------------
 
     @classmethod
-    def _base_completed_query_for_csr(cls, session, csr_rep_id: int):
+    def _base_completed_query_for_csr(cls, session, csr_rep_id: int, lean: bool = False):
         return (
-            session.query(cls)
-            .options(
-                joinedload(cls.request),
-                joinedload(cls.pin),
-                joinedload(cls.csr_rep),
-            )
+            cls._history_query(session, lean, eager=(cls.request, cls.pin, cls.csr_rep))
             .filter(cls.csr_rep_id == int(csr_rep_id), cls.status == "Completed")
         )
     
     @classmethod
     def getServiceTypes(cls, session, csr_rep_id) -> List[str]:
-        rows = (
-            session.query(cls.service_type)
-            .filter(
-                cls.csr_rep_id == int(csr_rep_id),
-                cls.status == "Completed",
-                cls.service_type.isnot(None),
-            )
-            .distinct()
-            .order_by(cls.service_type)
-            .all()
-        )
-        return [r[0] for r in rows if r[0]]
+        return [service_type for service_type, _ in cls.countServiceTypes(session, "csr", csr_rep_id)]
 
     @classmethod
     def findCompletedByCSR(
@@ -153,13 +440,12 @@ class Match(Base):
         csr_rep_id: int,
         page: int = 1,
         page_size: int = 10,
-    ) -> Tuple[List["Match"], int]:
-        query = cls._base_completed_query_for_csr(session, csr_rep_id)
-        total_count = query.count()
-        query = query.order_by(desc(cls.completed_at).nullslast(), desc(cls.created_at))
-        offset = max(0, (int(page) - 1) * int(page_size))
-        items = query.offset(offset).limit(int(page_size)).all()
-        return items, total_count
+        cursor: Optional[str] = None,
+        exact_total: bool = True,
+        lean: bool = False,
+    ) -> Tuple[Any, ...]:
+        query = cls._base_completed_query_for_csr(session, csr_rep_id, lean)
+        return cls._paginate_history(query, page, page_size, cursor, exact_total, lean)
 
     @classmethod
     def findCompletedByCSRWithFilters(
@@ -171,8 +457,11 @@ class Match(Base):
         toDate: Optional[date] = None,
         page: int = 1,
         page_size: int = 10,
-    ) -> Tuple[List["Match"], int]:
-        query = cls._base_completed_query_for_csr(session, csrRepID)
+        cursor: Optional[str] = None,
+        exact_total: bool = True,
+        lean: bool = False,
+    ) -> Tuple[Any, ...]:
+        query = cls._base_completed_query_for_csr(session, csrRepID, lean)
 
         if serviceType and str(serviceType).strip():
             query = query.filter(cls.service_type == str(serviceType).strip())
@@ -182,25 +471,56 @@ class Match(Base):
         if toDate:
             query = query.filter(cls.completed_at <= datetime.combine(toDate, time.max))
 
-        total_count = query.count()
-        query = query.order_by(desc(cls.completed_at).nullslast(), desc(cls.created_at))
-        offset = max(0, (int(page) - 1) * int(page_size))
-        items = query.offset(offset).limit(int(page_size)).all()
-        return items, total_count
+        return cls._paginate_history(query, page, page_size, cursor, exact_total, lean)
+
+    # ---------------- STATUS CHANGES ----------------
+
+    def completeMatch(self, session, completed_at: Optional[datetime] = None) -> int:
+        """Mark the match as completed and record it in the daily rollup and history facets"""
+        from entities.daily_stat import DailyStat
+
+        if self.status == "Completed":
+            return 1  # Already completed
+
+        before = DailyStat.snapshotMatch(session, self)
+        self.status = "Completed"
+        self.completed_at = completed_at or datetime.now()
+        self.updated_at = datetime.now()
+        DailyStat.recordMatchChange(session, before, DailyStat.snapshotMatch(session, self))
+        self.markFacetChange(session, 1)
+        session.commit()
+        return 2  # Successfully completed
 
     @classmethod
-    def findById(cls, session, match_id: int):
+    def findById(cls, session, match_id: int, view: Optional[str] = "detail"):
         """
-        Fetch a single match by ID with relationships eagerly loaded,
-        so your template doesn't trigger a thousand lazy-loads.
+        Fetch a single match by ID with the relationships view's template
+        reads eagerly loaded, so it doesn't trigger lazy-loads.
         """
         return (
             session.query(cls)
-            .options(
-                joinedload(cls.request),
-                joinedload(cls.pin),
-                joinedload(cls.csr_rep),
+            .options(*options_for(cls, view))
+            .filter(cls.match_id == int(match_id))
+            .first()
+        )
+
+    @classmethod
+    def getDetailVersion(cls, session, match_id: int):
+        """
+        (status, csr_rep_id, updated_at of the match, its request, the
+        request's category, the PIN and the CSR Rep) for the details page, or
+        None if the match does not exist. One row, no objects loaded.
+        """
+        request, pin, csr_rep = _summary_request.c, _summary_pin.c, _summary_csr_rep.c
+        return (
+            session.query(
+                cls.status, cls.csr_rep_id, cls.updated_at, request.updated_at,
+                Category.updated_at, pin.updated_at, csr_rep.updated_at,
             )
+            .outerjoin(_summary_request, cls.request_id == request.request_id)
+            .outerjoin(Category, request.category_id == Category.category_id)
+            .outerjoin(_summary_pin, cls.pin_id == pin.id)
+            .outerjoin(_summary_csr_rep, cls.csr_rep_id == csr_rep.id)
             .filter(cls.match_id == int(match_id))
             .first()
-        )
\ No newline at end of file
+        )
@@ -1,11 +1,21 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, bindparam, event
 from sqlalchemy.orm import relationship, joinedload
 from datetime import datetime
 from database.db_config import Base
+from database import search_index
+from database.loader_options import options_for
 from entities.user_account import UserAccount
 
 class Request(Base):
     __tablename__ = 'requests'
+    __table_args__ = (
+        # A PIN's own requests, optionally by status (findRequests)
+        Index('ix_requests_owner_status', 'user_account_id', 'status'),
+        Index('ix_requests_category_id', 'category_id'),
+        # Report range scans on new / completed requests
+        Index('ix_requests_created_at', 'created_at'),
+        Index('ix_requests_updated_at', 'updated_at'),
+    )
     
     # Primary key
     request_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -40,21 +50,53 @@ class Request(Base):
     created_at = Column(DateTime, default=datetime.now, nullable=False)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
 
+    # Relationships each view's template reads (see database/loader_options.py)
+    LOADER_OPTIONS = {
+        'list': lambda: (joinedload(Request.pin),),      # requests/list.html
+        'search': lambda: (joinedload(Request.pin),),    # requests/search.html
+        'detail': lambda: (joinedload(Request.pin), joinedload(Request.category)),  # requests/view.html
+    }
+
     def __repr__(self):
         return f"<Request(id={self.request_id}, title='{self.title}', status='{self.status}', views={self.view_count})>"
     
-    def findById(session, request_id):
-        """Find a request by its ID"""
-        return session.query(Request).filter_by(request_id=request_id).first()
+    def findById(session, request_id, view=None):
+        """Find a request by its ID, eager-loading what view's template reads"""
+        return session.query(Request).options(*options_for(Request, view)).filter_by(request_id=request_id).first()
     
-    def getAllRequests(session):
-        """Get all requests"""
-        return session.query(Request).all()
+    def getAllRequests(session, view=None):
+        """Get all requests, eager-loading what view's template reads"""
+        return session.query(Request).options(*options_for(Request, view)).all()
     
     def increment_view(self, session):
-        """Increment and persist view count"""
-        self.view_count +=  1
+        """Atomically add one view and commit (unbuffered; see controllers/PIN/Request/viewCounter.py)"""
+        Request.addViews(session, {self.request_id: 1})
         session.commit()
+        session.refresh(self, ['view_count'])
+
+    def addViews(session, counts):
+        """
+        Add view counts in one executemany of
+        UPDATE requests SET view_count = view_count + :n WHERE request_id = :id
+
+        The increment happens in the database, so concurrent writers never lose
+        views. updated_at is left alone: a view is not an edit, and moving it
+        would also shift the request's 'completed' day in the daily rollup.
+        Does not commit.
+
+        Args:
+            counts: dict of request_id -> number of views to add
+        """
+        table = Request.__table__
+        rows = [{'id': request_id, 'n': n} for request_id, n in counts.items() if n]
+        if not rows:
+            return
+        statement = (
+            table.update()
+            .where(table.c.request_id == bindparam('id'))
+            .values(view_count=table.c.view_count + bindparam('n'), updated_at=table.c.updated_at)
+        )
+        session.execute(statement, rows)
     
     def createRequest(session, userID, title, categoryID, description):
         from entities.user_account import UserAccount as UA
@@ -63,63 +105,73 @@ class Request(Base):
             return 0 # User does not exist
 
         """Create a new request"""
+        from entities.daily_stat import DailyStat
+        now = datetime.now()
         request = Request(
             user_account_id=userID,
             title=title,
             category_id=categoryID,
-            description=description
+            description=description,
+            status='Pending',
+            created_at=now,
+            updated_at=now
         )
         session.add(request)
+        DailyStat.recordRequestChange(session, None, DailyStat.snapshotRequest(request))
         session.commit()
         return 1
     
     def updateRequest(self , session, title, categoryID, description, status):
         """Update request details"""
+        from entities.daily_stat import DailyStat
+        before = DailyStat.snapshotRequest(self)
         self.title = title
         self.category_id = categoryID
         self.description = description
         self.status = status
+        self.updated_at = datetime.now()
+        DailyStat.recordRequestChange(session, before, DailyStat.snapshotRequest(self))
         session.commit()
         return 1
     
     def deleteRequest(self, session):
         """Delete a request"""
+        from entities.daily_stat import DailyStat
+
         # Delete all related shortlists first (to avoid foreign key constraint violation)
         from entities.shortlist import Shortlist
         shortlists_to_delete = session.query(Shortlist).filter_by(request_id=self.request_id).all()
         for shortlist in shortlists_to_delete:
+            DailyStat.recordShortlist(session, self.request_id, shortlist.shortlisted_at, sign=-1)
             session.delete(shortlist)
         
         # Delete all related matches
         from entities.match import Match
         matches_to_delete = session.query(Match).filter_by(request_id=self.request_id).all()
         for match in matches_to_delete:
+            DailyStat.recordMatchChange(session, DailyStat.snapshotMatch(session, match), None)
+            if match.status == "Completed":
+                match.markFacetChange(session, -1)
             session.delete(match)
         
         # Now delete the request
+        DailyStat.recordRequestChange(session, DailyStat.snapshotRequest(self), None)
         session.delete(self)
         session.commit()
         return 2
     
-    def searchRequests(session, keyword, status):
+    def searchRequests(session, keyword, status, view='search'):
         """Search requests by keyword and status"""
         # query = session.query(Request)
         query = (
             session.query(Request)
             .join(UserAccount, Request.user_account_id == UserAccount.id)
-            .options(joinedload(Request.pin))
+            .options(*options_for(Request, view))
         )
         
         
         # Apply keyword filter
-        if keyword:
-            keyword_filter = f"%{keyword}%"
-            query = query.filter(
-                (Request.title.ilike(keyword_filter)) |
-                (Request.description.ilike(keyword_filter)) |
-                (UserAccount.username.ilike(keyword_filter)) |
-                (UserAccount.first_name.ilike(keyword_filter))
-            )
+        query, rank = Request.applyKeywordSearch(session, query, keyword)
         
         # Apply status filter
         if status:
@@ -128,4 +180,99 @@ class Request(Base):
             normalized_status = status.capitalize()
             query = query.filter(Request.status == normalized_status)
         
-        return query.all()
\ No newline at end of file
+        if rank is not None:
+            query = query.order_by(rank, Request.request_id)
+        return query.all()
+    
+    def applyKeywordSearch(session, query, keyword, joined_owner=True):
+        """
+        Restrict a query that selects from requests to the requests matching
+        keyword in title, description, PIN username or first name
+        
+        Uses the FTS5 index (database/search_index.py) when the database has
+        one: every word of keyword must start a word in one of those fields,
+        and the returned rank orders best matches first. Otherwise falls back
+        to substring ILIKE matching, with rank None.
+        
+        Args:
+            joined_owner: the query already joins UserAccount as the request's PIN
+                (only needed by the ILIKE fallback)
+        
+        Returns:
+            tuple: (query, rank column or None)
+        """
+        if not keyword:
+            return query, None
+        
+        if search_index.has_search_index(session):
+            matches = search_index.ranked_matches(keyword)
+            if matches is not None:
+                query = query.join(matches, matches.c.request_id == Request.request_id)
+                return query, matches.c.rank
+        
+        if not joined_owner:
+            query = query.join(UserAccount, Request.user_account_id == UserAccount.id)
+        keyword_filter = f"%{keyword}%"
+        query = query.filter(
+            (Request.title.ilike(keyword_filter)) |
+            (Request.description.ilike(keyword_filter)) |
+            (UserAccount.username.ilike(keyword_filter)) |
+            (UserAccount.first_name.ilike(keyword_filter))
+        )
+        return query, None
+    
+    def findRequests(session, ownerID=None, keyword=None, status=None, categoryID=None,
+                     page=1, page_size=20, view='list'):
+        """
+        Return (items, total_count) for one page of requests, filtered in the database
+        
+        Without a keyword requests come in request_id order; with one, best
+        matches first (see applyKeywordSearch).
+        
+        Args:
+            ownerID: Only requests created by this user account (PIN view)
+            keyword: Matched against title, description, PIN username and first name
+            status: 'pending' / 'completed' (case-insensitive)
+            categoryID: Only requests in this category
+            page: 1-based page number (clamped to the last page)
+            page_size: Rows per page
+            view: Loader options profile of the page rendering the items
+        """
+        query = session.query(Request)
+        
+        if ownerID is not None:
+            query = query.filter(Request.user_account_id == int(ownerID))
+        
+        query, rank = Request.applyKeywordSearch(session, query, keyword, joined_owner=False)
+        
+        if status:
+            query = query.filter(Request.status == status.capitalize())
+        
+        if categoryID:
+            query = query.filter(Request.category_id == int(categoryID))
+        
+        total_count = query.count()
+        
+        # A page past the end shows the last page, as the controllers' page_meta reports it
+        last_page = max(1, -(-total_count // int(page_size)))
+        offset = (min(max(1, int(page)), last_page) - 1) * int(page_size)
+        order = (rank, Request.request_id) if rank is not None else (Request.request_id,)
+        items = (
+            query.options(*options_for(Request, view))
+            .order_by(*order)
+            .offset(offset)
+            .limit(int(page_size))
+            .all()
+        )
+        return items, total_count
+
+
+@event.listens_for(Request.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    """Build the FTS5 keyword index whenever the requests table is created"""
+    search_index.create_search_index(connection)
+
+
+@event.listens_for(Request.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    search_index.drop_search_index(connection)
@@ -1,13 +1,25 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database.db_config import Base
+from database.loader_options import options_for
 from sqlalchemy.orm import joinedload
 from entities.request import Request
 from entities.user_account import UserAccount
 
+# Bound parameters per IN (...) query, kept under SQLite's default variable limit
+IN_CLAUSE_CHUNK_SIZE = 900
+
 class Shortlist(Base):
     __tablename__ = 'shortlists'
+    __table_args__ = (
+        # A CSR Rep shortlists a request at most once; also serves the
+        # per-request counts and the (request, CSR Rep) membership checks
+        Index('uq_shortlists_request_csr', 'request_id', 'csr_rep_id', unique=True),
+        Index('ix_shortlists_csr_rep_id', 'csr_rep_id'),
+        Index('ix_shortlists_shortlisted_at', 'shortlisted_at'),
+    )
     
     # Primary key
     shortlist_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -24,6 +36,11 @@ class Shortlist(Base):
     
     # Timestamp
     shortlisted_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    # Relationships each view's template reads (see database/loader_options.py)
+    LOADER_OPTIONS = {
+        'list': lambda: (joinedload(Shortlist.request).joinedload(Request.pin),),  # shortlist.html
+    }
     
     def __repr__(self):
         """String representation for debugging"""
@@ -44,6 +61,36 @@ class Shortlist(Base):
         """Count how many times a request has been shortlisted"""
         return session.query(cls).filter_by(request_id=request_id).count()
     
+    @classmethod
+    def countShortlistsForUser(cls, session, user_id, request_ids=None):
+        """
+        Count shortlists for the requests owned by a PIN in one grouped query
+        (one per IN_CLAUSE_CHUNK_SIZE ids when request_ids is given)
+        
+        Args:
+            request_ids: Only these requests (e.g. the ones on a list page);
+                None counts every request the PIN owns
+        
+        Returns:
+            dict: request_id -> shortlist count (0 for requests never shortlisted)
+        """
+        query = (
+            session.query(Request.request_id, func.count(cls.shortlist_id))
+            .outerjoin(cls, cls.request_id == Request.request_id)
+            .filter(Request.user_account_id == user_id)
+            .group_by(Request.request_id)
+        )
+        if request_ids is None:
+            return {request_id: count for request_id, count in query.all()}
+        
+        request_ids = list(dict.fromkeys(request_ids))
+        counts = {}
+        for start in range(0, len(request_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = request_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            rows = query.filter(Request.request_id.in_(chunk)).all()
+            counts.update((request_id, count) for request_id, count in rows)
+        return counts
+    
     @classmethod
     def checkIfShortlisted(cls, session, request_id, csr_rep_id):
         """Check if this request is shortlisted by the given CSR Rep"""
@@ -52,6 +99,25 @@ class Shortlist(Base):
             csr_rep_id=csr_rep_id
         ).first() is not None
     
+    @classmethod
+    def getShortlistedRequestIds(cls, session, csr_rep_id, request_ids):
+        """
+        Return the subset of request_ids shortlisted by the given CSR Rep
+        
+        Uses one IN (...) query per IN_CLAUSE_CHUNK_SIZE ids instead of one
+        query per request.
+        """
+        request_ids = list(dict.fromkeys(request_ids))
+        shortlisted = set()
+        for start in range(0, len(request_ids), IN_CLAUSE_CHUNK_SIZE):
+            chunk = request_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+            rows = session.query(cls.request_id).filter(
+                cls.csr_rep_id == csr_rep_id,
+                cls.request_id.in_(chunk)
+            ).all()
+            shortlisted.update(request_id for (request_id,) in rows)
+        return shortlisted
+    
     @classmethod
     def createShortlist(cls, session, request_id, csr_rep_id):
         
@@ -60,12 +126,23 @@ class Shortlist(Base):
         if existing:
             return 1 # Already shortlisted
 
+        from entities.daily_stat import DailyStat
         shortlist = cls(
             request_id=request_id,
-            csr_rep_id=csr_rep_id
+            csr_rep_id=csr_rep_id,
+            shortlisted_at=datetime.now()
         )
         session.add(shortlist)
-        session.commit()
+        DailyStat.recordShortlist(session, request_id, shortlist.shortlisted_at)
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            # Only a lost race with a concurrent shortlist of the same request
+            # (uq_shortlists_request_csr) means it is already shortlisted
+            if cls.checkIfShortlisted(session, request_id, csr_rep_id):
+                return 1 # Already shortlisted
+            raise
         return 2 # Successfully shortlisted
 
     @classmethod
@@ -78,31 +155,23 @@ class Shortlist(Base):
         if not shortlist:
             return 1 # Not part of shortlist
         
+        from entities.daily_stat import DailyStat
+        DailyStat.recordShortlist(session, request_id, shortlist.shortlisted_at, sign=-1)
         session.delete(shortlist)
         session.commit()
         return 2 # Successfully removed from shortlist
     
     @classmethod
-    def searchShortlist(cls, session, userID, keyword, categoryID):
+    def searchShortlist(cls, session, userID, keyword, categoryID, view='list'):
         query = (
             session.query(cls)
             .join(Request, cls.request_id == Request.request_id)
             .join(UserAccount, Request.user_account_id == UserAccount.id)
             .filter(cls.csr_rep_id == userID)
-            .options(
-                joinedload(cls.request).joinedload(Request.category),
-                joinedload(cls.request).joinedload(Request.pin)
-            )
+            .options(*options_for(cls, view))
         )
 
-        if keyword:
-            search_pattern = f"%{keyword}%"
-            query = query.filter(
-                (Request.title.ilike(search_pattern)) |
-                (Request.description.ilike(search_pattern)) |
-                (UserAccount.username.ilike(search_pattern)) |
-                (UserAccount.first_name.ilike(search_pattern))
-            )
+        query, rank = Request.applyKeywordSearch(session, query, keyword)
 
         if categoryID:
             try:
@@ -111,4 +180,59 @@ class Shortlist(Base):
             except ValueError:
                 pass
 
-        return query.all()
\ No newline at end of file
+        if rank is not None:
+            query = query.order_by(rank, cls.shortlist_id)
+        return query.all()
+
+    @classmethod
+    def findShortlists(cls, session, userID, keyword=None, categoryID=None, status=None,
+                       page=1, page_size=20, view='list'):
+        """
+        Return (items, total_count) for one page of a CSR Rep's shortlist
+
+        With a keyword, best matches come first (see Request.applyKeywordSearch);
+        otherwise the most recently shortlisted.
+
+        Args:
+            userID: The CSR Rep's user account id
+            keyword: Matched against request title, description, PIN username and first name
+            categoryID: Only requests in this category
+            status: 'pending' / 'completed' (case-insensitive)
+            page: 1-based page number
+            page_size: Rows per page
+            view: Loader options profile of the page rendering the items
+        """
+        query = (
+            session.query(cls)
+            .join(Request, cls.request_id == Request.request_id)
+            .filter(cls.csr_rep_id == userID)
+        )
+
+        query, rank = Request.applyKeywordSearch(session, query, keyword, joined_owner=False)
+
+        if categoryID:
+            try:
+                query = query.filter(Request.category_id == int(categoryID))
+            except ValueError:
+                pass
+
+        if status:
+            query = query.filter(Request.status == status.capitalize())
+
+        total_count = query.count()
+
+        if rank is not None:
+            order = (rank, cls.shortlist_id)
+        else:
+            order = (cls.shortlisted_at.desc(), cls.shortlist_id.desc())
+        # A page past the end shows the last page, as the controller's page_meta reports it
+        last_page = max(1, -(-total_count // int(page_size)))
+        offset = (min(max(1, int(page)), last_page) - 1) * int(page_size)
+        items = (
+            query.options(*options_for(cls, view))
+            .order_by(*order)
+            .offset(offset)
+            .limit(int(page_size))
+            .all()
+        )
+        return items, total_count
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, or_
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, asc, desc, or_
 from sqlalchemy.orm import relationship, joinedload
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
@@ -6,8 +6,20 @@ from database.db_config import Base
 import bcrypt
 from entities.user_profile import UserProfile
 
+# session.info key listing the user ids changed by the open transaction
+# (ALL_USERS when every cached user may be affected, e.g. a profile change)
+CHANGED_USERS_KEY = 'user_accounts_changed'
+ALL_USERS = '*'
+
 class UserAccount(Base):
     __tablename__ = 'user_accounts'
+    __table_args__ = (
+        Index('ix_user_accounts_user_profile_id', 'user_profile_id'),
+        Index('ix_user_accounts_created_at', 'created_at'),
+        # Sort orders of the admin account list (findAccounts)
+        Index('ix_user_accounts_name', 'last_name', 'first_name'),
+        Index('ix_user_accounts_is_active', 'is_active'),
+    )
     
     # Primary key
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -50,14 +62,27 @@ class UserAccount(Base):
     created_at = Column(DateTime, default=datetime.now, nullable=False)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
     
-    def login(session, username, password):
-        """Authenticate user by username and password"""
+    def markChanged(session, userID=ALL_USERS):
+        """Note an account (or every account) changed so cached users can be dropped on commit"""
+        session.info.setdefault(CHANGED_USERS_KEY, set()).add(userID)
+
+    def login(session, username, password, hasher=None):
+        """
+        Authenticate user by username and password
+        
+        hasher: object with check(password, password_hash) (e.g. the
+        controllers' PasswordHasher pool); bcrypt on this thread when None
+        """
         user = session.query(UserAccount).filter_by(
             username=username).options(joinedload(UserAccount.user_profile)).first()
         if not user:
             raise ValueError("No user found with this username.")
         
-        if not bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
+        if hasher is not None:
+            matches = hasher.check(password, user.password_hash)
+        else:
+            matches = bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8'))
+        if not matches:
             raise ValueError("Incorrect password.")
         
         if not user.is_active:
@@ -76,6 +101,38 @@ class UserAccount(Base):
         """Fetch all user accounts"""
         return session.query(UserAccount).options(joinedload(UserAccount.user_profile)).all()
     
+    def findAccounts(session, sortBy='id', direction='asc', page=1, page_size=20):
+        """
+        Return (items, total_count) for one page of user accounts (with profiles)
+        
+        Args:
+            sortBy: A key of ACCOUNT_SORT_COLUMNS; unknown keys sort by id
+            direction: 'asc' or 'desc'
+            page: 1-based page number (clamped to the last page)
+            page_size: Rows per page
+        """
+        query = session.query(UserAccount)
+        total_count = query.count()
+        
+        if sortBy == 'profile':
+            query = query.join(UserProfile, UserAccount.user_profile_id == UserProfile.id)
+        columns = ACCOUNT_SORT_COLUMNS.get(sortBy, ACCOUNT_SORT_COLUMNS['id'])
+        order = desc if direction == 'desc' else asc
+        # id last, so rows with equal sort values keep a stable page order
+        order_by = [order(column) for column in columns] + [order(UserAccount.id)]
+        
+        # A page past the end shows the last page, as the controller's page_meta reports it
+        last_page = max(1, -(-total_count // int(page_size)))
+        offset = (min(max(1, int(page)), last_page) - 1) * int(page_size)
+        items = (
+            query.options(joinedload(UserAccount.user_profile))
+            .order_by(*order_by)
+            .offset(offset)
+            .limit(int(page_size))
+            .all()
+        )
+        return items, total_count
+    
     def checkEmailExists(session, email, excludeID=None):
         """Check if an email already exists in the database"""
         query = session.query(UserAccount).filter(UserAccount.email == email)
@@ -91,7 +148,8 @@ class UserAccount(Base):
         return session.query(query.exists()).scalar()
     
     def createAccount(session, email, userName, firstName, lastName,
-                    phoneNumber, userProfileID, password):
+                    phoneNumber, userProfileID, password, hasher=None):
+        """hasher: object with hash(password) -> str; bcrypt on this thread when None"""
         
         # Normalize
         email_norm = (email or "").strip().lower()
@@ -113,7 +171,10 @@ class UserAccount(Base):
         if not password:
             raise ValueError("Password is required to create an account.")
 
-        pw_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+        if hasher is not None:
+            pw_hash = hasher.hash(password)
+        else:
+            pw_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
         user = UserAccount(
             username=username_norm,
@@ -128,6 +189,8 @@ class UserAccount(Base):
             updated_at=datetime.now(),
         )
         session.add(user)
+        from entities.daily_stat import DailyStat
+        DailyStat.recordUser(session, user.created_at)
         try:
             session.commit()
         except IntegrityError:
@@ -167,6 +230,7 @@ class UserAccount(Base):
         self.phone_number = phoneNumber
         self.user_profile_id = userProfileID
         self.updated_at = datetime.now()
+        UserAccount.markChanged(session, self.id)
         session.commit()
         return 4  # Success
     
@@ -176,6 +240,7 @@ class UserAccount(Base):
             return 1  # Already suspended
         self.is_active = False
         self.updated_at = datetime.now()
+        UserAccount.markChanged(session, self.id)
         session.commit()
         return 2 # Successfully suspended
     
@@ -185,9 +250,37 @@ class UserAccount(Base):
             return 1  # Already active
         self.is_active = True
         self.updated_at = datetime.now()
+        UserAccount.markChanged(session, self.id)
         session.commit()
         return 2 # Successfully activated
     
+    def findByIds(session, userIDs):
+        """Fetch user accounts (with profiles) by ID, in the order given; unknown IDs are skipped"""
+        userIDs = list(userIDs)
+        if not userIDs:
+            return []
+        users = (
+            session.query(UserAccount)
+            .filter(UserAccount.id.in_(userIDs))
+            .options(joinedload(UserAccount.user_profile))
+            .all()
+        )
+        by_id = {user.id: user for user in users}
+        return [by_id[userID] for userID in userIDs if userID in by_id]
+    
+    def getSearchRows(session, userIDs=None):
+        """
+        Return (id, username, email, first_name, last_name, user_profile_id, is_active)
+        rows for every account, or only for userIDs, without loading ORM objects
+        """
+        query = session.query(
+            UserAccount.id, UserAccount.username, UserAccount.email, UserAccount.first_name,
+            UserAccount.last_name, UserAccount.user_profile_id, UserAccount.is_active
+        )
+        if userIDs is not None:
+            query = query.filter(UserAccount.id.in_(list(userIDs)))
+        return query.all()
+    
     def searchUserAccount(session, keyword, profile_id, is_active):
         query = session.query(UserAccount)
 
@@ -196,10 +289,10 @@ class UserAccount(Base):
             search_pattern = f"%{keyword}%"
             query = query.filter(
                 or_(
-                    UserAccount.username.like(search_pattern),
-                    UserAccount.email.like(search_pattern),
-                    UserAccount.first_name.like(search_pattern),
-                    UserAccount.last_name.like(search_pattern)
+                    UserAccount.username.ilike(search_pattern),
+                    UserAccount.email.ilike(search_pattern),
+                    UserAccount.first_name.ilike(search_pattern),
+                    UserAccount.last_name.ilike(search_pattern)
                 )
             )
 
@@ -233,3 +326,14 @@ class UserAccount(Base):
             'updated_at': self.updated_at.strftime('%Y-%m-%d %H:%M:%S') if self.updated_at else None
         }
 
+
+# Sortable columns of the admin account list: key -> columns to order by
+ACCOUNT_SORT_COLUMNS = {
+    'id': (),
+    'username': (UserAccount.username,),
+    'email': (UserAccount.email,),
+    'name': (UserAccount.last_name, UserAccount.first_name),
+    'profile': (UserProfile.profile_name,),
+    'status': (UserAccount.is_active,),
+    'created': (UserAccount.created_at,),
+}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, or_
+from sqlalchemy import Column, Integer, String, Boolean, Text, asc, desc, or_
 from database.db_config import Base
 
 
@@ -61,6 +61,29 @@ class UserProfile(Base):
         "Fetch all profiles"
         return session.query(UserProfile).all()
     
+    def findProfiles(session, sortBy='id', direction='asc', page=1, page_size=20):
+        """
+        Return (items, total_count) for one page of user profiles
+        
+        Args:
+            sortBy: A key of PROFILE_SORT_COLUMNS; unknown keys sort by id
+            direction: 'asc' or 'desc'
+            page: 1-based page number (clamped to the last page)
+            page_size: Rows per page
+        """
+        query = session.query(UserProfile)
+        total_count = query.count()
+        
+        column = PROFILE_SORT_COLUMNS.get(sortBy, UserProfile.id)
+        order = desc if direction == 'desc' else asc
+        order_by = [order(column)] if column is UserProfile.id else [order(column), order(UserProfile.id)]
+        
+        # A page past the end shows the last page, as the controller's page_meta reports it
+        last_page = max(1, -(-total_count // int(page_size)))
+        offset = (min(max(1, int(page)), last_page) - 1) * int(page_size)
+        items = query.order_by(*order_by).offset(offset).limit(int(page_size)).all()
+        return items, total_count
+    
     def getActiveProfiles(session):
         "Fetch active profiles"
         return session.query(UserProfile).filter_by(is_active = True).all()
@@ -89,6 +112,8 @@ class UserProfile(Base):
         for key, value in update_data.items():
             setattr(self, key, value)
         
+        from entities.user_account import UserAccount
+        UserAccount.markChanged(session)  # Every account holding this profile
         session.commit()
         return 2 # Success
     
@@ -97,6 +122,8 @@ class UserProfile(Base):
         if not self.is_active:
             return False  # Already suspended
         self.is_active = False
+        from entities.user_account import UserAccount
+        UserAccount.markChanged(session)  # Every account holding this profile
         session.commit()
         return True
     
@@ -105,6 +132,8 @@ class UserProfile(Base):
         if self.is_active:
             return False  # Already active
         self.is_active = True
+        from entities.user_account import UserAccount
+        UserAccount.markChanged(session)
         session.commit()
         return True
 
@@ -116,8 +145,8 @@ class UserProfile(Base):
             search_pattern = f"%{keyword}%"
             query = query.filter(
                 or_(
-                    UserProfile.profile_name.like(search_pattern),
-                    UserProfile.description.like(search_pattern)
+                    UserProfile.profile_name.ilike(search_pattern),
+                    UserProfile.description.ilike(search_pattern)
                 )
             )
 
@@ -125,4 +154,12 @@ class UserProfile(Base):
         if is_active is not None:
             query = query.filter_by(is_active=is_active)
 
-        return query.all()
\ No newline at end of file
+        return query.all()
+
+
+# Sortable columns of the admin profile list
+PROFILE_SORT_COLUMNS = {
+    'id': UserProfile.id,
+    'name': UserProfile.profile_name,
+    'status': UserProfile.is_active,
+}